@@ -1,3 +1,38 @@
 from django.contrib import admin
+from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 
-# Register your models here.
+from apps.accounts.models import User
+from apps.common.admin import ScalableAdminMixin
+
+
+@admin.register(User)
+class UserAdmin(ScalableAdminMixin, BaseUserAdmin):
+    # Формы и смена пароля из django.contrib.auth: пароль хранится
+    # хешем и не редактируется как обычное поле
+    list_display = (
+        "email", "first_name", "last_name", "account_type",
+        "is_staff", "is_active", "is_deleted"
+    )
+    list_filter = ("account_type", "is_staff", "is_active", "is_deleted")
+    # email уникален, точное совпадение (см. ScalableAdminMixin)
+    # читается по его индексу
+    search_fields = ("=email",)
+    ordering = ("email",)
+    readonly_fields = ("last_login", "deleted_at")
+    # У модели нет групп и прав, только is_staff
+    filter_horizontal = ()
+    fieldsets = (
+        (None, {"fields": ("email", "password")}),
+        ("Personal info", {"fields": ("first_name", "last_name", "avatar")}),
+        ("Permissions", {"fields": ("account_type", "is_staff", "is_active")}),
+        ("Dates", {"fields": ("last_login", "is_deleted", "deleted_at")}),
+    )
+    add_fieldsets = (
+        (None, {
+            "classes": ("wide",),
+            "fields": (
+                "email", "first_name", "last_name", "account_type",
+                "usable_password", "password1", "password2"
+            ),
+        }),
+    )
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from django.contrib.auth.hashers import make_password
 from apps.accounts.models import User
+from apps.sellers.context import seller_claims
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 
 
@@ -25,5 +26,9 @@ class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
         else:
             token['group'] = 'user'
             token['role'] = user.account_type
+            if user.account_type == 'SELLER':
+                # Продавец проверяется по токену без запросов к базе
+                for claim, value in seller_claims(user).items():
+                    token[claim] = value
 
         return token
@@ -1,8 +1,10 @@
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from apps.accounts.serializers import CreateUserSerializer
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
 from rest_framework_simplejwt.views import TokenObtainPairView
 from apps.accounts.serializers import MyTokenObtainPairSerializer
+from apps.shop.carts import GuestCart
 
 
 class RegisterAPIView(APIView):
@@ -18,3 +20,17 @@ class RegisterAPIView(APIView):
 
 class MyTokenObtainPairView(TokenObtainPairView):
     serializer_class = MyTokenObtainPairSerializer
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        try:
+            serializer.is_valid(raise_exception=True)
+        except TokenError as e:
+            raise InvalidToken(e.args[0])
+        response = Response(serializer.validated_data, status=200)
+        # Корзина гостя переносится в корзину пользователя при входе
+        cart = GuestCart.from_request(request)
+        if cart:
+            cart.merge_into(serializer.user)
+            cart.clear(response)
+        return response
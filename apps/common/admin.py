@@ -1,3 +1,45 @@
 from django.contrib import admin
+from django.contrib.admin.utils import lookup_spawns_duplicates
+from django.db.models import Q
 
-# Register your models here.
+from apps.common.paginations import EstimatedCountPaginator
+
+
+class ScalableAdminMixin:
+    """
+    Changelist settings for big tables: the changelist never counts the
+    whole table twice and takes the unfiltered count from table
+    statistics. Mix it into admins that need another base class, such as
+    django.contrib.auth's UserAdmin. Subclasses should keep
+    list_select_related in line with list_display and search only on
+    indexed columns (exact "=" or prefix "^" lookups).
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_per_page = 50
+    # Case sensitive on purpose: Django maps "=" and "^" to iexact and
+    # istartswith, which compare UPPER(column) and skip btree indexes
+    search_lookups = {"=": "exact", "^": "startswith"}
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Matches the whole term against every "=" and "^" search field.
+        Any other prefix falls back to Django's word by word icontains
+        """
+        search_fields = self.get_search_fields(request)
+        term = search_term.strip()
+        if not term or not search_fields or any(
+                field[0] not in self.search_lookups for field in search_fields
+        ):
+            return super().get_search_results(request, queryset, search_term)
+        query = Q()
+        may_have_duplicates = False
+        for field in search_fields:
+            lookup = f"{field[1:]}__{self.search_lookups[field[0]]}"
+            query |= Q(**{lookup: term})
+            may_have_duplicates |= lookup_spawns_duplicates(self.opts, lookup)
+        return queryset.filter(query), may_have_duplicates
+
+
+class ScalableModelAdmin(ScalableAdminMixin, admin.ModelAdmin):
+    """Base admin for big tables, see ScalableAdminMixin"""
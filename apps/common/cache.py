@@ -0,0 +1,164 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import cache
+
+
+def get_version(key):
+    """
+    A counter in the default cache, shared between workers only when
+    CACHES points at a shared backend. A missing version starts from the
+    current time, so keys written before an eviction are never reused.
+    """
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns())
+        version = cache.get(key)
+    return version
+
+
+def bump_version(key):
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns())
+        return cache.get(key)
+
+
+def model_version_key(model):
+    return f"model-version:{model._meta.label_lower}"
+
+
+def get_model_version(model):
+    """Version of the model's data for cache keys"""
+    return get_version(model_version_key(model))
+
+
+def bump_model_version(model):
+    """Invalidates every cache entry keyed by the model version"""
+    return bump_version(model_version_key(model))
+
+
+def slug_version_key(model):
+    return f"slug-version:{model._meta.label_lower}"
+
+
+def invalidate_slug_lookups(model):
+    """
+    Makes the SlugLookupCache of the model drop its entries, in other
+    workers only with a shared cache backend
+    """
+    return bump_version(slug_version_key(model))
+
+
+class SlugLookupCache:
+    """
+    Bounded per-process LRU of slug -> primary key.
+
+    Each lookup compares the local copy with the model's slug version in
+    the default cache, one cache read instead of a database query; models
+    bump it with invalidate_slug_lookups() when slugs change or rows are
+    removed. Unknown slugs are not cached.
+
+    With the per-process cache of the shipped settings the bump does not
+    reach other workers, so a cached id must never be trusted on its
+    own: get() matches the slug in the same query, and callers of
+    get_id() have to check the slug and deletion where they use the id.
+    """
+
+    def __init__(self, model, maxsize=10000):
+        self.model = model
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._ids = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+
+    def _sync(self):
+        version = get_version(slug_version_key(self.model))
+        if version != self._version:
+            self._ids.clear()
+            self._version = version
+
+    def _remember(self, slug, pk):
+        with self._lock:
+            self._ids[slug] = pk
+            self._ids.move_to_end(slug)
+            while len(self._ids) > self.maxsize:
+                self._ids.popitem(last=False)
+                self.evictions += 1
+
+    def forget(self, slug):
+        with self._lock:
+            self._ids.pop(slug, None)
+
+    def get_id(self, slug):
+        """
+        Primary key for the slug or None, without a query on a hit.
+        The id may be stale, see the class docstring
+        """
+        with self._lock:
+            self._sync()
+            pk = self._ids.get(slug)
+            if pk is not None:
+                self._ids.move_to_end(slug)
+                self.hits += 1
+                return pk
+            self.misses += 1
+        pk = (
+            self.model._default_manager
+            .filter(slug=slug)
+            .values_list("pk", flat=True)
+            .first()
+        )
+        if pk is not None:
+            self._remember(slug, pk)
+        return pk
+
+    def get(self, slug, queryset=None):
+        """
+        The object for the slug or None. On a hit it is fetched by primary
+        key; the slug is still matched in the same query, so an entry that
+        went stale before the invalidation arrived only costs a retry.
+        """
+        if queryset is None:
+            queryset = self.model._default_manager.all()
+        with self._lock:
+            self._sync()
+            pk = self._ids.get(slug)
+        if pk is not None:
+            instance = queryset.filter(pk=pk, slug=slug).first()
+            if instance is not None:
+                with self._lock:
+                    self.hits += 1
+                    if slug in self._ids:
+                        self._ids.move_to_end(slug)
+                return instance
+            self.forget(slug)
+        with self._lock:
+            self.misses += 1
+        instance = queryset.filter(slug=slug).first()
+        if instance is not None:
+            self._remember(slug, instance.pk)
+        return instance
+
+    def clear(self):
+        """Drops the entries and the stats of this process"""
+        with self._lock:
+            self._ids.clear()
+            self._version = None
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._ids),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+        }
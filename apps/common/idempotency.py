@@ -0,0 +1,124 @@
+import functools
+import hashlib
+import json
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework.response import Response
+
+from apps.common.models import IdempotencyKey
+
+
+HEADER = "Idempotency-Key"
+
+
+def get_fingerprint(request):
+    body = json.dumps(request.data, sort_keys=True, cls=DjangoJSONEncoder)
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+def replay(record):
+    response = Response(
+        data=record.response_data, status=record.response_status
+    )
+    response["Idempotent-Replayed"] = "true"
+    return response
+
+
+def acquire(user, key, endpoint, fingerprint):
+    """
+    Inserts the in-flight row. Returns (record, created); the insert is
+    committed right away so concurrent duplicates can see it.
+    """
+    expires_at = timezone.now() + timedelta(
+        seconds=settings.IDEMPOTENCY["TTL"]
+    )
+    try:
+        with transaction.atomic():
+            return IdempotencyKey.objects.create(
+                user=user, key=key, endpoint=endpoint,
+                fingerprint=fingerprint, expires_at=expires_at
+            ), True
+    except IntegrityError:
+        pass
+    record = IdempotencyKey.objects.get_or_none(
+        user=user, key=key, endpoint=endpoint
+    )
+    if record is not None and record.expires_at <= timezone.now():
+        record.delete()
+        return acquire(user, key, endpoint, fingerprint)
+    return record, False
+
+
+def wait_for(record):
+    """Polls an in-flight record until it gets a response or times out"""
+    options = settings.IDEMPOTENCY
+    deadline = time.monotonic() + options["WAIT_TIMEOUT"]
+    while record is not None and record.response_status is None:
+        if time.monotonic() >= deadline:
+            break
+        time.sleep(options["POLL_INTERVAL"])
+        record = IdempotencyKey.objects.get_or_none(pk=record.pk)
+    return record
+
+
+def idempotent(view_method):
+    """
+    Makes an APIView method safe to retry with an Idempotency-Key header.
+
+    The first response of an authenticated user is stored per
+    (user, key, endpoint) and replayed on retries without running the
+    view again. A retry arriving while the first request is still running
+    waits for its response. Server errors are not stored, so such
+    requests can be retried for real.
+    """
+    @functools.wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key or not request.user.is_authenticated:
+            return view_method(self, request, *args, **kwargs)
+        if len(key) > 255:
+            return Response(
+                data={"message": f"{HEADER} is too long"}, status=400
+            )
+
+        fingerprint = get_fingerprint(request)
+        endpoint = f"{request.method} {request.path}"
+        record, created = acquire(request.user, key, endpoint, fingerprint)
+        if not created:
+            if record is not None and record.fingerprint != fingerprint:
+                return Response(
+                    data={
+                        "message": f"{HEADER} was used with another payload"
+                    }, status=422
+                )
+            record = wait_for(record)
+            if record is None:
+                # The first request failed and released the key
+                return wrapper(self, request, *args, **kwargs)
+            if record.response_status is None:
+                return Response(
+                    data={
+                        "message": "A request with this key is in progress"
+                    }, status=409
+                )
+            return replay(record)
+
+        try:
+            response = view_method(self, request, *args, **kwargs)
+        except Exception:
+            record.delete()
+            raise
+        if response.status_code >= 500:
+            record.delete()
+            return response
+        IdempotencyKey.objects.filter(pk=record.pk).update(
+            response_status=response.status_code,
+            response_data=response.data,
+        )
+        return response
+    return wrapper
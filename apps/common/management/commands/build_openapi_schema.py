@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.common.schema import build_schema
+
+
+class Command(BaseCommand):
+    help = (
+        "Generates the OpenAPI schema once and stores it with a gzip copy "
+        "for OpenAPISchemaView. Run it on every build or deploy"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--file",
+            help=(
+                "Write here instead of "
+                "OPENAPI_SCHEMA['DIR']/openapi-<VERSION>.json"
+            )
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        path, prebuilt = build_schema(options["file"])
+        self.stdout.write(
+            f"{path}: {len(prebuilt.content):,} bytes, "
+            f"{len(prebuilt.compressed):,} gzipped, ETag {prebuilt.etag}, "
+            f"built in {time.perf_counter() - started:.2f} s"
+        )
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.common.startup import (
+    check_budget, importtime_digest, measure_startup
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures a cold django.setup() plus URLconf import in a fresh "
+        "interpreter and prints a -X importtime digest per app and "
+        "package. With --check fails when STARTUP_BUDGET is exceeded"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--limit", type=int, default=25,
+            help="Show this many of the slowest packages"
+        )
+        parser.add_argument(
+            "--check", action="store_true",
+            help="Exit with an error when the startup budget is exceeded"
+        )
+
+    def handle(self, *args, **options):
+        result = measure_startup(importtime=True)
+        digest = importtime_digest(result["importtime"])
+        total_ms = sum(row["self_ms"] for row in digest)
+
+        self.stdout.write(
+            f"startup {result['seconds'] * 1000:.0f} ms, "
+            f"{len(result['modules'])} modules, "
+            f"{total_ms:.0f} ms of it importing"
+        )
+        self.stdout.write(f"{'package':<30} {'self ms':>9} {'modules':>8}")
+        for row in digest[:options["limit"]]:
+            self.stdout.write(
+                f"{row['group'][:30]:<30} {row['self_ms']:>9.1f} "
+                f"{row['modules']:>8}"
+            )
+
+        problems = check_budget(result)
+        for problem in problems:
+            self.stderr.write(problem)
+        if problems and options["check"]:
+            raise CommandError("Startup budget exceeded")
@@ -0,0 +1,291 @@
+import asyncio
+import itertools
+import json
+import math
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from urllib.parse import urlencode
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncClient, Client
+from django.urls import Resolver404, resolve
+from rest_framework.views import APIView
+
+from apps.accounts.models import User
+from apps.accounts.serializers import MyTokenObtainPairSerializer
+
+
+ROLES = ("anonymous", "buyer", "seller", "staff")
+
+
+def percentile(values, share):
+    """Nearest-rank percentile of a sorted list"""
+    if not values:
+        return None
+    rank = max(1, math.ceil(share * len(values)))
+    return values[rank - 1]
+
+
+def route_of(path):
+    try:
+        return "/" + resolve(path).route
+    except Resolver404:
+        return "<unresolved>"
+
+
+@contextmanager
+def throttling_disabled():
+    """The replay measures the app, not the per-client rate limits"""
+    original = APIView.get_throttles
+    APIView.get_throttles = lambda self: []
+    try:
+        yield
+    finally:
+        APIView.get_throttles = original
+
+
+class Command(BaseCommand):
+    help = (
+        "Replays recorded traffic from an NDJSON log against the in-process "
+        "WSGI or ASGI application and reports throughput, latency "
+        "percentiles and error rates per URL pattern. Each line holds "
+        "method, path and optionally ts (seconds), query, body and role "
+        f"({', '.join(ROLES)})"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("log", help="Path to the NDJSON traffic log")
+        parser.add_argument(
+            "--concurrency", type=int, default=8,
+            help="Requests in flight at the same time"
+        )
+        parser.add_argument(
+            "--speedup", type=float, default=0,
+            help="Replay N times faster than recorded, 0 sends at once"
+        )
+        parser.add_argument(
+            "--interface", choices=("wsgi", "asgi"), default="wsgi"
+        )
+        parser.add_argument(
+            "--users-per-role", type=int, default=50,
+            help="Requests of a role are spread over this many users"
+        )
+        parser.add_argument(
+            "--throttle", action="store_true",
+            help="Keep DRF throttling enabled"
+        )
+        parser.add_argument(
+            "--output", help="Also write the report as JSON to this file"
+        )
+
+    def handle(self, *args, **options):
+        entries = self.read_log(options["log"])
+        if not entries:
+            raise CommandError("The traffic log is empty")
+        self.tokens = self.mint_tokens(
+            {entry["role"] for entry in entries}, options["users_per_role"]
+        )
+        self.results = []
+        self.lock = threading.Lock()
+
+        throttling = (
+            nullcontext() if options["throttle"] else throttling_disabled()
+        )
+        with throttling:
+            started = time.perf_counter()
+            if options["interface"] == "asgi":
+                asyncio.run(self.replay_asgi(entries, options))
+            else:
+                self.replay_wsgi(entries, options)
+            elapsed = time.perf_counter() - started
+
+        report = self.build_report(elapsed)
+        self.print_report(report)
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                json.dump(report, file, indent=2)
+
+    def read_log(self, path):
+        entries = []
+        with open(path) as file:
+            for number, line in enumerate(file, 1):
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                    entry["method"] = entry["method"].upper()
+                except (ValueError, KeyError, AttributeError, TypeError):
+                    entry = {}
+                if "path" not in entry:
+                    raise CommandError(f"Invalid entry on line {number}")
+                entry.setdefault("role", "anonymous")
+                if entry["role"] not in ROLES:
+                    raise CommandError(
+                        f"Unknown role {entry['role']!r} on line {number}"
+                    )
+                entries.append(entry)
+        first = entries[0].get("ts", 0) if entries else 0
+        for entry in entries:
+            entry["offset"] = entry.get("ts", first) - first
+        return entries
+
+    def mint_tokens(self, roles, users_per_role):
+        """Access tokens with the same claims MyTokenObtainPairView issues"""
+        filters = {
+            "buyer": {"account_type": "BUYER", "is_staff": False},
+            "seller": {"seller__isnull": False, "is_staff": False},
+            "staff": {"is_staff": True},
+        }
+        tokens = {}
+        for role in roles - {"anonymous"}:
+            users = User.objects.filter(
+                is_active=True, **filters[role]
+            ).order_by("id")[:users_per_role]
+            minted = [
+                str(MyTokenObtainPairSerializer.get_token(user).access_token)
+                for user in users
+            ]
+            if not minted:
+                raise CommandError(f"No users for role {role!r}")
+            tokens[role] = itertools.cycle(minted)
+        return tokens
+
+    def build_request(self, entry):
+        query = entry.get("query") or ""
+        if isinstance(query, dict):
+            query = urlencode(query, doseq=True)
+        path = entry["path"] + (f"?{query}" if query else "")
+        headers = {}
+        if entry["role"] != "anonymous":
+            with self.lock:
+                token = next(self.tokens[entry["role"]])
+            headers["Authorization"] = f"Bearer {token}"
+        body = entry.get("body")
+        data = json.dumps(body) if body is not None else ""
+        return path, data, headers
+
+    def record(self, entry, started, status):
+        elapsed = time.perf_counter() - started
+        with self.lock:
+            self.results.append((route_of(entry["path"]), status, elapsed))
+
+    def send(self, client, entry):
+        path, data, headers = self.build_request(entry)
+        started = time.perf_counter()
+        try:
+            response = client.generic(
+                entry["method"], path, data,
+                content_type="application/json", headers=headers
+            )
+            status = response.status_code
+        except Exception:
+            status = None
+        self.record(entry, started, status)
+
+    def replay_wsgi(self, entries, options):
+        local = threading.local()
+
+        def send(entry):
+            if not hasattr(local, "client"):
+                local.client = Client(raise_request_exception=False)
+            self.send(local.client, entry)
+
+        if options["concurrency"] <= 1 and not options["speedup"]:
+            for entry in entries:
+                send(entry)
+            return
+        with ThreadPoolExecutor(options["concurrency"]) as pool:
+            for entry in self.schedule(entries, options["speedup"]):
+                pool.submit(send, entry)
+
+    def schedule(self, entries, speedup):
+        """Yields entries at their recorded offsets scaled by `speedup`"""
+        started = time.perf_counter()
+        for entry in entries:
+            if speedup:
+                delay = entry["offset"] / speedup
+                delay -= time.perf_counter() - started
+                if delay > 0:
+                    time.sleep(delay)
+            yield entry
+
+    async def replay_asgi(self, entries, options):
+        client = AsyncClient(raise_request_exception=False)
+        semaphore = asyncio.Semaphore(options["concurrency"])
+        started = time.perf_counter()
+
+        async def send(entry):
+            async with semaphore:
+                path, data, headers = self.build_request(entry)
+                request_started = time.perf_counter()
+                try:
+                    response = await client.generic(
+                        entry["method"], path, data,
+                        content_type="application/json", headers=headers
+                    )
+                    status = response.status_code
+                except Exception:
+                    status = None
+                self.record(entry, request_started, status)
+
+        tasks = []
+        for entry in entries:
+            if options["speedup"]:
+                delay = entry["offset"] / options["speedup"]
+                delay -= time.perf_counter() - started
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(send(entry)))
+        await asyncio.gather(*tasks)
+
+    def build_report(self, elapsed):
+        by_route = defaultdict(list)
+        for route, status, latency in self.results:
+            by_route[route].append((status, latency))
+        by_route["TOTAL"] = [
+            (status, latency) for _, status, latency in self.results
+        ]
+
+        report = {}
+        for route, rows in by_route.items():
+            latencies = sorted(latency * 1000 for _, latency in rows)
+            statuses = defaultdict(int)
+            for status, _ in rows:
+                statuses[str(status)] += 1
+            errors = sum(
+                count for status, count in statuses.items()
+                if status == "None" or int(status) >= 500
+            )
+            report[route] = {
+                "requests": len(rows),
+                "rps": round(len(rows) / elapsed, 1) if elapsed else None,
+                "error_rate": round(errors / len(rows), 4),
+                "statuses": dict(sorted(statuses.items())),
+                "p50_ms": round(percentile(latencies, 0.50), 2),
+                "p95_ms": round(percentile(latencies, 0.95), 2),
+                "p99_ms": round(percentile(latencies, 0.99), 2),
+                "max_ms": round(latencies[-1], 2),
+            }
+        return report
+
+    def print_report(self, report):
+        header = (
+            f"{'route':<45} {'reqs':>7} {'rps':>8} {'err%':>6} "
+            f"{'p50':>8} {'p95':>8} {'p99':>8}  statuses"
+        )
+        self.stdout.write(header)
+        for route, row in sorted(
+                report.items(),
+                key=lambda item: (item[0] == "TOTAL", -item[1]["requests"])
+        ):
+            statuses = " ".join(
+                f"{status}:{count}" for status, count in row["statuses"].items()
+            )
+            self.stdout.write(
+                f"{route[:45]:<45} {row['requests']:>7} {row['rps']:>8} "
+                f"{row['error_rate'] * 100:>6.2f} {row['p50_ms']:>8} "
+                f"{row['p95_ms']:>8} {row['p99_ms']:>8}  {statuses}"
+            )
@@ -0,0 +1,45 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.common.tasks import claim, release_stale, run_claimed
+
+
+class Command(BaseCommand):
+    help = "Runs queued background tasks until stopped"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=100,
+            help="Maximum number of tasks claimed at once"
+        )
+        parser.add_argument(
+            "--sleep", type=float, default=1.0,
+            help="Seconds to wait when the queue is empty"
+        )
+        parser.add_argument(
+            "--lock-timeout", type=int, default=600,
+            help="Seconds after which a running task is considered lost"
+        )
+        parser.add_argument(
+            "--once", action="store_true",
+            help="Exit when the queue is drained"
+        )
+
+    def handle(self, *args, **options):
+        released = release_stale(options["lock_timeout"])
+        if released:
+            self.stdout.write(f"Released {released} stale tasks")
+        try:
+            while True:
+                tasks = claim(options["batch_size"])
+                if not tasks:
+                    if options["once"]:
+                        break
+                    time.sleep(options["sleep"])
+                    release_stale(options["lock_timeout"])
+                    continue
+                done, failed = run_claimed(tasks)
+                self.stdout.write(f"Tasks done: {done}, failed: {failed}")
+        except KeyboardInterrupt:
+            self.stdout.write("Worker stopped")
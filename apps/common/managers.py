@@ -31,11 +31,13 @@ class IsDeletedQuerySet(GetOrNoneQuerySet):
 
 
 class IsDeletedManager(GetOrNoneManager):
+    queryset_class = IsDeletedQuerySet
+
     def get_queryset(self):
-        return IsDeletedQuerySet(self.model).filter(is_deleted=False)
+        return self.queryset_class(self.model).filter(is_deleted=False)
 
     def unfiltered(self):
-        return IsDeletedQuerySet(self.model)
+        return self.queryset_class(self.model)
 
     def hard_delete(self):
         return self.unfiltered().delete(hard_delete=True)
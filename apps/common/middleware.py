@@ -0,0 +1,170 @@
+import cProfile
+import marshal
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+from django.http import HttpResponse
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+
+class StackSampler:
+    """
+    Samples the call stack of one thread from a background thread and
+    counts identical stacks, which is the collapsed format flamegraph
+    tools read ("root;caller;function count" per line).
+    """
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.busy = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            started = time.perf_counter()
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(
+                    f"{frame.f_globals.get('__name__', '?')}:{code.co_name}"
+                )
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+            self.busy += time.perf_counter() - started
+
+    def collapsed(self):
+        return "".join(
+            f"{stack} {count}\n" for stack, count in self.stacks.items()
+        )
+
+
+@lru_cache(maxsize=None)
+def cprofile_event_cost():
+    """Seconds cProfile adds per profiled call, measured once per process"""
+    def noop():
+        pass
+
+    def loop():
+        for _ in range(20000):
+            noop()
+
+    started = time.perf_counter()
+    loop()
+    plain = time.perf_counter() - started
+    profiler = cProfile.Profile()
+    started = time.perf_counter()
+    profiler.runcall(loop)
+    profiled = time.perf_counter() - started
+    return max(profiled - plain, 0) / 20000
+
+
+class RequestProfilerMiddleware:
+    """
+    Profiles single requests on demand.
+
+    A staff user (JWT or session) sends the header from
+    settings.REQUEST_PROFILER["HEADER"] with "cprofile" or "sampling";
+    SAMPLE_RATE additionally profiles a share of all requests. The
+    artifact (a pstats dump or collapsed stacks) is written to OUTPUT_DIR,
+    or returned instead of the response body when the request also sends
+    X-Profile-Return. Wall time and the estimated profiler overhead come
+    back in X-Profile-* headers. Requests without the header only pay
+    for one header lookup.
+    """
+    engines = ("cprofile", "sampling")
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.options = settings.REQUEST_PROFILER
+        self.header = "HTTP_" + self.options["HEADER"].upper().replace(
+            "-", "_"
+        )
+
+    def __call__(self, request):
+        engine = request.META.get(self.header)
+        if engine is None:
+            sample_rate = self.options["SAMPLE_RATE"]
+            if not sample_rate or random.random() >= sample_rate:
+                return self.get_response(request)
+            engine, inline = self.options["ENGINE"], False
+        else:
+            engine = engine.strip().lower()
+            if engine not in self.engines or not self.is_staff(request):
+                return self.get_response(request)
+            inline = "HTTP_X_PROFILE_RETURN" in request.META
+        return self.profile(request, engine, inline)
+
+    def is_staff(self, request):
+        user = getattr(request, "user", None)
+        if user is not None and user.is_authenticated:
+            return user.is_staff
+        try:
+            result = JWTAuthentication().authenticate(request)
+        except AuthenticationFailed:
+            return False
+        return result is not None and result[0].is_staff
+
+    def profile(self, request, engine, inline):
+        profile_id = uuid.uuid4().hex
+        started = time.perf_counter()
+        if engine == "cprofile":
+            profiler = cProfile.Profile()
+            response = profiler.runcall(self.get_response, request)
+            wall = time.perf_counter() - started
+            profiler.create_stats()
+            calls = sum(row[1] for row in profiler.stats.values())
+            overhead = calls * cprofile_event_cost()
+            artifact, extension = marshal.dumps(profiler.stats), "prof"
+        else:
+            with StackSampler(
+                    threading.get_ident(), self.options["SAMPLING_INTERVAL"]
+            ) as sampler:
+                response = self.get_response(request)
+            wall = time.perf_counter() - started
+            overhead = sampler.busy
+            artifact, extension = sampler.collapsed().encode(), "collapsed"
+
+        if inline:
+            original_status = response.status_code
+            response = HttpResponse(
+                artifact,
+                content_type=(
+                    "text/plain" if extension == "collapsed"
+                    else "application/octet-stream"
+                )
+            )
+            response["X-Profile-Status"] = original_status
+            response["Content-Disposition"] = (
+                f'attachment; filename="{profile_id}.{extension}"'
+            )
+        else:
+            output_dir = Path(self.options["OUTPUT_DIR"])
+            output_dir.mkdir(parents=True, exist_ok=True)
+            path = output_dir / f"{profile_id}.{extension}"
+            path.write_bytes(artifact)
+
+        response["X-Profile-Id"] = f"{profile_id}.{extension}"
+        response["X-Profile-Wall-Ms"] = f"{wall * 1000:.2f}"
+        response["X-Profile-Overhead-Ms"] = f"{overhead * 1000:.2f}"
+        return response
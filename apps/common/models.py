@@ -1,6 +1,8 @@
 import uuid
 import re
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from django.db.models import OrderBy
 from django.utils import timezone
 from apps.common.managers import IsDeletedManager, GetOrNoneManager
 
@@ -45,4 +47,92 @@ class IsDeletedModel(BaseModel):
         super().delete(*args, **kwargs)
 
 
+class NullsLastIndex(models.Index):
+    """
+    An expression index with desc(nulls_last=True) columns. SQLite keeps
+    NULLs lowest and rejects NULLS LAST in CREATE INDEX, so there such a
+    column is built as plain DESC, which is the same order.
+    """
+
+    def create_sql(self, model, schema_editor, using="", **kwargs):
+        index = self
+        if schema_editor.connection.vendor == "sqlite":
+            index = self.clone()
+            index.expressions = tuple(
+                OrderBy(expression.expression, descending=True)
+                if isinstance(expression, OrderBy) and expression.descending
+                else expression
+                for expression in self.expressions
+            )
+        return models.Index.create_sql(
+            index, model, schema_editor, using=using, **kwargs
+        )
+
+
+TASK_STATUS_CHOICES = (
+    ("PENDING", "PENDING"),
+    ("RUNNING", "RUNNING"),
+    ("FAILED", "FAILED"),
+)
+
+
+class Task(BaseModel):
+    """
+    A unit of deferred work stored in the database.
+    Tasks are created through apps.common.tasks.enqueue() and executed
+    by the run_tasks management command; finished tasks are deleted.
+    """
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    priority = models.SmallIntegerField(default=0)
+    status = models.CharField(
+        max_length=10, choices=TASK_STATUS_CHOICES, default="PENDING"
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=64, null=True, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["status", "priority", "run_after"],
+                name="task_queue_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.status})"
+
+
+class IdempotencyKey(BaseModel):
+    """
+    The stored outcome of a request sent with an Idempotency-Key header.
+    A row without response_status belongs to a request still in flight.
+    """
+    user = models.ForeignKey(
+        "accounts.User", on_delete=models.CASCADE,
+        related_name="idempotency_keys"
+    )
+    key = models.CharField(max_length=255)
+    endpoint = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64)
+    response_status = models.PositiveSmallIntegerField(null=True)
+    response_data = models.JSONField(null=True, encoder=DjangoJSONEncoder)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "key", "endpoint"],
+                name="idempotency_key_unique"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.endpoint} {self.key}"
+
+
 # print(re.match(r'[^\s]+', "Всем привет, друзья!"))
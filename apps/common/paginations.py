@@ -1,6 +1,391 @@
-from rest_framework.pagination import PageNumberPagination
+import datetime
+import hashlib
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+from decimal import Decimal
+from functools import cmp_to_key, reduce
+from operator import or_
 
+from django.core.cache import cache
+from django.core.paginator import (
+    EmptyPage, InvalidPage, PageNotAnInteger, Paginator
+)
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DatabaseError, connections
+from django.db.models import OrderBy, Q, QuerySet
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
-class CustomPagination(PageNumberPagination):
+from apps.common.cache import get_model_version
+
+
+def estimate_count(model, using="default"):
+    """
+    Row count of the model table from the planner statistics, None when
+    the backend keeps none (or the table was never analyzed)
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    queries = {
+        "postgresql": (
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass"
+        ),
+        "mysql": (
+            "SELECT table_rows FROM information_schema.tables "
+            "WHERE table_schema = DATABASE() AND table_name = %s"
+        ),
+        # sqlite_stat1 exists only after ANALYZE, the first number
+        # of a stat row is the table size
+        "sqlite": "SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1",
+    }
+    query = queries.get(connection.vendor)
+    if query is None:
+        return None
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(query, [table])
+            row = cursor.fetchone()
+    except DatabaseError:
+        return None
+    if row is None or row[0] is None:
+        return None
+    value = int(str(row[0]).split()[0])
+    return value if value >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Django paginator that takes the count of an unfiltered queryset from
+    the table statistics once the table is big enough, so large admin
+    changelists skip the COUNT(*) over the whole table.
+    """
+    estimate_threshold = 100_000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if isinstance(queryset, QuerySet) and not queryset.query.where:
+            estimate = estimate_count(queryset.model, queryset.db)
+            if estimate is not None and estimate >= self.estimate_threshold:
+                return estimate
+        return super().count
+
+
+def estimate_query_count(queryset):
+    """Planner row estimate of a filtered queryset, PostgreSQL only"""
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class KnownCountPaginator(Paginator):
+    """
+    Django paginator with the count computed by the caller. An estimated
+    count may be off, so page numbers past it are not rejected.
+    """
+
+    def __init__(self, object_list, per_page, count, is_estimate=False):
+        super().__init__(object_list, per_page)
+        self.count = count
+        self.is_estimate = is_estimate
+
+    def validate_number(self, number):
+        if not self.is_estimate:
+            return super().validate_number(number)
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger("That page number is not an integer")
+        if number < 1:
+            raise EmptyPage("That page number is less than 1")
+        return number
+
+
+def normalize_filter_value(value):
+    if isinstance(value, Decimal):
+        return format(value.normalize(), "f")
+    if isinstance(value, (list, tuple, set)):
+        return sorted(normalize_filter_value(item) for item in value)
+    return value
+
+
+class CachedCountPagination(PageNumberPagination):
+    """
+    Page number pagination that does not run COUNT(*) for every page.
+
+    Counts are cached per model version and the count query itself, so
+    paging through a result runs the count once, and any write that
+    bumps the model version (apps.common.cache) invalidates it. Other
+    workers only see the bump with a shared cache backend, see CACHES.
+    Once the table statistics put the table above `estimate_threshold`
+    rows the count is estimated instead (table size when unfiltered,
+    planner estimate on PostgreSQL otherwise) and the response carries
+    count_is_estimate=true.
+    """
+    count_cache_timeout = 300
+    estimate_threshold = 100_000
+
+    def get_count_cache_key(self, queryset):
+        """
+        Hashes the SQL and parameters of the count query. The same rows
+        requested another way (page, ordering, sparse fields, 15 vs 15.00)
+        share the key; querysets scoped differently behind one URL, such
+        as per user lists, never do.
+        """
+        sql, params = (
+            queryset.order_by().values("pk").query.sql_with_params()
+        )
+        signature = hashlib.sha1(json.dumps(
+            [queryset.db, sql, [normalize_filter_value(p) for p in params]],
+            cls=DjangoJSONEncoder
+        ).encode()).hexdigest()
+        model = queryset.model
+        return (
+            f"count:{model._meta.label_lower}:"
+            f"{get_model_version(model)}:{signature}"
+        )
+
+    def get_table_size(self, model, using):
+        """Table statistics change slowly; -1 means there are none"""
+        key = f"table-size:{using}:{model._meta.label_lower}"
+        table_size = cache.get(key)
+        if table_size is None:
+            table_size = estimate_count(model, using)
+            if table_size is None:
+                table_size = -1
+            cache.set(key, table_size, self.count_cache_timeout)
+        return table_size
+
+    def get_count(self, queryset):
+        """Returns (count, is_estimate)"""
+        table_size = self.get_table_size(queryset.model, queryset.db)
+        if table_size >= self.estimate_threshold:
+            if not queryset.query.where:
+                return table_size, True
+            estimate = estimate_query_count(queryset)
+            if estimate is not None:
+                return estimate, True
+        return queryset.count(), False
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        key = self.get_count_cache_key(queryset)
+        cached = cache.get(key)
+        if cached is None:
+            cached = self.get_count(queryset)
+            cache.set(key, cached, self.count_cache_timeout)
+        count, self.count_is_estimate = cached
+
+        paginator = KnownCountPaginator(
+            queryset, page_size, count, self.count_is_estimate
+        )
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(
+                page_number=page_number, message=str(exc)
+            ))
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+        return list(self.page)
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        response.data['count_is_estimate'] = self.count_is_estimate
+        return response
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['count_is_estimate'] = {
+            'type': 'boolean',
+            'example': False,
+        }
+        return response_schema
+
+
+class CustomPagination(CachedCountPagination):
     page_size_query_param = 'page_size'  # Параметр запроса для изменения размера страницы
     max_page_size = 100  # Максимально допустимый размер страницы
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    """Keeps microseconds that DjangoJSONEncoder cuts from datetimes"""
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+class KeysetCursorPagination(BasePagination):
+    """
+    Cursor pagination over an arbitrary ordering.
+
+    The cursor stores the ordering values of the last row of a page and
+    the next page is fetched with a lexicographic "row after" filter, so
+    every page costs one index range scan no matter how deep it is.
+    The last ordering field must be unique. A nullable field is ordered
+    with F(name).asc(nulls_last=True) or .desc(nulls_last=True).
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    ordering = ('-created_at', '-id')
+    invalid_cursor_message = 'Invalid cursor'
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def paginate_queryset(self, queryset, request, view=None, ordering=None):
+        self.request = request
+        self.ordering = tuple(ordering or self.ordering)
+        self.page_size = self.get_page_size(request)
+        position = self.decode_cursor(request)
+        if position is not None:
+            queryset = queryset.filter(self.rows_after(position))
+        rows = list(queryset.order_by(*self.ordering)[:self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+        return self.page
+
+    def paginate_querysets(self, querysets, request, view=None, ordering=None):
+        """
+        Pages through several querysets with the same ordering columns as
+        if they were one table, e.g. hot and archived rows. Each of them
+        reads at most one page worth of rows, merged here by the ordering.
+        """
+        self.request = request
+        self.ordering = tuple(ordering or self.ordering)
+        self.page_size = self.get_page_size(request)
+        position = self.decode_cursor(request)
+        rows = []
+        for queryset in querysets:
+            if position is not None:
+                queryset = queryset.filter(self.rows_after(position))
+            rows += [
+                (self.get_position(row), row)
+                for row in queryset.order_by(*self.ordering)[
+                    :self.page_size + 1
+                ]
+            ]
+        rows.sort(key=cmp_to_key(self.compare_positions))
+        self.has_next = len(rows) > self.page_size
+        self.page = [row for _, row in rows[:self.page_size]]
+        return self.page
+
+    @staticmethod
+    def parse_field(field):
+        """Returns (name, descending, nulls_last) of an ordering entry"""
+        if isinstance(field, OrderBy):
+            return (
+                field.expression.name, field.descending,
+                bool(field.nulls_last)
+            )
+        return field.lstrip('-'), field.startswith('-'), False
+
+    def compare_positions(self, left, right):
+        for field in self.ordering:
+            name, descending, _ = self.parse_field(field)
+            a, b = left[0][name], right[0][name]
+            if a == b:
+                continue
+            # only nulls_last fields hold NULL, it sorts after any value
+            if a is None or b is None:
+                return 1 if a is None else -1
+            result = -1 if a < b else 1
+            return -result if descending else result
+        return 0
+
+    def rows_after(self, position):
+        """
+        Builds (a < x) OR (a = x AND b < y) OR ... for the ordering.
+        Rows with NULL in a nulls_last field follow every other value
+        """
+        conditions = []
+        equal = Q()
+        for field in self.ordering:
+            name, descending, nulls_last = self.parse_field(field)
+            value = position[name]
+            if value is None:
+                equal &= Q(**{f'{name}__isnull': True})
+                continue
+            lookup = 'lt' if descending else 'gt'
+            after = Q(**{f'{name}__{lookup}': value})
+            if nulls_last:
+                after |= Q(**{f'{name}__isnull': True})
+            conditions.append(equal & after)
+            equal &= Q(**{name: value})
+        return reduce(or_, conditions)
+
+    def get_position(self, instance):
+        position = {}
+        for field in self.ordering:
+            name = self.parse_field(field)[0]
+            value = instance
+            for attr in name.split('__'):
+                value = getattr(value, attr)
+            position[name] = value
+        return position
+
+    def encode_cursor(self, position):
+        payload = json.dumps(position, cls=CursorEncoder)
+        return urlsafe_b64encode(payload.encode()).decode()
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            position = json.loads(urlsafe_b64decode(encoded.encode()))
+        except (BinasciiError, ValueError, TypeError):
+            raise NotFound(self.invalid_cursor_message)
+        names = {self.parse_field(field)[0] for field in self.ordering}
+        if not isinstance(position, dict) or set(position) != names:
+            raise NotFound(self.invalid_cursor_message)
+        return position
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        cursor = self.encode_cursor(self.get_position(self.page[-1]))
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
@@ -1,5 +1,7 @@
 from rest_framework import permissions
 
+from apps.sellers.context import get_seller
+
 
 class IsOwner(permissions.BasePermission):
     def has_permission(self, request, view):
@@ -13,9 +15,18 @@ class IsOwner(permissions.BasePermission):
 
 class IsSeller(permissions.BasePermission):
     def has_permission(self, request, view):
-        if (request.user.is_authenticated and request.user.account_type == 'SELLER' and request.user.seller.is_approved) or request.user.is_staff:
+        if request.user.is_staff:
             return True
+        if (
+                request.user.is_authenticated
+                and request.user.account_type == 'SELLER'
+        ):
+            seller = get_seller(request)
+            return seller is not None and seller.is_approved
         return False
 
     def has_object_permission(self, request, view, obj):
-        return obj.seller == request.user.seller or request.user.is_staff
+        if request.user.is_staff:
+            return True
+        seller = get_seller(request)
+        return seller is not None and obj.seller_id == seller.id
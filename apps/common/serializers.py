@@ -0,0 +1,147 @@
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+
+def parse_fieldset(value: str) -> dict:
+    """'name,seller.name,seller.slug' -> {'name': {}, 'seller': {...}}"""
+    tree = {}
+    for path in value.split(","):
+        path = path.strip()
+        if not path:
+            continue
+        node = tree
+        for name in path.split("."):
+            node = node.setdefault(name, {})
+    return tree
+
+
+def unwrap(serializer):
+    if isinstance(serializer, serializers.ListSerializer):
+        return serializer.child
+    return serializer
+
+
+class SparseFieldset:
+    """
+    Sparse fieldsets from ?fields= and ?exclude= query parameters.
+
+    Nested fields are addressed with dots (seller.name). Besides pruning
+    the serializer, the queryset is trimmed with .only() and unused
+    select_related joins are dropped; annotations stay as they are. The
+    trimming is skipped whenever a kept field is not a plain model column
+    or annotation (properties, method fields), because those may touch
+    columns that would otherwise be deferred.
+    """
+    fields_param = "fields"
+    exclude_param = "exclude"
+
+    def __init__(self, fields=None, exclude=None):
+        self.fields = fields
+        self.exclude = exclude
+
+    @classmethod
+    def from_request(cls, request):
+        fields = request.query_params.get(cls.fields_param)
+        exclude = request.query_params.get(cls.exclude_param)
+        return cls(
+            parse_fieldset(fields) if fields else None,
+            parse_fieldset(exclude) if exclude else None,
+        )
+
+    def __bool__(self):
+        return bool(self.fields or self.exclude)
+
+    def prune(self, serializer):
+        if self:
+            self._prune(unwrap(serializer), self.fields, self.exclude, "")
+        return serializer
+
+    def _prune(self, serializer, keep, drop, prefix):
+        fields = serializer.fields
+        for name in set(keep or {}) | set(drop or {}):
+            if name not in fields:
+                raise ValidationError({
+                    "message": f"Unknown field '{prefix}{name}'"
+                })
+        for name in list(fields):
+            if keep is not None and name not in keep:
+                fields.pop(name)
+                continue
+            nested_keep = keep.get(name) if keep else None
+            nested_drop = drop.get(name) if drop else None
+            if drop is not None and name in drop and not nested_drop:
+                fields.pop(name)
+                continue
+            nested = unwrap(fields[name])
+            if isinstance(nested, serializers.BaseSerializer) and (
+                    nested_keep or nested_drop
+            ):
+                self._prune(
+                    nested, nested_keep or None, nested_drop,
+                    f"{prefix}{name}."
+                )
+
+    def serialize(self, serializer_class, instance, **kwargs):
+        return self.prune(serializer_class(instance, **kwargs))
+
+    def trim_queryset(self, queryset, serializer_class):
+        if not self:
+            return queryset
+        serializer = self.prune(serializer_class())
+        projection = self.get_projection(
+            unwrap(serializer), queryset.model,
+            annotations=queryset.query.annotations
+        )
+        if projection is None:
+            return queryset
+        columns, relations = projection
+        return (
+            queryset
+            .select_related(None)
+            .select_related(*relations)
+            .only(*columns)
+        )
+
+    def get_projection(self, serializer, model, prefix="", annotations=()):
+        """
+        Returns (columns, relations) needed to render `serializer`,
+        or None when the serializer reads anything but model columns
+        and top level `annotations`.
+        """
+        columns, relations = [], []
+        for field in serializer.fields.values():
+            if field.source == "*":
+                return None
+            current, path = model, prefix
+            attrs = field.source.split(".")
+            if len(attrs) == 1 and attrs[0] in annotations:
+                continue
+            for position, attr in enumerate(attrs):
+                try:
+                    model_field = current._meta.get_field(attr)
+                except FieldDoesNotExist:
+                    return None
+                if not model_field.concrete:
+                    return None
+                path += attr
+                last = position == len(attrs) - 1
+                if model_field.many_to_one or model_field.one_to_one:
+                    columns.append(path)
+                    relations.append(path)
+                    current, path = model_field.related_model, path + "__"
+                    if not last:
+                        continue
+                    nested = unwrap(field)
+                    if not isinstance(nested, serializers.BaseSerializer):
+                        return None
+                    projection = self.get_projection(nested, current, path)
+                    if projection is None:
+                        return None
+                    columns += projection[0]
+                    relations += projection[1]
+                elif model_field.is_relation or not last:
+                    return None
+                else:
+                    columns.append(path)
+        return list(dict.fromkeys(columns)), list(dict.fromkeys(relations))
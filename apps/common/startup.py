@@ -0,0 +1,103 @@
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+
+
+# Runs in a fresh interpreter: the current process already has everything
+# imported, so only a child process shows what a worker pays on start
+STARTUP_SCRIPT = """
+import json, os, sys, time
+started = time.perf_counter()
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", {settings_module!r})
+import django
+django.setup()
+from django.urls import get_resolver
+get_resolver().url_patterns
+print(json.dumps({{
+    "seconds": time.perf_counter() - started,
+    "modules": sorted(sys.modules),
+}}))
+"""
+
+
+def measure_startup(importtime=False):
+    """
+    Cold django.setup() plus URLconf loading in a child interpreter.
+    Returns the wall time, the imported module names and, with
+    `importtime`, the raw `-X importtime` lines.
+    """
+    command = [sys.executable]
+    if importtime:
+        command += ["-X", "importtime"]
+    command += ["-c", STARTUP_SCRIPT.format(
+        settings_module=os.environ.get(
+            "DJANGO_SETTINGS_MODULE", settings.SETTINGS_MODULE
+        )
+    )]
+    completed = subprocess.run(
+        command, capture_output=True, text=True, check=True,
+        cwd=settings.BASE_DIR
+    )
+    result = json.loads(completed.stdout.splitlines()[-1])
+    result["importtime"] = [
+        line for line in completed.stderr.splitlines()
+        if line.startswith("import time:") and "|" in line
+    ]
+    return result
+
+
+def module_group(name):
+    """apps.shop.views -> apps.shop, rest_framework.fields -> rest_framework"""
+    parts = name.split(".")
+    return ".".join(parts[:2]) if parts[0] == "apps" else parts[0]
+
+
+def importtime_digest(lines):
+    """
+    Self time and module count per package from `-X importtime` output,
+    slowest first. Self time adds up without double counting nested
+    imports, unlike the cumulative column.
+    """
+    groups = defaultdict(lambda: {"self_ms": 0.0, "modules": 0})
+    for line in lines:
+        _, self_us, _, name = (
+            part.strip() for part in line.replace(":", "|", 1).split("|")
+        )
+        if not self_us.isdigit():
+            continue
+        group = groups[module_group(name)]
+        group["self_ms"] += int(self_us) / 1000
+        group["modules"] += 1
+    return sorted(
+        ({"group": name, **values} for name, values in groups.items()),
+        key=lambda row: -row["self_ms"]
+    )
+
+
+def check_budget(result, budget=None, timed=True):
+    """
+    Budget violations of a measure_startup() result, empty when fine.
+    `timed=False` skips the wall time, which depends on the machine and
+    its load; the module checks are deterministic
+    """
+    budget = budget or settings.STARTUP_BUDGET
+    problems = []
+    if timed and result["seconds"] > budget["SECONDS"]:
+        problems.append(
+            f"startup took {result['seconds']:.2f} s, "
+            f"budget {budget['SECONDS']} s"
+        )
+    if len(result["modules"]) > budget["MODULES"]:
+        problems.append(
+            f"{len(result['modules'])} modules imported, "
+            f"budget {budget['MODULES']}"
+        )
+    modules = set(result["modules"])
+    for name in budget["FORBIDDEN_MODULES"]:
+        if name in modules:
+            problems.append(f"{name} is imported on startup")
+    return problems
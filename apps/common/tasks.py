@@ -0,0 +1,146 @@
+import traceback
+import uuid
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Callable
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from apps.common.models import Task
+
+
+@dataclass(frozen=True)
+class TaskSpec:
+    func: Callable
+    batch: bool
+    max_attempts: int
+    retry_delay: int
+    priority: int
+
+
+registry: dict[str, TaskSpec] = {}
+
+
+def task(name, *, batch=False, max_attempts=3, retry_delay=30, priority=0):
+    """
+    Registers a task handler under `name`.
+
+    Regular handlers are called with the payload as keyword arguments.
+    Batch handlers are called once with the list of payloads of all
+    claimed tasks of the same name, so they can coalesce the work.
+    """
+    def decorator(func):
+        registry[name] = TaskSpec(
+            func, batch, max_attempts, retry_delay, priority
+        )
+        return func
+    return decorator
+
+
+def enqueue(name, payload=None, *, priority=None, delay=0):
+    """Stores a task for the worker, `delay` is in seconds"""
+    spec = registry.get(name)
+    if spec is None:
+        raise ValueError(f"Unknown task {name!r}")
+    return Task.objects.create(
+        name=name,
+        payload=payload or {},
+        priority=spec.priority if priority is None else priority,
+        max_attempts=spec.max_attempts,
+        run_after=timezone.now() + timedelta(seconds=delay),
+    )
+
+
+def enqueue_on_commit(name, payload=None, **kwargs):
+    """Enqueues the task only once the current transaction commits"""
+    transaction.on_commit(lambda: enqueue(name, payload, **kwargs))
+
+
+def release_stale(lock_timeout):
+    """Returns tasks of crashed workers back to the queue"""
+    expired = timezone.now() - timedelta(seconds=lock_timeout)
+    return (
+        Task.objects
+        .filter(status="RUNNING", locked_at__lt=expired)
+        .update(status="PENDING", locked_by=None, locked_at=None)
+    )
+
+
+def claim(limit):
+    """
+    Takes up to `limit` due tasks, most urgent first.
+    The conditional UPDATE makes claiming safe between concurrent
+    workers without row locks, so it works on every database backend.
+    """
+    now = timezone.now()
+    token = uuid.uuid4().hex
+    candidates = list(
+        Task.objects
+        .filter(status="PENDING", run_after__lte=now)
+        .order_by("-priority", "run_after")
+        .values_list("id", flat=True)[:limit]
+    )
+    if not candidates:
+        return []
+    (
+        Task.objects
+        .filter(id__in=candidates, status="PENDING")
+        .update(
+            status="RUNNING", locked_by=token, locked_at=now,
+            attempts=F("attempts") + 1
+        )
+    )
+    return list(
+        Task.objects
+        .filter(locked_by=token)
+        .order_by("-priority", "run_after")
+    )
+
+
+def run_claimed(tasks):
+    """Executes claimed tasks, batching the ones of the same name"""
+    grouped = {}
+    for claimed in tasks:
+        grouped.setdefault(claimed.name, []).append(claimed)
+    done, failed = [], []
+    for name, group in grouped.items():
+        spec = registry.get(name)
+        if spec is None:
+            failed += [(claimed, f"Unknown task {name!r}") for claimed in group]
+            continue
+        calls = [group] if spec.batch else [[claimed] for claimed in group]
+        for call in calls:
+            try:
+                if spec.batch:
+                    spec.func([claimed.payload for claimed in call])
+                else:
+                    spec.func(**call[0].payload)
+            except Exception:
+                error = traceback.format_exc(limit=5)
+                failed += [(claimed, error) for claimed in call]
+            else:
+                done += call
+    Task.objects.filter(id__in=[claimed.id for claimed in done]).delete()
+    for claimed, error in failed:
+        retry(claimed, error)
+    return len(done), len(failed)
+
+
+def retry(claimed, error):
+    spec = registry.get(claimed.name)
+    claimed.last_error = error
+    claimed.locked_by = None
+    claimed.locked_at = None
+    if spec is None or claimed.attempts >= claimed.max_attempts:
+        claimed.status = "FAILED"
+    else:
+        claimed.status = "PENDING"
+        claimed.run_after = timezone.now() + timedelta(
+            seconds=spec.retry_delay * 2 ** (claimed.attempts - 1)
+        )
+    claimed.save(update_fields=[
+        "status", "run_after", "last_error", "locked_by", "locked_at",
+        "updated_at"
+    ])
@@ -3,19 +3,22 @@ from string import ascii_uppercase, digits
 from apps.common.models import BaseModel
 
 
-def generate_unique_code(model: BaseModel, field: str) -> str:
-
+def generate_unique_code(
+        model: BaseModel, field: str, also: tuple = ()
+) -> str:
+    """A random code not used in `field` of `model` nor of models in `also`"""
     allowed_chars = ascii_uppercase + digits
     unique_code = "".join(
         secrets.choice(allowed_chars)
         for _ in range(12)
     )
-    similar_object_exists = model.objects.filter(
-        **{field: unique_code}
-    ).exists()
+    similar_object_exists = any(
+        other.objects.filter(**{field: unique_code}).exists()
+        for other in (model, *also)
+    )
     if not similar_object_exists:
         return unique_code
-    return generate_unique_code(model, field)
+    return generate_unique_code(model, field, also)
 
 
 def set_dict_attr(obj, data):
@@ -1,3 +1,83 @@
-from django.shortcuts import render
+import logging
 
-# Create your views here.
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.module_loading import import_string
+from django.views import View
+
+from apps.common.schema import (
+    load_schema, make_prebuilt, generate_schema, schema_mtime
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+def lazy_view(dotted_path, **initkwargs):
+    """
+    A view that imports its class on the first request. Keeps heavy
+    optional modules such as drf_spectacular.views out of the URLconf
+    import and so out of worker startup.
+    """
+    resolved = []
+
+    def view(request, *args, **kwargs):
+        if not resolved:
+            resolved.append(import_string(dotted_path).as_view(**initkwargs))
+        return resolved[0](request, *args, **kwargs)
+
+    view.__name__ = dotted_path.rsplit(".", 1)[-1]
+    return view
+
+
+class OpenAPISchemaView(View):
+    """
+    Serves the schema written by `manage.py build_openapi_schema` as a
+    static file: gzip when the client accepts it, 304 on a matching ETag.
+    Every request compares the file's mtime with the cached copy, so a
+    rebuild is picked up by all workers without a restart. Without the
+    file DEBUG generates the schema live on every request and production
+    generates it once per process.
+    """
+    content_type = "application/vnd.oai.openapi+json"
+    cache_control = "public, max-age=0, must-revalidate"
+    prebuilt = None
+
+    @classmethod
+    def get_prebuilt(cls):
+        cached = cls.prebuilt
+        if cached is not None and cached.mtime == schema_mtime():
+            return cached
+        prebuilt = load_schema()
+        if prebuilt is None:
+            if settings.DEBUG:
+                return None
+            logger.warning(
+                "OpenAPI schema is not prebuilt, generating it in process"
+            )
+            prebuilt = make_prebuilt(generate_schema())
+        cls.prebuilt = prebuilt
+        return prebuilt
+
+    def get(self, request, *args, **kwargs):
+        prebuilt = self.get_prebuilt()
+        if prebuilt is None:
+            live_view = lazy_view("drf_spectacular.views.SpectacularAPIView")
+            return live_view(request, *args, **kwargs)
+
+        if prebuilt.etag in request.headers.get("If-None-Match", ""):
+            response = HttpResponseNotModified()
+        elif "gzip" in request.headers.get("Accept-Encoding", ""):
+            response = HttpResponse(
+                prebuilt.compressed, content_type=self.content_type
+            )
+            response["Content-Encoding"] = "gzip"
+        else:
+            response = HttpResponse(
+                prebuilt.content, content_type=self.content_type
+            )
+        response["ETag"] = prebuilt.etag
+        response["Cache-Control"] = self.cache_control
+        patch_vary_headers(response, ("Accept-Encoding",))
+        return response
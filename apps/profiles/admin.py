@@ -1,3 +1,53 @@
 from django.contrib import admin
 
-# Register your models here.
+from apps.common.admin import ScalableModelAdmin
+from apps.profiles.models import ArchivedOrder, Order, OrderItem
+
+
+class OrderItemInline(admin.TabularInline):
+    model = OrderItem
+    extra = 0
+    autocomplete_fields = ("user", "product")
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related("product")
+
+
+@admin.register(Order)
+class OrderAdmin(ScalableModelAdmin):
+    list_display = (
+        "tx_ref", "user", "delivery_status", "payment_status", "created_at"
+    )
+    # Order.__str__ читает user.full_name
+    list_select_related = ("user",)
+    list_filter = ("delivery_status", "payment_status")
+    search_fields = ("=tx_ref", "=user__email")
+    autocomplete_fields = ("user",)
+    ordering = ("-created_at",)
+    readonly_fields = ("tx_ref",)
+    inlines = (OrderItemInline,)
+
+
+@admin.register(OrderItem)
+class OrderItemAdmin(ScalableModelAdmin):
+    list_display = ("order", "product", "user", "quantity")
+    list_select_related = ("order__user", "product", "user")
+    search_fields = ("=order__tx_ref",)
+    autocomplete_fields = ("order", "product", "user")
+
+
+@admin.register(ArchivedOrder)
+class ArchivedOrderAdmin(ScalableModelAdmin):
+    list_display = (
+        "tx_ref", "user", "delivery_status", "payment_status", "created_at",
+        "archived_at"
+    )
+    list_select_related = ("user",)
+    search_fields = ("=tx_ref", "=user__email")
+    ordering = ("-created_at",)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
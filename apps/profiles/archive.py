@@ -0,0 +1,89 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.profiles.models import (
+    ArchivedOrder, ArchivedOrderItem, Order, OrderItem
+)
+
+
+# Заказы, которые больше не меняют статус
+COMPLETED = (
+    Q(delivery_status="SUCCESS", payment_status="SUCCESSFUL")
+    | Q(payment_status="CANCELLED")
+)
+
+
+def get_cutoff(days=None):
+    if days is None:
+        days = settings.ORDER_ARCHIVE["AFTER_DAYS"]
+    return timezone.now() - timedelta(days=days)
+
+
+def copy_row(instance, model, **extra):
+    """An unsaved `model` row with the same column values"""
+    values = {
+        field.attname: getattr(instance, field.attname)
+        for field in type(instance)._meta.concrete_fields
+    }
+    return model(**values, **extra)
+
+
+def archive_batch(cutoff, batch_size):
+    """
+    Moves up to `batch_size` completed orders created before `cutoff`
+    with their items into the archive tables in one transaction.
+    Returns the number of moved orders.
+    """
+    with transaction.atomic():
+        orders = list(
+            Order.objects
+            .filter(COMPLETED, created_at__lt=cutoff)
+            .order_by("created_at", "id")
+            .select_for_update(skip_locked=True)[:batch_size]
+        )
+        if not orders:
+            return 0
+        order_ids = [order.id for order in orders]
+        items = OrderItem.objects.filter(order_id__in=order_ids)
+        ArchivedOrder.objects.bulk_create(
+            [copy_row(order, ArchivedOrder) for order in orders]
+        )
+        ArchivedOrderItem.objects.bulk_create(
+            [copy_row(item, ArchivedOrderItem) for item in items]
+        )
+        items.delete()
+        Order.objects.filter(id__in=order_ids).delete()
+    return len(orders)
+
+
+def archive_orders(days=None, batch_size=None, max_batches=None):
+    """Archives in batches until nothing is left, returns the total"""
+    cutoff = get_cutoff(days)
+    batch_size = batch_size or settings.ORDER_ARCHIVE["BATCH_SIZE"]
+    total = batches = 0
+    while max_batches is None or batches < max_batches:
+        moved = archive_batch(cutoff, batch_size)
+        if not moved:
+            break
+        total += moved
+        batches += 1
+    return total
+
+
+def find_order(tx_ref):
+    """The hot order or its archived copy, None if neither exists"""
+    return (
+        Order.objects.get_or_none(tx_ref=tx_ref)
+        or ArchivedOrder.objects.get_or_none(tx_ref=tx_ref)
+    )
+
+
+def order_items(order):
+    """Items of an order from the table the order lives in"""
+    if isinstance(order, ArchivedOrder):
+        return ArchivedOrderItem.objects.filter(order=order)
+    return OrderItem.objects.filter(order=order)
@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.profiles import archive
+
+
+class Command(BaseCommand):
+    help = (
+        "Moves completed orders older than the cutoff with their items "
+        "into the archive tables, one batch per transaction"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days", type=int, default=settings.ORDER_ARCHIVE["AFTER_DAYS"],
+            help="Archive orders created more than this many days ago"
+        )
+        parser.add_argument(
+            "--batch-size", type=int,
+            default=settings.ORDER_ARCHIVE["BATCH_SIZE"],
+            help="Number of orders moved per transaction"
+        )
+        parser.add_argument(
+            "--max-batches", type=int,
+            help="Stop after this many batches"
+        )
+
+    def handle(self, *args, **options):
+        archived = archive.archive_orders(
+            days=options["days"],
+            batch_size=options["batch_size"],
+            max_batches=options["max_batches"],
+        )
+        self.stdout.write(f"Archived {archived} orders")
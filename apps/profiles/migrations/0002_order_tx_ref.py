@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 23:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='tx_ref',
+            field=models.CharField(blank=True, max_length=100, null=True, unique=True),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from apps.accounts.models import User
+from apps.common.managers import GetOrNoneManager
 from apps.common.models import BaseModel
 from apps.common.utils import generate_unique_code
 from apps.shop.models import Product
@@ -21,6 +22,33 @@ PAYMENT_STATUS_CHOICES = (
     ("FAILED", "FAILED"),
 )
 
+# Допустимые переходы статусов: текущий статус -> возможные следующие
+STATUS_TRANSITIONS = {
+    "delivery_status": {
+        "PENDING": ("PACKING",),
+        "PACKING": ("SHIPPING",),
+        "SHIPPING": ("ARRIVING", "SUCCESS"),
+        "ARRIVING": ("SUCCESS",),
+        "SUCCESS": (),
+    },
+    "payment_status": {
+        "PENDING": ("PROCESSING", "CANCELLED"),
+        "PROCESSING": ("SUCCESSFUL", "FAILED", "CANCELLED"),
+        "FAILED": ("PROCESSING", "CANCELLED"),
+        "SUCCESSFUL": (),
+        "CANCELLED": (),
+    },
+}
+
+
+def allowed_sources(field: str, target: str) -> list[str]:
+    """Statuses an order may have to be moved to `target`"""
+    return [
+        source
+        for source, targets in STATUS_TRANSITIONS[field].items()
+        if target in targets
+    ]
+
 
 class ShippingAddress(BaseModel):
 
@@ -40,11 +68,11 @@ class ShippingAddress(BaseModel):
         return f"{self.full_name}' shipping details"
 
 
-class Order(BaseModel):
+class OrderDetails(models.Model):
+    """Поля и расчёты, общие для заказа и его архивной копии"""
 
-    user = models.ForeignKey(
-        User, on_delete=models.CASCADE,
-        related_name="orders"
+    tx_ref = models.CharField(
+        max_length=100, unique=True, null=True, blank=True
     )
     delivery_status = models.CharField(
         max_length=20, default="PENDING", choices=DELIVERY_STATUS_CHOICES
@@ -63,13 +91,8 @@ class Order(BaseModel):
     country = models.CharField(max_length=100, null=True)
     zipcode = models.CharField(max_length=6, null=True)
 
-    def __str__(self):
-        return f"{self.user.full_name}'s order"
-
-    def save(self, *args, **kwargs):
-        if not self.created_at:
-            self.tx_ref = generate_unique_code(Order, "tx_ref")
-        super().save(*args, **kwargs)
+    class Meta:
+        abstract = True
 
     @property
     def get_cart_subtotal(self):
@@ -83,6 +106,33 @@ class Order(BaseModel):
         return total
 
 
+class Order(BaseModel, OrderDetails):
+
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE,
+        related_name="orders"
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at"], name="order_created_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.user.full_name}'s order"
+
+    @staticmethod
+    def new_tx_ref():
+        # Архивные заказы ищутся по тому же tx_ref, см. find_order
+        return generate_unique_code(Order, "tx_ref", also=(ArchivedOrder,))
+
+    def save(self, *args, **kwargs):
+        # CheckoutView выдаёт tx_ref заранее, до резервирования остатка
+        if not self.created_at and not self.tx_ref:
+            self.tx_ref = self.new_tx_ref()
+        super().save(*args, **kwargs)
+
+
 class OrderItem(BaseModel):
 
     user = models.ForeignKey(
@@ -97,3 +147,68 @@ class OrderItem(BaseModel):
         Product, on_delete=models.CASCADE
     )
     quantity = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        indexes = [
+            # Корзины - строки без заказа, их ищут по пользователю
+            models.Index(
+                fields=["user"], condition=models.Q(order__isnull=True),
+                name="orderitem_cart_idx"
+            ),
+        ]
+
+    @property
+    def get_total(self):
+        return self.product.price_current * self.quantity
+
+
+class ArchivedOrder(OrderDetails):
+    """
+    Завершённый заказ, перенесённый из Order командой archive_orders.
+    id, created_at и updated_at сохраняются как были
+    """
+    id = models.UUIDField(primary_key=True, editable=False)
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE,
+        related_name="archived_orders"
+    )
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    objects = GetOrNoneManager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["user", "created_at", "id"],
+                name="archived_order_history_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user.full_name}'s archived order"
+
+
+class ArchivedOrderItem(models.Model):
+    """Позиция архивного заказа"""
+    id = models.UUIDField(primary_key=True, editable=False)
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, null=True, blank=True
+    )
+    order = models.ForeignKey(
+        ArchivedOrder, on_delete=models.CASCADE,
+        related_name="orderitems"
+    )
+    product = models.ForeignKey(
+        Product, on_delete=models.CASCADE
+    )
+    quantity = models.PositiveIntegerField(default=1)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+
+    objects = GetOrNoneManager()
+
+    @property
+    def get_total(self):
+        return self.product.price_current * self.quantity
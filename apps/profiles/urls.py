@@ -1,7 +1,8 @@
 from django.urls import path
 
 from apps.profiles.views import (
-    ProfileView, ShippingAddressesView, ShippingAddressViewID
+    ProfileView, ShippingAddressesView, ShippingAddressViewID,
+    OrdersView, OrderHistoryView, OrderItemsView
 )
 
 
@@ -15,4 +16,13 @@ urlpatterns = [
     path(
         "shipping_addresses/detail/<uuid:id>/", ShippingAddressViewID.as_view()
         ),
+    path(
+        "orders/", OrdersView.as_view()
+    ),
+    path(
+        "orders/history/", OrderHistoryView.as_view()
+    ),
+    path(
+        "orders/<str:tx_ref>/", OrderItemsView.as_view()
+    ),
 ]
@@ -5,11 +5,16 @@ from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from apps.common.paginations import KeysetCursorPagination
+from apps.common.serializers import SparseFieldset
 from apps.common.utils import set_dict_attr
+from apps.profiles import archive
 from apps.profiles.serializers import (
     ProfileSerializer, ShippingAddressSerializer,
 )
-from apps.profiles.models import ShippingAddress, Order, OrderItem
+from apps.profiles.models import ArchivedOrder, ShippingAddress, Order
+from apps.shop import inventory
+from apps.shop.schema_examples import SPARSE_FIELDSET_PARAMS
 from apps.shop.serializers import OrderSerializer, CheckItemOrderSerializer
 
 
@@ -187,24 +192,57 @@ class OrdersView(APIView):
         operation_id="orders_view",
         summary="Orders Fetch",
         description=(
-            "This endpoint return all orders for a particular user"
+            "This endpoint return recent orders for a particular user.\n"
+            "Archived orders are listed by orders/history/"
         ),
-        tags=tags
+        tags=tags,
+        parameters=SPARSE_FIELDSET_PARAMS,
     )
     def get(self, request):
         user = request.user
-        orders = (
+        fieldset = SparseFieldset.from_request(request)
+        orders = fieldset.trim_queryset(
             Order.objects.filter(user=user)
             .select_related("user")
             .prefetch_related("orderitems", "orderitems__product")
-            .order_by("-created_at")
+            .order_by("-created_at"),
+            self.serializer_class
+        )
+        serializer = fieldset.serialize(
+            self.serializer_class, orders, many=True
         )
-        serializer = self.serializer_class(orders, many=True)
         return Response(
             data=serializer.data, status=200
         )
     
 
+class OrderHistoryView(APIView):
+    permission_classes = [IsOwner]
+    serializer_class = OrderSerializer
+    pagination_class = KeysetCursorPagination
+
+    @extend_schema(
+        operation_id="order_history_view",
+        summary="Order History Fetch",
+        description=(
+            "This endpoint returns all orders of a user, newest first,\n"
+            "paging through recent and archived orders as one list"
+        ),
+        tags=tags,
+    )
+    def get(self, request):
+        querysets = [
+            model.objects.filter(user=request.user)
+            .select_related("user")
+            .prefetch_related("orderitems", "orderitems__product")
+            for model in (Order, ArchivedOrder)
+        ]
+        paginator = self.pagination_class()
+        page = paginator.paginate_querysets(querysets, request, view=self)
+        serializer = self.serializer_class(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+
 class OrderItemsView(APIView):
     permission_classes = [IsOwner]
     serializer_class = CheckItemOrderSerializer
@@ -215,18 +253,30 @@ class OrderItemsView(APIView):
         description=(
             "This endpoint returns all items order for a particular user"
         ),
-        tags=tags
+        tags=tags,
+        parameters=SPARSE_FIELDSET_PARAMS,
     )
     def get(self, request, **kwargs):
-        order = Order.objects.get_or_none(tx_ref=kwargs["tx_ref"])
-        if not order or order.user != request.user:
+        order = archive.find_order(kwargs["tx_ref"])
+        if not order or order.user_id != request.user.id:
             return Response(
                 data={
                     "message": "Order does not exist!"
                 }, status=404
             )
-        order_items = OrderItem.objects.filter(order=order)
-        serializer = self.serializer_class(order_items, many=True)
+        fieldset = SparseFieldset.from_request(request)
+        order_items = fieldset.trim_queryset(
+            archive.order_items(order)
+            .select_related(
+                "product", "product__category",
+                "product__seller", "product__seller__user"
+            ),
+            self.serializer_class
+        )
+        inventory.attach_stock(order_items, "product")
+        serializer = fieldset.serialize(
+            self.serializer_class, order_items, many=True
+        )
         return Response(
             data=serializer.data, status=200
         )
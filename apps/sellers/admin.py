@@ -1,3 +1,13 @@
 from django.contrib import admin
 
-# Register your models here.
+from apps.common.admin import ScalableModelAdmin
+from apps.sellers.models import Seller
+
+
+@admin.register(Seller)
+class SellerAdmin(ScalableModelAdmin):
+    list_display = ("business_name", "user", "city", "is_approved")
+    list_select_related = ("user",)
+    list_filter = ("is_approved",)
+    search_fields = ("^business_name", "=user__email")
+    autocomplete_fields = ("user",)
@@ -0,0 +1,95 @@
+import uuid
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.cache import cache
+
+from apps.sellers.models import Seller
+
+
+@dataclass(frozen=True)
+class SellerContext:
+    """What seller views need to authorize a request: no full Seller row"""
+    id: uuid.UUID
+    is_approved: bool
+
+
+def approval_cache_key(seller_id):
+    return f"seller-approved:{seller_id}"
+
+
+def remember_approval(seller_id, is_approved):
+    """
+    Only approval is cached: an unapproved seller is always checked in
+    the database, so a freshly approved one does not have to log in again
+    """
+    key = approval_cache_key(seller_id)
+    if is_approved:
+        cache.set(key, True, settings.SELLER_APPROVAL_CACHE_TTL)
+    else:
+        cache.delete(key)
+
+
+def forget_approval(seller_id):
+    cache.delete(approval_cache_key(seller_id))
+
+
+def load_seller(user):
+    """SellerContext of the user from the database, None if not a seller"""
+    row = (
+        Seller.objects
+        .filter(user=user)
+        .values_list("id", "is_approved")
+        .first()
+    )
+    if row is None:
+        return None
+    remember_approval(*row)
+    return SellerContext(*row)
+
+
+def seller_claims(user):
+    """Claims MyTokenObtainPairSerializer puts into tokens of sellers"""
+    context = load_seller(user)
+    if context is None:
+        return {}
+    return {"seller_id": str(context.id)}
+
+
+def get_seller(request):
+    """
+    The seller of the request user or None, resolved once per request and
+    shared by permissions and views.
+
+    With SELLER_TOKEN_CLAIMS the seller id comes from the token and the
+    approval from a cache entry living SELLER_APPROVAL_CACHE_TTL seconds,
+    so a token refresh can't carry a revoked approval over. Seller.save
+    drops the entry in the default cache: with the per-process cache of
+    the shipped settings a revocation is immediate in the saving worker
+    and takes up to the TTL in the others. Without a cached approval the
+    seller is read from the database.
+    """
+    try:
+        return request._seller_context
+    except AttributeError:
+        pass
+
+    context = None
+    user = request.user
+    token = getattr(request, "auth", None)
+    seller_id = token.get("seller_id") if hasattr(token, "get") else None
+    if not user.is_authenticated:
+        pass
+    elif (
+            settings.SELLER_TOKEN_CLAIMS
+            and seller_id
+            and cache.get(approval_cache_key(seller_id))
+    ):
+        context = SellerContext(uuid.UUID(seller_id), True)
+    elif "seller" in user._state.fields_cache:
+        seller = user.seller
+        context = SellerContext(seller.id, seller.is_approved)
+    else:
+        context = load_seller(user)
+    request._seller_context = context
+    return context
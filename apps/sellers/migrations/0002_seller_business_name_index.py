@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 01:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sellers', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='seller',
+            name='business_name',
+            field=models.CharField(db_index=True, max_length=255),
+        ),
+    ]
@@ -11,7 +11,8 @@ class Seller(BaseModel):
         related_name="seller"
     )
 
-    business_name = models.CharField(max_length=255)
+    # Индекс для поиска по началу названия в админке, см. Product.name
+    business_name = models.CharField(max_length=255, db_index=True)
     slug = AutoSlugField(
         populate_from="business_name",
         always_update=True, null=True
@@ -36,3 +37,16 @@ class Seller(BaseModel):
 
     def __str__(self):
         return f"Seller for {self.business_name}"
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # Одобрение из кэша больше не действует; в других воркерах при
+        # кэше в памяти процесса - до SELLER_APPROVAL_CACHE_TTL, см.
+        # apps.sellers.context.get_seller
+        from apps.sellers.context import forget_approval
+        forget_approval(self.pk)
+
+    def delete(self, *args, **kwargs):
+        from apps.sellers.context import forget_approval
+        forget_approval(self.pk)
+        return super().delete(*args, **kwargs)
@@ -1,4 +1,7 @@
 from rest_framework import serializers
+from apps.profiles.models import (
+    DELIVERY_STATUS_CHOICES, PAYMENT_STATUS_CHOICES
+)
 from apps.shop.serializers import ProductSerializer
 
 
@@ -20,3 +23,23 @@ class SellerSerializer(serializers.Serializer):
     bank_routing_number = serializers.CharField(max_length=50)
 
     is_approved = serializers.BooleanField(read_only=True)
+
+
+class BulkOrderStatusSerializer(serializers.Serializer):
+    tx_refs = serializers.ListField(
+        child=serializers.CharField(max_length=100),
+        min_length=1, max_length=10000
+    )
+    delivery_status = serializers.ChoiceField(
+        choices=DELIVERY_STATUS_CHOICES, required=False
+    )
+    payment_status = serializers.ChoiceField(
+        choices=PAYMENT_STATUS_CHOICES, required=False
+    )
+
+    def validate(self, attrs):
+        if not attrs.keys() & {"delivery_status", "payment_status"}:
+            raise serializers.ValidationError(
+                "Provide delivery_status and/or payment_status"
+            )
+        return attrs
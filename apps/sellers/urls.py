@@ -2,7 +2,8 @@ from django.urls import path
 
 from apps.sellers.views import (
     SellersView, SellerProductsView, SellerProductView,
-    SellerOrdersView, SellerOrderItemsView, ProductReviewsView
+    SellerOrdersView, SellerOrderItemsView, ProductReviewsView,
+    SellerOrdersStatusView
 )
 
 
@@ -23,6 +24,9 @@ urlpatterns = [
     path(
         "orders/", SellerOrdersView.as_view()
     ),
+    path(
+        "orders/status/", SellerOrdersStatusView.as_view()
+    ),
     path(
         "orders/<str:tx_ref>/", SellerOrderItemsView.as_view()
     ),
@@ -1,11 +1,10 @@
-from email.policy import default
 from apps.accounts.models import User
-from apps.shop.models import Product, Review
+from apps.shop.models import Product, Review, RATING_CHOICES
 from rest_framework.exceptions import (
     NotFound, PermissionDenied, ValidationError
 )
 from rest_framework import status
-from django.db.models import Model, Avg
+from django.db.models import Model, Avg, Count, Q
 
 
 class SellerCheckMixin:
@@ -68,3 +67,29 @@ class SellerCalculateMixin:
                 avg_rating=Avg('rating', default=0)
             )
         )
+
+    def get_product_rating_summary(
+            self, product: Product, model: type[Review]
+    ) -> dict:
+        """
+        Средняя оценка, количество отзывов и распределение оценок
+        считаются одним агрегирующим запросом
+        """
+        buckets = {
+            f"rating_{value}": Count("id", filter=Q(rating=value))
+            for value, _ in RATING_CHOICES
+        }
+        summary = (
+            model.objects
+            .filter(product=product)
+            .aggregate(
+                avg_rating=Avg('rating', default=0),
+                reviews_count=Count("id"),
+                **buckets
+            )
+        )
+        summary["rating_distribution"] = {
+            str(value): summary.pop(f"rating_{value}")
+            for value, _ in RATING_CHOICES
+        }
+        return summary
@@ -1,17 +1,31 @@
-from django.db.models import Avg
+from django.db import transaction
+from django.db.models import Avg, F
+from django.utils import timezone
 
-from drf_spectacular.utils import extend_schema, OpenApiResponse
+from drf_spectacular.utils import (
+    extend_schema, OpenApiParameter, OpenApiResponse, OpenApiTypes
+)
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework import status
 
 from apps.accounts.models import User
+from apps.common.paginations import KeysetCursorPagination
+from apps.common.permissions import IsSeller
+from apps.common.serializers import SparseFieldset
+from apps.common.tasks import enqueue_on_commit
 from apps.common.utils import set_dict_attr
-from apps.profiles.models import Order, OrderItem
+from apps.profiles.models import Order, OrderItem, allowed_sources
+from apps.sellers.context import get_seller
 from apps.sellers.models import Seller
 from apps.sellers.utils import SellerCalculateMixin, SellerCheckMixin
+from apps.shop import inventory
+from apps.shop.lookups import category_slugs, product_slugs
 from apps.shop.models import Category, Product, Review
-from apps.sellers.serializers import SellerSerializer
+from apps.shop.schema_examples import SPARSE_FIELDSET_PARAMS
+from apps.sellers.serializers import (
+    SellerSerializer, BulkOrderStatusSerializer
+)
 from apps.shop.serializers import (
     CreateProductReviewSerializer, ProductSerializer, CreateProductSerializer,
     OrderSerializer, CheckItemOrderSerializer,
@@ -58,22 +72,27 @@ class SellerProductsView(APIView):
             "This endpoint returns all products from a seller\n"
             "Products can be filtered by name, sizes or colors"
         ),
-        tags=tags
+        tags=tags,
+        parameters=SPARSE_FIELDSET_PARAMS,
     )
     def get(self, request, *args, **kwargs):
-        seller = Seller.objects.get_or_none(
-            user=request.user, is_approved=False
-        )
-        if not seller:
+        seller = get_seller(request)
+        if seller is None or seller.is_approved:
             return Response(
                 data={
                     "message": "Access is denied"
                 }, status=403
             )
-        products = Product.objects.select_related(
-            "category", "seller", "seller__user"
-        ).filter(seller=seller)
-        serializer = self.serializer_class(products, many=True)
+        fieldset = SparseFieldset.from_request(request)
+        products = fieldset.trim_queryset(
+            Product.objects.select_related(
+                "category", "seller", "seller__user"
+            ).with_stock().filter(seller_id=seller.id),
+            self.serializer_class
+        )
+        serializer = fieldset.serialize(
+            self.serializer_class, products, many=True
+        )
         return Response(
             data=serializer.data, status=200
         )
@@ -89,19 +108,17 @@ class SellerProductsView(APIView):
     )
     def post(self, request, *args, **kwargs):
         serializer = CreateProductSerializer(data=request.data)
-        seller = Seller.objects.get_or_none(
-            user=request.user, is_approved=False
-        )
-        if not seller:
+        seller = get_seller(request)
+        if seller is None or seller.is_approved:
             return Response(data={"message": "Access is denied"}, status=403)
         if serializer.is_valid():
             data = serializer.validated_data
             category_slug = data.pop("category_slug", None)
-            category = Category.objects.get_or_none(slug=category_slug)
+            category = category_slugs.get(category_slug)
             if not category:
                 return Response(data={"message": "Category does not exist!"}, status=404)
             data['category'] = category
-            data['seller'] = seller
+            data['seller_id'] = seller.id
             new_prod = Product.objects.create(**data)
             serializer = self.serializer_class(new_prod)
             return Response(serializer.data, status=201)
@@ -113,8 +130,7 @@ class SellerProductView(APIView):
     serializer_class = CreateProductSerializer
 
     def get_object(self, slug):
-        product = Product.objects.get_or_none(slug=slug)
-        return product
+        return product_slugs.get(slug)
     
     @extend_schema(
         summary="Seller Products Update",
@@ -131,7 +147,8 @@ class SellerProductView(APIView):
                     "message": "Product does not exist!"
                 }, status=404
             )
-        elif product.seller != request.user.seller:
+        seller = get_seller(request)
+        if seller is None or product.seller_id != seller.id:
             return Response(
                 data={
                     "message": "Access is denied"
@@ -140,8 +157,8 @@ class SellerProductView(APIView):
         serializer = self.serializer_class(data=request.data)
         if serializer.is_valid():
             data = serializer.validated_data
-            category_slug = data.pip("category_slug", None)
-            category = Category.objects.get_or_none(slug=category_slug)
+            category_slug = data.pop("category_slug", None)
+            category = category_slugs.get(category_slug)
             if not category:
                 return Response(
                     data={
@@ -151,8 +168,13 @@ class SellerProductView(APIView):
             data["category"] = category
             if data["price_current"] != product.price_current:
                 data["price_old"] = product.price_current
+            # Остаток не перезаписывается: разница с доступным количеством
+            # записывается в журнал как корректировка
+            in_stock = data.pop("in_stock")
             product = set_dict_attr(product, data)
             product.save()
+            inventory.set_available(product, in_stock)
+            product.stock_available = in_stock
             serializer = ProductSerializer(product)
             return Response(
                 data=serializer.data, status=200
@@ -176,7 +198,8 @@ class SellerProductView(APIView):
                     "message": "Product does not exists!"
                 }, status=404
             )
-        elif product.seller != request.user.seller:
+        seller = get_seller(request)
+        if seller is None or product.seller_id != seller.id:
             return Response(
                 data={
                     "message": "Access is denied"
@@ -199,21 +222,135 @@ class SellerOrdersView(APIView):
         description=(
             "This endpoint returns all orders for a particular seller"
         ),
-        tags=tags
+        tags=tags,
+        parameters=SPARSE_FIELDSET_PARAMS,
     )
     def get(self, request):
-        seller = request.user.seller
-        orders = (
+        seller = get_seller(request)
+        if seller is None:
+            return Response(
+                data={
+                    "message": "Access is denied"
+                }, status=403
+            )
+        fieldset = SparseFieldset.from_request(request)
+        orders = fieldset.trim_queryset(
             Order.objects
-            .filter(orderitems__product__seller=seller)
-            .order_by("-created_at")
+            .filter(orderitems__product__seller_id=seller.id)
+            .order_by("-created_at"),
+            self.serializer_class
+        )
+        serializer = fieldset.serialize(
+            self.serializer_class, orders, many=True
         )
-        serializer = self.serializer_class(orders, many=True)
         return Response(
             data=serializer.data, status=200
         )
 
 
+class SellerOrdersStatusView(APIView):
+    permission_classes = [IsSeller]
+    serializer_class = BulkOrderStatusSerializer
+    status_fields = ("delivery_status", "payment_status")
+
+    @extend_schema(
+        operation_id="seller_orders_status",
+        summary="Seller Orders Bulk Status Update",
+        description=(
+            "This endpoint moves many orders of a seller to a new delivery\n"
+            "and/or payment status at once. Only allowed transitions are\n"
+            "applied (e.g. PENDING -> PACKING -> SHIPPING), the response\n"
+            "contains the result for every requested order. Sellers can\n"
+            "only move orders made entirely of their products, payment\n"
+            "status can only be changed by staff"
+        ),
+        request=BulkOrderStatusSerializer,
+        tags=tags
+    )
+    def post(self, request, *args, **kwargs):
+        serializer = self.serializer_class(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        tx_refs = list(dict.fromkeys(data["tx_refs"]))
+        targets = {
+            field: data[field] for field in self.status_fields if field in data
+        }
+        if "payment_status" in targets and not request.user.is_staff:
+            return Response(
+                data={
+                    "message": "Only staff can change payment_status"
+                }, status=403
+            )
+
+        orders = Order.objects.filter(tx_ref__in=tx_refs)
+        shared = set()
+        if not request.user.is_staff:
+            seller_id = get_seller(request).id
+            orders = orders.filter(
+                id__in=OrderItem.objects
+                .filter(product__seller_id=seller_id)
+                .values("order_id")
+            )
+            # Заказы с товарами других продавцов меняет только персонал
+            foreign = (
+                OrderItem.objects
+                .filter(order__isnull=False)
+                .exclude(product__seller_id=seller_id)
+                .values("order_id")
+            )
+            shared = set(
+                orders.filter(id__in=foreign).values_list("tx_ref", flat=True)
+            )
+            orders = orders.exclude(id__in=foreign)
+        with transaction.atomic():
+            current = {
+                row[0]: dict(zip(self.status_fields, row[1:]))
+                for row in (
+                    orders.select_for_update()
+                    .values_list("tx_ref", *self.status_fields)
+                )
+            }
+            updated = 0
+            # По одному UPDATE ... WHERE status IN (...) на каждое поле
+            for field, target in targets.items():
+                changes = {field: target}
+                if field == "delivery_status" and target == "SUCCESS":
+                    changes["date_delivered"] = timezone.now()
+                updated += (
+                    orders
+                    .filter(**{f"{field}__in": allowed_sources(field, target)})
+                    .update(**changes, updated_at=timezone.now())
+                )
+
+        results = [
+            {
+                "tx_ref": tx_ref,
+                "error": "Order contains items of other sellers"
+            } if tx_ref in shared
+            else self.get_result(tx_ref, current.get(tx_ref), targets)
+            for tx_ref in tx_refs
+        ]
+        return Response(
+            data={
+                "updated": updated,
+                "results": results
+            }, status=200
+        )
+
+    def get_result(self, tx_ref, statuses, targets):
+        if statuses is None:
+            return {"tx_ref": tx_ref, "error": "Order does not exist!"}
+        result = {"tx_ref": tx_ref}
+        for field, target in targets.items():
+            source = statuses[field]
+            result[field] = {
+                "from": source,
+                "to": target,
+                "updated": source in allowed_sources(field, target),
+            }
+        return result
+
+
 class SellerOrderItemsView(APIView):
     serializer_class = CheckItemOrderSerializer
 
@@ -226,8 +363,14 @@ class SellerOrderItemsView(APIView):
         tags=tags
     )
     def get(self, request, **kwargs):
-        seller = request.user.seller
-        order = Order.objects.get_or_none(tx_ref(kwargs["tx_ref"]))
+        seller = get_seller(request)
+        if seller is None:
+            return Response(
+                data={
+                    "message": "Access is denied"
+                }, status=403
+            )
+        order = Order.objects.get_or_none(tx_ref=kwargs["tx_ref"])
         if not order:
             return Response(
                 data={
@@ -236,8 +379,13 @@ class SellerOrderItemsView(APIView):
             )
         order_items = (
             OrderItem.objects
-            .filter(order=order, product__seller=seller)
+            .filter(order=order, product__seller_id=seller.id)
+            .select_related(
+                "product", "product__category",
+                "product__seller", "product__seller__user"
+            )
         )
+        inventory.attach_stock(order_items, "product")
         serializer = self.serializer_class(order_items, many=True)
         return Response(
             data=serializer.data, status=200
@@ -250,6 +398,25 @@ class ProductReviewsView(
     """
     Представление ендпоинтов для отзывов
     """
+    pagination_class = KeysetCursorPagination
+    # Каждому порядку сортировки соответствует индекс модели Review,
+    # отзывы без оценки идут в конце
+    review_orderings = {
+        "newest": ("-created_at", "-id"),
+        "highest": (
+            F("rating").desc(nulls_last=True), "-created_at", "-id"
+        ),
+        "lowest": (
+            F("rating").asc(nulls_last=True), "created_at", "id"
+        ),
+    }
+
+    def schedule_rating_update(self, product):
+        """Сохранённая в товаре оценка пересчитывается в фоне"""
+        enqueue_on_commit(
+            "shop.recompute_product_rating", {"product_id": product.id}
+        )
+
     def get_serializer_class(self, method):
         """
         Возвращает соответствующий сериализатор для метода
@@ -265,31 +432,67 @@ class ProductReviewsView(
         summary="Product Review Fetch",
         description=(
             "В этом ендпоинте реализована возможность "
-            "просматривать отзывы о продукте"
+            "просматривать отзывы о продукте постранично. "
+            "Вместе с отзывами возвращается распределение оценок"
         ),
+        parameters=[
+            OpenApiParameter(
+                name="ordering",
+                description="newest (default), highest or lowest",
+                required=False,
+                type=OpenApiTypes.STR,
+            ),
+            OpenApiParameter(
+                name="cursor",
+                description="Cursor of the next page from the `next` link",
+                required=False,
+                type=OpenApiTypes.STR,
+            ),
+            OpenApiParameter(
+                name="page_size",
+                description="The amount of reviews per page. Defaults to 20",
+                required=False,
+                type=OpenApiTypes.INT,
+            ),
+        ],
         tags=tags
     )
     def get(self, request, *args, **kwargs):
         """
-        Запрашивает все отзывы по продукту
+        Запрашивает страницу отзывов по продукту
         """
         serializer_class = self.get_serializer_class(request.method)
+        ordering = self.review_orderings.get(
+            request.query_params.get("ordering", "newest")
+        )
+        if not ordering:
+            return Response(
+                data={
+                    "message": "Unknown ordering, expected one of: "
+                    + ", ".join(self.review_orderings)
+                }, status=400
+            )
         product = self.check_product(
-            Product.objects.get_or_none(slug=kwargs["slug"])
+            product_slugs.get(kwargs["slug"])
         )
         reviews = (
             Review.objects
             .filter(product=product)
-            .order_by("-created_at")
+            .select_related("user")
+        )
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(
+            reviews, request, view=self, ordering=ordering
         )
-        serializer = serializer_class(reviews, many=True)
-        avg_product_rating = self.get_average_product_rating(
+        serializer = serializer_class(page, many=True)
+        rating_summary = self.get_product_rating_summary(
             product=product, model=Review
         )
         return Response(
             data={
                 "reviews": serializer.data,
-                **avg_product_rating
+                "next": paginator.get_next_link(),
+                **rating_summary
             },
         )
 
@@ -310,7 +513,7 @@ class ProductReviewsView(
         serializer_class = self.get_serializer_class(request.method)
         user = self.check_user(request.user, "BUYER")
         product = self.check_product(
-            Product.objects.get_or_none(slug=kwargs["slug"])
+            product_slugs.get(kwargs["slug"])
         )
         self.check_review_by_unique(
             Review.objects.get_or_none(user=user, product=product)
@@ -321,6 +524,7 @@ class ProductReviewsView(
             data['user'] = user
             data['product'] = product
             new_review = Review.objects.create(**data)
+            self.schedule_rating_update(product)
             serializer = serializer_class(new_review)
             avg_product_rating = self.get_average_product_rating(
                 product=product, model=Review
@@ -348,7 +552,7 @@ class ProductReviewsView(
         serializer_class = self.get_serializer_class(request.method)
         user = self.check_user(request.user, "BUYER")
         product = self.check_product(
-            Product.objects.get_or_none(slug=kwargs["slug"])
+            product_slugs.get(kwargs["slug"])
         )
         review = self.check_review(
             Review.objects.get_or_none(user=user, product=product)
@@ -359,6 +563,7 @@ class ProductReviewsView(
             review.rating = data['rating']
             review.text = data['text']
             review.save()
+            self.schedule_rating_update(product)
             avg_product_rating = self.get_average_product_rating(
                 product=product, model=Review
             )
@@ -386,12 +591,13 @@ class ProductReviewsView(
         """
         user = self.check_user(request.user, "BUYER")
         product = self.check_product(
-            Product.objects.get_or_none(slug=kwargs["slug"])
+            product_slugs.get(kwargs["slug"])
         )
         review = self.check_review(
             Review.objects.get_or_none(user=user, product=product)
         )
         review.delete()
+        self.schedule_rating_update(product)
         return Response(
             data={
                 "message": "Your review has been deleted!"
@@ -1,3 +1,43 @@
 from django.contrib import admin
 
-# Register your models here.
+from apps.common.admin import ScalableModelAdmin
+from apps.shop.models import Category, Product, Review
+
+
+@admin.register(Category)
+class CategoryAdmin(ScalableModelAdmin):
+    list_display = ("name", "slug", "parent", "depth", "product_count")
+    list_select_related = ("parent",)
+    search_fields = ("^name",)
+    autocomplete_fields = ("parent",)
+    readonly_fields = ("path", "depth", "product_count")
+
+
+@admin.register(Product)
+class ProductAdmin(ScalableModelAdmin):
+    list_display = (
+        "name", "seller", "category", "price_current",
+        "in_stock", "rating_avg", "is_deleted"
+    )
+    list_select_related = ("seller", "category")
+    list_filter = ("is_deleted",)
+    search_fields = ("^name", "=slug")
+    autocomplete_fields = ("seller", "category")
+    readonly_fields = ("in_stock", "deleted_at")
+
+    def get_queryset(self, request):
+        # Менеджер по умолчанию скрывает удалённые товары
+        return Product.objects.unfiltered()
+
+
+@admin.register(Review)
+class ReviewAdmin(ScalableModelAdmin):
+    list_display = ("product", "user", "rating", "created_at", "is_deleted")
+    list_select_related = ("product", "user")
+    list_filter = ("rating", "is_deleted")
+    search_fields = ("=product__slug", "=user__email")
+    autocomplete_fields = ("product", "user")
+    readonly_fields = ("deleted_at",)
+
+    def get_queryset(self, request):
+        return Review.objects.unfiltered()
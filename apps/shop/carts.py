@@ -0,0 +1,125 @@
+import json
+import uuid
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.db import transaction
+
+from apps.profiles.models import OrderItem
+from apps.shop.models import Product
+
+
+class GuestCart:
+    """
+    Cart of an anonymous user: a {slug: quantity} mapping kept in a signed
+    cookie or in the cache, so guests never write to the database.
+    """
+    salt = "apps.shop.carts.GuestCart"
+
+    def __init__(self, items=None, cart_id=None):
+        self.items = dict(items or {})
+        self.cart_id = cart_id
+
+    @staticmethod
+    def get_settings():
+        return settings.GUEST_CART
+
+    @classmethod
+    def from_request(cls, request):
+        options = cls.get_settings()
+        value = request.get_signed_cookie(
+            options["COOKIE_NAME"], default=None,
+            salt=cls.salt, max_age=options["MAX_AGE"]
+        )
+        if not value:
+            return cls()
+        if options["STORAGE"] == "cache":
+            return cls(cache.get(cls.cache_key(value)), cart_id=value)
+        try:
+            items = json.loads(value)
+        except ValueError:
+            return cls()
+        return cls(items if isinstance(items, dict) else None)
+
+    @staticmethod
+    def cache_key(cart_id):
+        return f"guest-cart:{cart_id}"
+
+    def __bool__(self):
+        return bool(self.items)
+
+    def set(self, slug, quantity):
+        """Returns False when the cart is full"""
+        if quantity == 0:
+            self.items.pop(slug, None)
+            return True
+        if slug not in self.items and (
+                len(self.items) >= self.get_settings()["MAX_ITEMS"]
+        ):
+            return False
+        self.items[slug] = quantity
+        return True
+
+    def get_orderitems(self):
+        """Unsaved OrderItem objects, so carts share one serializer"""
+        products = (
+            Product.objects
+            .select_related("seller", "seller__user")
+            .filter(slug__in=self.items)
+        )
+        return [
+            OrderItem(product=product, quantity=self.items[product.slug])
+            for product in products
+        ]
+
+    def save(self, response):
+        options = self.get_settings()
+        if options["STORAGE"] == "cache":
+            self.cart_id = self.cart_id or uuid.uuid4().hex
+            cache.set(
+                self.cache_key(self.cart_id), self.items, options["MAX_AGE"]
+            )
+            value = self.cart_id
+        else:
+            value = json.dumps(self.items, separators=(",", ":"))
+        response.set_signed_cookie(
+            options["COOKIE_NAME"], value, salt=self.salt,
+            max_age=options["MAX_AGE"], httponly=True, samesite="Lax"
+        )
+
+    def clear(self, response):
+        if self.cart_id:
+            cache.delete(self.cache_key(self.cart_id))
+        response.delete_cookie(self.get_settings()["COOKIE_NAME"])
+
+    @transaction.atomic
+    def merge_into(self, user):
+        """
+        Folds the guest cart into the user cart: quantities of products
+        already in the user cart are added up, the rest is bulk created.
+        """
+        products = {
+            product.slug: product
+            for product in Product.objects.filter(slug__in=self.items)
+        }
+        existing = {
+            orderitem.product_id: orderitem
+            for orderitem in OrderItem.objects.filter(
+                user=user, order=None, product__in=products.values()
+            )
+        }
+        to_create, to_update = [], []
+        for slug, product in products.items():
+            quantity = self.items[slug]
+            orderitem = existing.get(product.id)
+            if orderitem is None:
+                to_create.append(OrderItem(
+                    user=user, product=product, quantity=quantity
+                ))
+            else:
+                orderitem.quantity += quantity
+                to_update.append(orderitem)
+        OrderItem.objects.bulk_create(to_create)
+        OrderItem.objects.bulk_update(to_update, ["quantity"])
+        return len(to_create) + len(to_update)
@@ -3,12 +3,41 @@ import django_filters
 from apps.shop.models import Product
 
 
-class ProductFilter(django_filters.FilterSet):
+# Допустимые значения ?ordering= и соответствующий order_by. Каждой
+# сортировке соответствует индекс из Product.Meta.indexes, id в конце
+# делает порядок однозначным между страницами
+PRODUCT_ORDERINGS = {
+    "price": ("price_current", "id"),
+    "-price": ("-price_current", "-id"),
+    "newest": ("-created_at", "-id"),
+    "rating": ("-rating_avg", "-rating_count", "-id"),
+    "popularity": ("-rating_count", "-id"),
+}
+
+
+class ProductOrderingFilter(django_filters.FilterSet):
+    ordering = django_filters.ChoiceFilter(
+        choices=[(key, key) for key in PRODUCT_ORDERINGS],
+        method="order_products"
+    )
+
+    class Meta:
+        model = Product
+        fields = ['ordering']
+
+    def order_products(self, queryset, name, value):
+        return queryset.order_by(*PRODUCT_ORDERINGS[value])
+
+
+class ProductFilter(ProductOrderingFilter):
     max_price = django_filters.NumberFilter(field_name='price_current', lookup_expr='lte')
     min_price = django_filters.NumberFilter(field_name='price_current', lookup_expr='gte')
-    in_stock = django_filters.NumberFilter(lookup_expr='gte')
+    # Нужна аннотация ProductQuerySet.with_stock()
+    in_stock = django_filters.NumberFilter(
+        field_name='stock_available', lookup_expr='gte'
+    )
     created_at = django_filters.DateTimeFilter(lookup_expr='gte')
 
     class Meta:
         model = Product
-        fields = ['max_price', 'min_price', 'in_stock', 'created_at']
+        fields = ['max_price', 'min_price', 'in_stock', 'created_at', 'ordering']
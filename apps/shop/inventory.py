@@ -0,0 +1,171 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import F
+
+from apps.common.cache import bump_model_version
+from apps.common.tasks import enqueue_on_commit
+from apps.shop.models import Product, StockMovement
+
+
+class OutOfStock(Exception):
+
+    def __init__(self, product_ids):
+        super().__init__("Not enough stock")
+        self.product_ids = product_ids
+
+
+def available(product_ids) -> dict:
+    """Balance plus uncompacted tail for every product in `product_ids`"""
+    return dict(
+        Product.objects.unfiltered()
+        .with_stock()
+        .filter(id__in=product_ids)
+        .values_list("id", "stock_available")
+    )
+
+
+def attach_stock(instances, field=None):
+    """
+    Sets stock_available in one query on products loaded without
+    with_stock(). With `field` the instances are rows pointing to the
+    product through that foreign key, e.g. order items; products that
+    were not loaded along with them are skipped.
+    """
+    if field is None:
+        products = list(instances)
+    else:
+        products = [
+            getattr(instance, field) for instance in instances
+            if instance._meta.get_field(field).is_cached(instance)
+        ]
+    products = [product for product in products if product is not None]
+    stock = available({product.id for product in products})
+    for product in products:
+        product.stock_available = stock.get(product.id, product.in_stock)
+    return products
+
+
+def record(product, kind, quantity, order_ref=None):
+    """Appends a movement, `quantity` is signed"""
+    movement = StockMovement.objects.create(
+        product=product, kind=kind, quantity=quantity, order_ref=order_ref
+    )
+    schedule_compaction([movement.product_id])
+    return movement
+
+
+def lock(product_ids):
+    """Locks the product rows in id order, so lockers can't deadlock"""
+    return list(
+        Product.objects.unfiltered()
+        .select_for_update()
+        .filter(id__in=product_ids)
+        .order_by("id")
+        .values_list("id", flat=True)
+    )
+
+
+def reserve(quantities, order_ref=None):
+    """
+    Takes stock for {product_id: quantity} without locking anything.
+
+    The sale movements are inserted first and only then the balance is
+    checked. When some product goes below zero the reservation is
+    cancelled with compensating RELEASE movements and OutOfStock is
+    raised, so stock never goes negative. Two buyers racing for the last
+    item may both back off, but concurrent buyers of the same product
+    never wait for each other.
+
+    Call it in autocommit, outside of transaction.atomic: inside a
+    transaction the inserts stay invisible to other buyers until the
+    commit and the balance check misses their reservations. Whatever
+    fails after a successful reserve() has to release() the sales.
+    """
+    sales = StockMovement.objects.bulk_create([
+        StockMovement(
+            product_id=product_id, kind="SALE",
+            quantity=-quantity, order_ref=order_ref
+        )
+        for product_id, quantity in quantities.items()
+    ])
+    short = [
+        product_id
+        for product_id, stock in available(quantities).items()
+        if stock < 0
+    ]
+    if short:
+        release(sales)
+        raise OutOfStock(short)
+    schedule_compaction(quantities)
+    return sales
+
+
+def release(sales):
+    """Cancels reserved `sales` with compensating RELEASE movements"""
+    StockMovement.objects.bulk_create([
+        StockMovement(
+            product_id=sale.product_id, kind="RELEASE",
+            quantity=-sale.quantity, order_ref=sale.order_ref
+        )
+        for sale in sales
+    ])
+    schedule_compaction({sale.product_id for sale in sales})
+
+
+def set_available(product, quantity):
+    """
+    Records the ADJUSTMENT that brings the available stock to `quantity`.
+    The product row stays locked from the read to the insert, so a sale
+    reserved in between is not overwritten by a stale delta
+    """
+    with transaction.atomic():
+        lock([product.id])
+        delta = quantity - available([product.id])[product.id]
+        if delta:
+            record(product, "ADJUSTMENT", delta)
+    return delta
+
+
+def schedule_compaction(product_ids):
+    for product_id in product_ids:
+        enqueue_on_commit("shop.compact_stock", {"product_id": product_id})
+
+
+def compact(product_ids=None, batch_size=1000):
+    """
+    Folds up to `batch_size` uncompacted movements into Product.in_stock.
+    Returns the number of folded movements, 0 when another compactor
+    got to the same rows first.
+    """
+    pending = StockMovement.objects.filter(is_compacted=False)
+    if product_ids is not None:
+        pending = pending.filter(product_id__in=product_ids)
+    rows = list(
+        pending.order_by().values_list("id", "product_id", "quantity")
+        [:batch_size]
+    )
+    if not rows:
+        return 0
+    totals = defaultdict(int)
+    for _, product_id, quantity in rows:
+        totals[product_id] += quantity
+    ids = [row[0] for row in rows]
+    with transaction.atomic():
+        # Marking goes first: if another compactor already folded some of
+        # the rows, roll back instead of applying them twice
+        marked = (
+            StockMovement.objects
+            .filter(id__in=ids, is_compacted=False)
+            .update(is_compacted=True)
+        )
+        if marked != len(ids):
+            transaction.set_rollback(True)
+            return 0
+        for product_id, delta in totals.items():
+            if delta:
+                Product.objects.unfiltered().filter(id=product_id).update(
+                    in_stock=F("in_stock") + delta
+                )
+    bump_model_version(Product)
+    return len(rows)
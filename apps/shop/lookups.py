@@ -0,0 +1,8 @@
+from apps.common.cache import SlugLookupCache
+from apps.shop.models import Category, Product
+
+
+# Кэши slug -> id в памяти воркера, сбрасываются через
+# invalidate_slug_lookups при смене slug или удалении
+product_slugs = SlugLookupCache(Product, maxsize=50000)
+category_slugs = SlugLookupCache(Category, maxsize=5000)
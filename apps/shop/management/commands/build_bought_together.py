@@ -0,0 +1,152 @@
+from collections import Counter, deque
+from datetime import timedelta
+from heapq import merge, nlargest
+from itertools import combinations, groupby
+from operator import itemgetter
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.profiles.models import ArchivedOrderItem, OrderItem
+from apps.shop.models import BoughtTogether, BoughtTogetherBuild
+
+
+class Command(BaseCommand):
+    help = (
+        "Builds the 'frequently bought together' lookup table from order "
+        "lines. By default only orders newer than the previous build are "
+        "read, plus an overlap window for orders committed late"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--top", type=int, default=10,
+            help="Number of neighbours stored per product"
+        )
+        parser.add_argument(
+            "--candidates", type=int, default=200,
+            help="Neighbour counters kept in memory per product while counting"
+        )
+        parser.add_argument(
+            "--max-basket", type=int, default=50,
+            help="Orders with more distinct products are truncated to this size"
+        )
+        parser.add_argument(
+            "--overlap-minutes", type=int, default=60,
+            help=(
+                "Orders created up to this long before the previous build's "
+                "newest order are read again, counted ones are skipped"
+            )
+        )
+        parser.add_argument(
+            "--full", action="store_true",
+            help="Drop the table and rebuild it from all orders, archived too"
+        )
+
+    def handle(self, *args, **options):
+        self.top = options["top"]
+        self.candidates = max(options["candidates"], self.top)
+        build = BoughtTogetherBuild.objects.first() or BoughtTogetherBuild()
+        if options["full"]:
+            build.last_order_created_at = None
+            build.orders_processed = 0
+            build.recent_order_ids = []
+        # created_at ставится до коммита: заказ из долгой транзакции может
+        # появиться после сборки с датой раньше её отметки
+        overlap = timedelta(minutes=options["overlap_minutes"])
+        counted = set(build.recent_order_ids)
+
+        lines = self.order_lines(OrderItem.objects.filter(order__isnull=False))
+        if build.last_order_created_at:
+            lines = lines.filter(
+                order__created_at__gt=build.last_order_created_at - overlap
+            )
+        lines = lines.iterator(chunk_size=2000)
+        if options["full"]:
+            # Архивные заказы старше горячих, но потоки сливаются по дате
+            lines = merge(
+                lines,
+                self.order_lines(ArchivedOrderItem.objects.all())
+                .iterator(chunk_size=2000),
+                key=itemgetter(1, 0)
+            )
+
+        # Разреженная матрица совместных покупок: product -> Counter(соседей)
+        matrix = {}
+        orders = 0
+        last_created_at = build.last_order_created_at
+        # Учтённые заказы за последние overlap от самого нового прочитанного
+        recent = deque()
+        for (order_id, created_at), rows in groupby(
+                lines, key=itemgetter(0, 1)
+        ):
+            if last_created_at is None or created_at > last_created_at:
+                last_created_at = created_at
+            recent.append((created_at, str(order_id)))
+            while recent and recent[0][0] <= last_created_at - overlap:
+                recent.popleft()
+            if str(order_id) in counted:
+                continue
+            basket = sorted({row[2] for row in rows})[:options["max_basket"]]
+            for first, second in combinations(basket, 2):
+                self.count(matrix, first, second)
+                self.count(matrix, second, first)
+            orders += 1
+
+        with transaction.atomic():
+            if options["full"]:
+                BoughtTogether.objects.all().delete()
+            written = self.write(matrix)
+            build.last_order_created_at = last_created_at
+            build.recent_order_ids = [order_id for _, order_id in recent]
+            build.orders_processed += orders
+            build.save()
+        self.stdout.write(
+            f"Processed {orders} orders, "
+            f"updated neighbours of {len(matrix)} products ({written} rows)"
+        )
+
+    def order_lines(self, items):
+        return (
+            items
+            .order_by("order__created_at", "order_id")
+            .values_list("order_id", "order__created_at", "product_id")
+        )
+
+    def count(self, matrix, product_id, other_id):
+        neighbours = matrix.setdefault(product_id, Counter())
+        neighbours[other_id] += 1
+        # Отсечение редких соседей держит память в пределах 2 * candidates
+        if len(neighbours) > 2 * self.candidates:
+            matrix[product_id] = Counter(
+                dict(neighbours.most_common(self.candidates))
+            )
+
+    def write(self, matrix):
+        product_ids = list(matrix)
+        written = 0
+        for start in range(0, len(product_ids), 500):
+            chunk = product_ids[start:start + 500]
+            existing = (
+                BoughtTogether.objects
+                .filter(product_id__in=chunk)
+                .values_list("product_id", "recommended_id", "score")
+            )
+            for product_id, recommended_id, score in existing:
+                matrix[product_id][recommended_id] += score
+            rows = [
+                BoughtTogether(
+                    product_id=product_id, recommended_id=recommended_id,
+                    score=score, rank=rank
+                )
+                for product_id in chunk
+                for rank, (recommended_id, score) in enumerate(
+                    nlargest(self.top, matrix[product_id].items(),
+                             key=itemgetter(1)),
+                    start=1
+                )
+            ]
+            BoughtTogether.objects.filter(product_id__in=chunk).delete()
+            BoughtTogether.objects.bulk_create(rows, batch_size=500)
+            written += len(rows)
+        return written
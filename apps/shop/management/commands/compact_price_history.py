@@ -0,0 +1,90 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from apps.shop.models import PriceHistory, PriceHistoryDaily
+
+
+class Command(BaseCommand):
+    help = (
+        "Folds price history older than the retention window into daily "
+        "min/max/close buckets and removes the folded rows"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--retention-days", type=int, default=90,
+            help="Raw price changes younger than this are kept as is"
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=200,
+            help="Number of products compacted per transaction"
+        )
+
+    def handle(self, *args, **options):
+        cutoff = (
+            timezone.now() - timedelta(days=options["retention_days"])
+        ).replace(hour=0, minute=0, second=0, microsecond=0)
+        expired = PriceHistory.objects.filter(created_at__lt=cutoff)
+        product_ids = list(
+            expired.values_list("product_id", flat=True)
+            .distinct().order_by("product_id")
+        )
+        batch_size = options["batch_size"]
+        compacted = 0
+        for start in range(0, len(product_ids), batch_size):
+            batch = product_ids[start:start + batch_size]
+            compacted += self.compact(expired.filter(product_id__in=batch))
+        self.stdout.write(
+            f"Compacted {compacted} price changes of "
+            f"{len(product_ids)} products older than {cutoff:%Y-%m-%d}"
+        )
+
+    @transaction.atomic
+    def compact(self, rows):
+        buckets = {}
+        count = 0
+        ordered = (
+            rows.order_by("product_id", "created_at", "id")
+            .values_list("product_id", "created_at", "price")
+        )
+        for product_id, created_at, price in ordered.iterator():
+            key = (product_id, timezone.localdate(created_at))
+            bucket = buckets.get(key)
+            if bucket is None:
+                buckets[key] = [price, price, price]
+            else:
+                bucket[0] = min(bucket[0], price)
+                bucket[1] = max(bucket[1], price)
+                bucket[2] = price
+            count += 1
+
+        existing = {
+            (daily.product_id, daily.day): daily
+            for daily in PriceHistoryDaily.objects.filter(
+                product_id__in={product_id for product_id, _ in buckets},
+                day__in={day for _, day in buckets},
+            )
+        }
+        to_create, to_update = [], []
+        for (product_id, day), (low, high, close) in buckets.items():
+            daily = existing.get((product_id, day))
+            if daily is None:
+                to_create.append(PriceHistoryDaily(
+                    product_id=product_id, day=day,
+                    price_min=low, price_max=high, price_close=close
+                ))
+                continue
+            daily.price_min = min(daily.price_min, low)
+            daily.price_max = max(daily.price_max, high)
+            daily.price_close = close
+            to_update.append(daily)
+        PriceHistoryDaily.objects.bulk_create(to_create, batch_size=500)
+        PriceHistoryDaily.objects.bulk_update(
+            to_update, ["price_min", "price_max", "price_close"],
+            batch_size=500
+        )
+        rows.delete()
+        return count
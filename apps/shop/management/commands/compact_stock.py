@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from apps.shop import inventory
+
+
+class Command(BaseCommand):
+    help = (
+        "Folds uncompacted stock movements into the cached Product.in_stock "
+        "balance"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=1000,
+            help="Number of movements folded per transaction"
+        )
+
+    def handle(self, *args, **options):
+        compacted = 0
+        while True:
+            folded = inventory.compact(batch_size=options["batch_size"])
+            if not folded:
+                break
+            compacted += folded
+        self.stdout.write(f"Compacted {compacted} stock movements")
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from apps.shop.models import Category
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes subtree product counters and price ranges of all "
+        "categories, fixing any drift of the incremental updates"
+    )
+
+    def handle(self, *args, **options):
+        counts = Category.objects.rebuild_product_counts()
+        ranges = Category.objects.rebuild_price_ranges()
+        self.stdout.write(
+            f"Fixed product counts of {counts} and price ranges of "
+            f"{ranges} categories"
+        )
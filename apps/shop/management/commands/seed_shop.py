@@ -0,0 +1,363 @@
+import itertools
+import random
+import time
+import uuid
+from bisect import bisect
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Avg, Count, OuterRef, Subquery, Value
+from django.db.models.functions import Cast, Coalesce
+from django.utils import timezone
+
+from apps.accounts.models import User
+from apps.common.cache import bump_model_version
+from apps.profiles.models import (
+    DELIVERY_STATUS_CHOICES, PAYMENT_STATUS_CHOICES, Order, OrderItem
+)
+from apps.sellers.models import Seller
+from apps.shop.models import Category, Product, Review
+
+
+FIRST_NAMES = (
+    "Anna", "Boris", "Daria", "Egor", "Irina", "Kirill", "Maria", "Nikita",
+    "Olga", "Pavel", "Sofia", "Timur", "Vera", "Yuri", "Alice", "Tom",
+)
+LAST_NAMES = (
+    "Ivanova", "Petrov", "Smirnova", "Kuznetsov", "Popova", "Volkov",
+    "Sokolova", "Lebedev", "Novikova", "Morozov", "Smith", "Brown",
+)
+ADJECTIVES = (
+    "Classic", "Compact", "Deluxe", "Eco", "Essential", "Light", "Pro",
+    "Smart", "Sport", "Ultra", "Vintage", "Wireless",
+)
+NOUNS = (
+    "Backpack", "Blender", "Camera", "Chair", "Headphones", "Jacket",
+    "Kettle", "Lamp", "Mug", "Notebook", "Sneakers", "Speaker", "Watch",
+)
+# J-образное распределение оценок, как в реальных отзывах
+RATING_WEIGHTS = {5: 45, 4: 25, 3: 12, 2: 7, 1: 11}
+
+
+class Command(BaseCommand):
+    help = (
+        "Fills the database with a synthetic shop: users, sellers, "
+        "categories, products with Zipf-distributed popularity, carts, "
+        "orders and reviews. Rows are inserted with bulk_create in chunks "
+        "and the same --seed always produces the same data"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=10000)
+        parser.add_argument("--sellers", type=int, default=200)
+        parser.add_argument("--categories", type=int, default=60)
+        parser.add_argument("--products", type=int, default=20000)
+        parser.add_argument("--orders", type=int, default=30000)
+        parser.add_argument("--reviews", type=int, default=50000)
+        parser.add_argument(
+            "--carts", type=int, default=2000,
+            help="Number of users with a non-empty cart"
+        )
+        parser.add_argument(
+            "--days", type=int, default=365,
+            help="Orders and reviews are spread over this many past days"
+        )
+        parser.add_argument(
+            "--zipf", type=float, default=1.1,
+            help="Exponent of the product popularity distribution"
+        )
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--chunk-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.random = random.Random(options["seed"])
+        self.now = timezone.now()
+        started = time.perf_counter()
+
+        user_ids = self.create_users()
+        seller_ids = self.create_sellers(user_ids)
+        category_ids = self.create_categories()
+        product_ids = self.create_products(seller_ids, category_ids)
+        popularity = self.popularity_weights(len(product_ids))
+        self.create_carts(user_ids, product_ids, popularity)
+        self.create_orders(user_ids, product_ids, popularity)
+        self.create_reviews(user_ids, product_ids, popularity)
+        self.update_aggregates()
+
+        self.stdout.write(
+            f"Seeded in {time.perf_counter() - started:.1f} s"
+        )
+
+    def make_id(self):
+        return uuid.UUID(int=self.random.getrandbits(128), version=4)
+
+    def random_past(self):
+        return self.now - timedelta(
+            seconds=self.random.randrange(self.options["days"] * 86400)
+        )
+
+    def bulk_create(self, model, rows, label, total=None, dated=False):
+        """
+        Inserts `rows` in chunks. bulk_create lets auto_now_add and
+        auto_now overwrite the dates, so with `dated` the created_at and
+        updated_at set on the rows are written back with bulk_update.
+        """
+        chunk_size = self.options["chunk_size"]
+        started = time.perf_counter()
+        done = 0
+        rows = iter(rows)
+        while chunk := list(itertools.islice(rows, chunk_size)):
+            if dated:
+                dates = [(row.created_at, row.updated_at) for row in chunk]
+            with transaction.atomic():
+                model.objects.bulk_create(chunk, batch_size=chunk_size)
+                if dated:
+                    for row, (created_at, updated_at) in zip(chunk, dates):
+                        row.created_at = created_at
+                        row.updated_at = updated_at
+                    model.objects.bulk_update(
+                        chunk, ["created_at", "updated_at"], batch_size=100
+                    )
+            done += len(chunk)
+            rate = done / max(time.perf_counter() - started, 1e-9)
+            progress = f"{done:,}/{total:,}" if total else f"{done:,}"
+            self.stdout.write(f"{label}: {progress} ({rate:,.0f} rows/s)")
+
+    def create_users(self):
+        password = make_password("password")
+        total = self.options["users"]
+        ids = [self.make_id() for _ in range(total)]
+        sellers = self.options["sellers"]
+        rows = (
+            User(
+                id=user_id,
+                email=f"user{number}@seed.local",
+                first_name=self.random.choice(FIRST_NAMES),
+                last_name=self.random.choice(LAST_NAMES),
+                password=password,
+                account_type="SELLER" if number < sellers else "BUYER",
+            )
+            for number, user_id in enumerate(ids)
+        )
+        self.bulk_create(User, rows, "users", total)
+        return ids
+
+    def create_sellers(self, user_ids):
+        total = min(self.options["sellers"], len(user_ids))
+        ids = [self.make_id() for _ in range(total)]
+        rows = (
+            Seller(
+                id=seller_id,
+                user_id=user_ids[number],
+                business_name=(
+                    f"{self.random.choice(ADJECTIVES)} Store {number}"
+                ),
+                slug=f"store-{number}",
+                inn_identification_number=str(
+                    self.random.randrange(10 ** 11, 10 ** 12)
+                ),
+                phone_number=f"+7{self.random.getrandbits(32):010d}",
+                business_description="Synthetic seller",
+                business_address=f"{number} Market street",
+                city=self.random.choice(("Moscow", "Kazan", "Omsk")),
+                postal_code=f"{self.random.randrange(10 ** 5, 10 ** 6)}",
+                bank_name="Seed Bank",
+                bank_bic_number=f"{self.random.getrandbits(29):09d}",
+                bank_account_number=f"{self.random.getrandbits(64)}",
+                bank_routing_number=f"{self.random.getrandbits(29):09d}",
+                is_approved=self.random.random() < 0.8,
+            )
+            for number, seller_id in enumerate(ids)
+        )
+        # AutoSlugField keeps the given slug, but still checks that it is
+        # unique with one indexed query per row
+        self.bulk_create(Seller, rows, "sellers", total)
+        return ids
+
+    def create_categories(self):
+        # Тысячи строк максимум: save() строит материализованный путь
+        total = self.options["categories"]
+        roots = max(1, total // 10)
+        categories = []
+        for number in range(total):
+            parent = (
+                None if number < roots
+                else categories[self.random.randrange(len(categories))]
+            )
+            if parent is not None and parent.depth >= 2:
+                parent = categories[self.random.randrange(roots)]
+            category = Category(
+                id=self.make_id(),
+                name=f"{self.random.choice(NOUNS)}s {number}",
+                parent=parent,
+                image="category_images/default.jpg",
+            )
+            category.save()
+            categories.append(category)
+        self.stdout.write(f"categories: {total:,}")
+        return [category.id for category in categories]
+
+    def create_products(self, seller_ids, category_ids):
+        total = self.options["products"]
+        ids = [self.make_id() for _ in range(total)]
+
+        def rows():
+            for number, product_id in enumerate(ids):
+                # Логнормальные цены: много дешёвых товаров, мало дорогих
+                price = Decimal(
+                    f"{min(self.random.lognormvariate(7, 1.2), 9999999):.2f}"
+                )
+                name = (
+                    f"{self.random.choice(ADJECTIVES)} "
+                    f"{self.random.choice(NOUNS)} {number}"
+                )
+                yield Product(
+                    id=product_id,
+                    seller_id=self.random.choice(seller_ids),
+                    category_id=self.random.choice(category_ids),
+                    name=name,
+                    slug=f"product-{number}",
+                    desc=f"{name}, synthetic product",
+                    price_current=price,
+                    price_old=(
+                        (price * Decimal("1.2")).quantize(Decimal("0.01"))
+                        if self.random.random() < 0.2 else None
+                    ),
+                    in_stock=self.random.randrange(0, 500),
+                    image1="product_images/default.jpg",
+                )
+
+        self.bulk_create(Product, rows(), "products", total)
+        return ids
+
+    def popularity_weights(self, count):
+        """Cumulative Zipf weights: product number k is drawn ~ 1 / k^s"""
+        exponent = self.options["zipf"]
+        return list(itertools.accumulate(
+            1 / rank ** exponent for rank in range(1, count + 1)
+        ))
+
+    def pick_product(self, popularity):
+        return bisect(popularity, self.random.random() * popularity[-1])
+
+    def create_carts(self, user_ids, product_ids, popularity):
+        total = min(self.options["carts"], len(user_ids))
+        owners = self.random.sample(user_ids, total)
+
+        def rows():
+            for user_id in owners:
+                for number in {
+                    self.pick_product(popularity)
+                    for _ in range(self.random.randint(1, 4))
+                }:
+                    yield OrderItem(
+                        id=self.make_id(),
+                        user_id=user_id,
+                        product_id=product_ids[number],
+                        quantity=self.random.randint(1, 3),
+                    )
+
+        self.bulk_create(OrderItem, rows(), "cart items")
+
+    def create_orders(self, user_ids, product_ids, popularity):
+        total = self.options["orders"]
+        delivery = [choice for choice, _ in DELIVERY_STATUS_CHOICES]
+        payment = [choice for choice, _ in PAYMENT_STATUS_CHOICES]
+        orders = []
+
+        def order_rows():
+            for number in range(total):
+                created_at = self.random_past()
+                order = Order(
+                    id=self.make_id(),
+                    user_id=self.random.choice(user_ids),
+                    tx_ref=f"SEED{number:010d}",
+                    delivery_status=self.random.choice(delivery),
+                    payment_status=self.random.choice(payment),
+                    created_at=created_at,
+                    updated_at=created_at,
+                )
+                orders.append((order.id, order.user_id, created_at))
+                yield order
+
+        def item_rows():
+            for order_id, user_id, created_at in orders:
+                for number in {
+                    self.pick_product(popularity)
+                    for _ in range(self.random.randint(1, 4))
+                }:
+                    yield OrderItem(
+                        id=self.make_id(),
+                        user_id=user_id,
+                        order_id=order_id,
+                        product_id=product_ids[number],
+                        quantity=self.random.randint(1, 3),
+                        created_at=created_at,
+                        updated_at=created_at,
+                    )
+
+        self.bulk_create(Order, order_rows(), "orders", total, dated=True)
+        self.bulk_create(OrderItem, item_rows(), "order items", dated=True)
+
+    def create_reviews(self, user_ids, product_ids, popularity):
+        # Один отзыв на пару (пользователь, товар): представления отзывов
+        # ищут его через get_or_none
+        total = min(self.options["reviews"], len(user_ids) * len(product_ids))
+        ratings = list(RATING_WEIGHTS)
+        weights = list(RATING_WEIGHTS.values())
+
+        def rows():
+            reviewed = set()
+            while len(reviewed) < total:
+                pair = (
+                    self.random.choice(user_ids),
+                    product_ids[self.pick_product(popularity)],
+                )
+                if pair in reviewed:
+                    continue
+                reviewed.add(pair)
+                created_at = self.random_past()
+                yield Review(
+                    id=self.make_id(),
+                    user_id=pair[0],
+                    product_id=pair[1],
+                    rating=self.random.choices(ratings, weights)[0],
+                    text="Synthetic review",
+                    created_at=created_at,
+                    updated_at=created_at,
+                )
+
+        self.bulk_create(Review, rows(), "reviews", total, dated=True)
+
+    def update_aggregates(self):
+        """Counters that Product.save and the review views normally keep"""
+        reviews = (
+            Review.objects
+            .filter(product=OuterRef("pk"), rating__isnull=False)
+            .values("product")
+            .order_by()
+        )
+        rating_avg = Product._meta.get_field("rating_avg")
+        Product.objects.unfiltered().update(
+            rating_avg=Coalesce(
+                Cast(
+                    Subquery(reviews.annotate(value=Avg("rating"))
+                             .values("value")),
+                    rating_avg
+                ),
+                Value(Decimal(0)),
+                output_field=rating_avg
+            ),
+            rating_count=Coalesce(
+                Subquery(reviews.annotate(value=Count("id")).values("value")),
+                0
+            ),
+        )
+        Category.objects.rebuild_product_counts()
+        Category.objects.rebuild_price_ranges()
+        bump_model_version(Product)
+        self.stdout.write("aggregates: rating and category counters updated")
@@ -0,0 +1,246 @@
+from django.db import transaction
+from django.db.models import (
+    Count, F, IntegerField, Max, Min, OuterRef, Q, Subquery,
+    Sum, Value
+)
+from django.db.models.functions import Coalesce, Greatest, Least
+
+from apps.common.cache import bump_model_version, invalidate_slug_lookups
+from apps.common.managers import (
+    GetOrNoneManager, GetOrNoneQuerySet,
+    IsDeletedManager, IsDeletedQuerySet
+)
+
+
+# Materialized path: every category appends its own hex id plus a
+# separator to the path of its parent, so a subtree is a prefix range.
+CATEGORY_PATH_STEP = 33
+CATEGORY_MAX_DEPTH = 7
+CATEGORY_PATH_MAX_LENGTH = CATEGORY_PATH_STEP * CATEGORY_MAX_DEPTH
+
+
+def category_path_segment(category_id) -> str:
+    return f"{category_id.hex}/"
+
+
+def category_ancestor_paths(path: str) -> list[str]:
+    """Returns the paths of all nodes on the way to `path`, inclusive"""
+    return [
+        path[:end]
+        for end in range(CATEGORY_PATH_STEP, len(path) + 1, CATEGORY_PATH_STEP)
+    ]
+
+
+class CategoryQuerySet(GetOrNoneQuerySet):
+
+    def subtree(self, path: str):
+        return self.filter(path__startswith=path)
+
+    def ancestors(self, path: str):
+        return self.filter(path__in=category_ancestor_paths(path))
+
+    def adjust_product_count(self, path: str, delta: int):
+        """Adds `delta` to the counters of the node and all its ancestors"""
+        if not delta or not path:
+            return 0
+        return self.ancestors(path).update(
+            product_count=F("product_count") + delta
+        )
+
+    def widen_price_range(self, path: str, price):
+        """Stretches the price range of the node and its ancestors to `price`"""
+        if not path or price is None:
+            return 0
+        price = Value(
+            price, output_field=self.model._meta.get_field("min_price")
+        )
+        return self.ancestors(path).update(
+            min_price=Least(Coalesce("min_price", price), price),
+            max_price=Greatest(Coalesce("max_price", price), price),
+        )
+
+    def shrink_price_range(self, path: str, price):
+        """
+        Called when a product with `price` leaves the subtree. Only nodes
+        whose bound was exactly that price need their range recomputed.
+        """
+        if not path or price is None:
+            return 0
+        stale = list(
+            self.ancestors(path)
+            .filter(Q(min_price=price) | Q(max_price=price))
+            .values_list("path", flat=True)
+        )
+        return self.refresh_price_ranges(stale)
+
+    def refresh_price_ranges(self, paths):
+        """Recomputes the price ranges of the nodes from their subtrees"""
+        from apps.shop.models import Product
+
+        if not paths:
+            return 0
+        subtree = (
+            Product.objects
+            .filter(category__path__startswith=OuterRef("path"))
+            .values("price_current")
+        )
+        return self.filter(path__in=paths).update(
+            min_price=Subquery(subtree.order_by("price_current")[:1]),
+            max_price=Subquery(subtree.order_by("-price_current")[:1]),
+        )
+
+    def rebuild_product_counts(self):
+        """
+        Recomputes subtree product counters from scratch.
+        One grouped query for direct counts, the rollup is done in memory.
+        """
+        from apps.shop.models import Product
+
+        direct = dict(
+            Product.objects
+            .values_list("category_id")
+            .annotate(total=Count("id"))
+            .order_by()
+        )
+        categories = list(self.only("id", "path", "product_count"))
+        totals = {category.path: 0 for category in categories}
+        for category in categories:
+            for path in category_ancestor_paths(category.path):
+                if path in totals:
+                    totals[path] += direct.get(category.id, 0)
+        changed = []
+        for category in categories:
+            if category.product_count != totals[category.path]:
+                category.product_count = totals[category.path]
+                changed.append(category)
+        self.model.objects.bulk_update(
+            changed, ["product_count"], batch_size=500
+        )
+        return len(changed)
+
+    def rebuild_price_ranges(self):
+        """
+        Recomputes subtree price ranges from scratch, the same way as
+        rebuild_product_counts: one grouped query, rollup in memory.
+        """
+        from apps.shop.models import Product
+
+        direct = {
+            row["category_id"]: (row["low"], row["high"])
+            for row in (
+                Product.objects
+                .values("category_id")
+                .annotate(low=Min("price_current"), high=Max("price_current"))
+                .order_by()
+            )
+        }
+        categories = list(self.only("id", "path", "min_price", "max_price"))
+        ranges = {category.path: (None, None) for category in categories}
+        for category in categories:
+            if category.id not in direct:
+                continue
+            low, high = direct[category.id]
+            for path in category_ancestor_paths(category.path):
+                if path in ranges:
+                    current_low, current_high = ranges[path]
+                    ranges[path] = (
+                        low if current_low is None else min(low, current_low),
+                        high if current_high is None
+                        else max(high, current_high),
+                    )
+        changed = []
+        for category in categories:
+            low, high = ranges[category.path]
+            if (category.min_price, category.max_price) != (low, high):
+                category.min_price, category.max_price = low, high
+                changed.append(category)
+        self.model.objects.bulk_update(
+            changed, ["min_price", "max_price"], batch_size=500
+        )
+        return len(changed)
+
+
+class CategoryManager(GetOrNoneManager):
+
+    def get_queryset(self):
+        return CategoryQuerySet(self.model)
+
+    def subtree(self, path: str):
+        return self.get_queryset().subtree(path)
+
+    def ancestors(self, path: str):
+        return self.get_queryset().ancestors(path)
+
+    def adjust_product_count(self, path: str, delta: int):
+        return self.get_queryset().adjust_product_count(path, delta)
+
+    def widen_price_range(self, path: str, price):
+        return self.get_queryset().widen_price_range(path, price)
+
+    def shrink_price_range(self, path: str, price):
+        return self.get_queryset().shrink_price_range(path, price)
+
+    def refresh_price_ranges(self, paths):
+        return self.get_queryset().refresh_price_ranges(paths)
+
+    def rebuild_product_counts(self):
+        return self.get_queryset().rebuild_product_counts()
+
+    def rebuild_price_ranges(self):
+        return self.get_queryset().rebuild_price_ranges()
+
+
+class ProductQuerySet(IsDeletedQuerySet):
+
+    def in_category_tree(self, category):
+        return self.filter(category__path__startswith=category.path)
+
+    def with_stock(self):
+        """
+        Annotates `stock_available`: the compacted balance plus the sum
+        of movements the compactor has not folded in yet
+        """
+        from apps.shop.models import StockMovement
+
+        tail = (
+            StockMovement.objects
+            .filter(product=OuterRef("pk"), is_compacted=False)
+            .values("product")
+            .annotate(total=Sum("quantity"))
+            .values("total")
+        )
+        return self.annotate(stock_available=F("in_stock") + Coalesce(
+            Subquery(tail, output_field=IntegerField()), 0
+        ))
+
+    def delete(self, hard_delete=False):
+        from apps.shop.models import Category
+
+        removed = list(
+            self.filter(is_deleted=False)
+            .values_list("category__path")
+            .annotate(total=Count("id"))
+            .order_by()
+        )
+        with transaction.atomic():
+            result = super().delete(hard_delete=hard_delete)
+            for path, total in removed:
+                Category.objects.adjust_product_count(path, -total)
+            Category.objects.refresh_price_ranges({
+                ancestor
+                for path, _ in removed
+                for ancestor in category_ancestor_paths(path)
+            })
+        bump_model_version(self.model)
+        invalidate_slug_lookups(self.model)
+        return result
+
+
+class ProductManager(IsDeletedManager):
+    queryset_class = ProductQuerySet
+
+    def in_category_tree(self, category):
+        return self.get_queryset().in_category_tree(category)
+
+    def with_stock(self):
+        return self.get_queryset().with_stock()
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.7 on 2026-10-18 23:17
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0004_review_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PriceHistory',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('previous_price', models.DecimalField(decimal_places=2, max_digits=10, null=True)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='price_history', to='shop.product')),
+            ],
+            options={
+                'verbose_name_plural': 'Price history',
+                'indexes': [models.Index(fields=['product', 'created_at'], name='price_history_product_idx'), models.Index(fields=['created_at'], name='price_history_created_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='PriceHistoryDaily',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('day', models.DateField()),
+                ('price_min', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('price_max', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('price_close', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='price_history_daily', to='shop.product')),
+            ],
+            options={
+                'verbose_name_plural': 'Price history daily',
+                'constraints': [models.UniqueConstraint(fields=('product', 'day'), name='price_history_daily_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-18 23:34
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0002_order_tx_ref'),
+        ('shop', '0007_product_rating'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockMovement',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('kind', models.CharField(choices=[('RESTOCK', 'RESTOCK'), ('SALE', 'SALE'), ('ADJUSTMENT', 'ADJUSTMENT'), ('RETURN', 'RETURN'), ('RELEASE', 'RELEASE')], max_length=20)),
+                ('quantity', models.IntegerField()),
+                ('is_compacted', models.BooleanField(default=False)),
+                ('order', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='stock_movements', to='profiles.order')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_movements', to='shop.product')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['product', 'is_compacted'], name='stock_movement_tail_idx')],
+            },
+        ),
+    ]
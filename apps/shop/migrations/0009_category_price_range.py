@@ -0,0 +1,60 @@
+# Generated by Django 5.2.7 on 2026-10-19 00:16
+
+from django.db import migrations, models
+
+
+def build_price_ranges(apps, schema_editor):
+    Category = apps.get_model('shop', 'Category')
+    Product = apps.get_model('shop', 'Product')
+    direct = {
+        row['category_id']: (row['low'], row['high'])
+        for row in (
+            Product.objects
+            .filter(is_deleted=False)
+            .values('category_id')
+            .annotate(
+                low=models.Min('price_current'),
+                high=models.Max('price_current')
+            )
+            .order_by()
+        )
+    }
+    categories = list(Category.objects.all())
+    by_path = {category.path: category for category in categories}
+    for category in categories:
+        if category.id not in direct:
+            continue
+        low, high = direct[category.id]
+        # Предки - префиксы материализованного пути длиной кратной 33
+        for end in range(33, len(category.path) + 1, 33):
+            ancestor = by_path.get(category.path[:end])
+            if ancestor is None:
+                continue
+            if ancestor.min_price is None or low < ancestor.min_price:
+                ancestor.min_price = low
+            if ancestor.max_price is None or high > ancestor.max_price:
+                ancestor.max_price = high
+    Category.objects.bulk_update(
+        categories, ['min_price', 'max_price'], batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0008_stock_movement'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='max_price',
+            field=models.DecimalField(decimal_places=2, editable=False, max_digits=10, null=True),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='min_price',
+            field=models.DecimalField(decimal_places=2, editable=False, max_digits=10, null=True),
+        ),
+        migrations.RunPython(build_price_ranges, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-19 00:24
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0010_product_sort_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductActivity',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('hour', models.PositiveIntegerField()),
+                ('views', models.PositiveIntegerField(default=0)),
+                ('cart_adds', models.PositiveIntegerField(default=0)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='activity', to='shop.product')),
+            ],
+            options={
+                'verbose_name_plural': 'Product activity',
+                'constraints': [models.UniqueConstraint(fields=('hour', 'product'), name='product_activity_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 00:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0011_product_activity'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='boughttogetherbuild',
+            name='recent_order_ids',
+            field=models.JSONField(default=list),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.7 on 2026-10-19 00:49
+
+from django.db import migrations, models
+
+
+def copy_order_refs(apps, schema_editor):
+    StockMovement = apps.get_model('shop', 'StockMovement')
+    for movement_id, tx_ref in (
+        StockMovement.objects
+        .filter(order__isnull=False)
+        .values_list('id', 'order__tx_ref')
+        .iterator()
+    ):
+        StockMovement.objects.filter(id=movement_id).update(order_ref=tx_ref)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0004_order_archive'),
+        ('shop', '0012_bought_together_overlap'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='stockmovement',
+            name='order_ref',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        migrations.RunPython(copy_order_refs, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='stockmovement',
+            name='order',
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.7 on 2026-10-19 01:13
+
+import apps.common.models
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0014_product_name_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='review',
+            index=apps.common.models.NullsLastIndex(models.F('product'), models.F('is_deleted'), models.OrderBy(models.F('rating'), descending=True, nulls_last=True), models.OrderBy(models.F('created_at'), descending=True), models.OrderBy(models.F('id'), descending=True), name='review_product_top_idx'),
+        ),
+    ]
@@ -1,9 +1,16 @@
-from turtle import mode
 from autoslug import AutoSlugField
-from django.db import models
-from apps.common.models import BaseModel, IsDeletedModel
+from django.db import models, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Concat, Substr
+from apps.common.cache import bump_model_version, invalidate_slug_lookups
+from apps.common.models import BaseModel, IsDeletedModel, NullsLastIndex
 from apps.sellers.models import Seller
 from apps.accounts.models import User
+from apps.shop.managers import (
+    CATEGORY_MAX_DEPTH, CATEGORY_PATH_MAX_LENGTH,
+    CategoryManager, ProductManager,
+    category_ancestor_paths, category_path_segment
+)
 
 
 class Category(BaseModel):
@@ -15,6 +22,26 @@ class Category(BaseModel):
         populate_from="name", unique=True, always_update=True
     )
     image = models.ImageField(upload_to='category_images/')
+    parent = models.ForeignKey(
+        "self", on_delete=models.CASCADE,
+        related_name="children",
+        null=True, blank=True
+    )
+    path = models.CharField(
+        max_length=CATEGORY_PATH_MAX_LENGTH, db_index=True, editable=False
+    )
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
+    # Количество неудалённых товаров во всём поддереве категории
+    product_count = models.PositiveIntegerField(default=0, editable=False)
+    # Диапазон цен неудалённых товаров поддерева, None если товаров нет
+    min_price = models.DecimalField(
+        max_digits=10, decimal_places=2, null=True, editable=False
+    )
+    max_price = models.DecimalField(
+        max_digits=10, decimal_places=2, null=True, editable=False
+    )
+
+    objects = CategoryManager()
 
     def __str__(self):
         return str(self.name)
@@ -22,6 +49,89 @@ class Category(BaseModel):
     class Meta:
         verbose_name_plural = "Categories"
 
+    def save(self, *args, **kwargs):
+        old_path = self.path
+        if self.parent_id:
+            parent_path = (
+                Category.objects
+                .values_list("path", flat=True)
+                .get(pk=self.parent_id)
+            )
+            if old_path and parent_path.startswith(old_path):
+                raise ValueError(
+                    "A category can't be moved under its own subtree"
+                )
+        else:
+            parent_path = ""
+        self.path = parent_path + category_path_segment(self.id)
+        self.depth = len(category_ancestor_paths(self.path)) - 1
+        if self.depth >= CATEGORY_MAX_DEPTH:
+            raise ValueError(
+                f"Categories can't be nested deeper than {CATEGORY_MAX_DEPTH} levels"
+            )
+        adding = self._state.adding
+        if not old_path or old_path == self.path:
+            super().save(*args, **kwargs)
+        else:
+            with transaction.atomic():
+                super().save(*args, **kwargs)
+                self._move_subtree(old_path)
+        if not adding:
+            # slug пересчитывается из name при каждом сохранении
+            invalidate_slug_lookups(Category)
+
+    def _move_subtree(self, old_path):
+        """Rewrites descendant paths and moves counters between ancestors"""
+        old_depth = len(category_ancestor_paths(old_path)) - 1
+        (
+            Category.objects
+            .subtree(old_path)
+            .exclude(pk=self.pk)
+            .update(
+                path=Concat(
+                    Value(self.path), Substr("path", len(old_path) + 1)
+                ),
+                depth=F("depth") + (self.depth - old_depth)
+            )
+        )
+        product_count = self._stored_product_count()
+        old_ancestors = set(category_ancestor_paths(old_path)) - {old_path}
+        new_ancestors = set(category_ancestor_paths(self.path)) - {self.path}
+        (
+            Category.objects
+            .filter(path__in=old_ancestors)
+            .update(product_count=F("product_count") - product_count)
+        )
+        (
+            Category.objects
+            .filter(path__in=new_ancestors)
+            .update(product_count=F("product_count") + product_count)
+        )
+        Category.objects.refresh_price_ranges(old_ancestors | new_ancestors)
+
+    def _stored_product_count(self):
+        return (
+            Category.objects
+            .values_list("product_count", flat=True)
+            .get(pk=self.pk)
+        )
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            product_count = self._stored_product_count()
+            (
+                Category.objects
+                .filter(path__in=category_ancestor_paths(self.path))
+                .exclude(pk=self.pk)
+                .update(product_count=F("product_count") - product_count)
+            )
+            result = super().delete(*args, **kwargs)
+            Category.objects.refresh_price_ranges(
+                set(category_ancestor_paths(self.path)) - {self.path}
+            )
+        invalidate_slug_lookups(Category)
+        return result
+
 
 class Product(IsDeletedModel):
 
@@ -30,7 +140,9 @@ class Product(IsDeletedModel):
         related_name="products",
         null=True
     )
-    name = models.CharField(max_length=100)
+    # Индекс для поиска по началу названия в админке. На PostgreSQL
+    # Django добавляет к нему индекс varchar_pattern_ops для LIKE 'x%'
+    name = models.CharField(max_length=100, db_index=True)
     slug = AutoSlugField(
         populate_from="name", unique=True, db_index=True
     )
@@ -45,15 +157,195 @@ class Product(IsDeletedModel):
         Category, on_delete=models.CASCADE,
         related_name="products"
     )
+    # Остаток на момент последнего сжатия журнала StockMovement.
+    # Меняется только apps.shop.inventory.compact, см. Product.save
     in_stock = models.IntegerField(default=5)
 
     image1 = models.ImageField(upload_to="product_images/")
     image2 = models.ImageField(upload_to="product_images/", blank=True)
     image3 = models.ImageField(upload_to="product_images/", blank=True)
 
+    # Пересчитываются фоновой задачей shop.recompute_product_rating
+    rating_avg = models.DecimalField(
+        max_digits=3, decimal_places=2, default=0, editable=False
+    )
+    rating_count = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = ProductManager()
+
+    # Поля, изменения которых отслеживаются между загрузкой и сохранением
+    tracked_fields = ("category_id", "is_deleted", "price_current", "slug")
+
+    class Meta(IsDeletedModel.Meta):
+        # Под каждую сортировку из apps.shop.filters.PRODUCT_ORDERINGS:
+        # первые страницы читаются из индекса без полной сортировки.
+        # Индексы частичные: удалённые товары в выдачу не попадают
+        indexes = [
+            models.Index(
+                fields=["price_current", "id"],
+                name="product_price_idx",
+                condition=models.Q(is_deleted=False)
+            ),
+            models.Index(
+                fields=["created_at", "id"],
+                name="product_created_idx",
+                condition=models.Q(is_deleted=False)
+            ),
+            models.Index(
+                fields=["rating_avg", "rating_count", "id"],
+                name="product_rating_idx",
+                condition=models.Q(is_deleted=False)
+            ),
+            models.Index(
+                fields=["rating_count", "id"],
+                name="product_popularity_idx",
+                condition=models.Q(is_deleted=False)
+            ),
+            models.Index(
+                fields=["seller", "price_current", "id"],
+                name="product_seller_price_idx",
+                condition=models.Q(is_deleted=False)
+            ),
+            models.Index(
+                fields=["seller", "created_at", "id"],
+                name="product_seller_created_idx",
+                condition=models.Q(is_deleted=False)
+            ),
+            models.Index(
+                fields=["seller", "rating_avg", "rating_count", "id"],
+                name="product_seller_rating_idx",
+                condition=models.Q(is_deleted=False)
+            ),
+            models.Index(
+                fields=["seller", "rating_count", "id"],
+                name="product_seller_popularity_idx",
+                condition=models.Q(is_deleted=False)
+            ),
+        ]
+
     def __str__(self):
         return str(self.name)
 
+    # Доступный остаток с несжатым хвостом журнала. Заполняется аннотацией
+    # ProductQuerySet.with_stock() или inventory.attach_stock, иначе
+    # читается отдельным запросом при первом обращении
+    _stock_available = None
+
+    @property
+    def stock_available(self):
+        if self._stock_available is None:
+            from apps.shop import inventory
+
+            inventory.attach_stock([self])
+        return self._stock_available
+
+    @stock_available.setter
+    def stock_available(self, value):
+        self._stock_available = value
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_tracked_fields()
+        return instance
+
+    def _remember_tracked_fields(self):
+        self._loaded_values = {
+            field: self.__dict__[field]
+            for field in self.tracked_fields
+            if field in self.__dict__
+        }
+
+    def _previous_values(self):
+        """Returns tracked values as stored in the database, None if new"""
+        if self._state.adding:
+            return None
+        previous = getattr(self, "_loaded_values", {})
+        if len(previous) != len(self.tracked_fields):
+            previous = (
+                Product.objects.unfiltered()
+                .filter(pk=self.pk)
+                .values(*self.tracked_fields)
+                .first()
+            )
+        return previous
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            # Остаток ведёт журнал движений: сохранение товара не должно
+            # затирать значение, записанное компактором
+            deferred = self.get_deferred_fields()
+            kwargs["update_fields"] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.attname not in deferred
+                and field.name != "in_stock"
+            ]
+        previous = self._previous_values()
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            self._sync_category_stats(previous)
+            self._record_price_change(previous)
+        self._remember_tracked_fields()
+        # Сбрасывает закэшированные счётчики страниц списка товаров
+        bump_model_version(Product)
+        if previous is not None and (
+                previous["slug"] != self.slug
+                or previous["is_deleted"] != self.is_deleted
+        ):
+            invalidate_slug_lookups(Product)
+
+    def _sync_category_stats(self, previous):
+        """Keeps product counters and price ranges of the category tree"""
+        was_counted = previous is not None and not previous["is_deleted"]
+        is_counted = not self.is_deleted
+        moved = (
+            previous is not None
+            and previous["category_id"] != self.category_id
+        )
+        repriced = (
+            previous is not None
+            and previous["price_current"] != self.price_current
+        )
+        if was_counted and (moved or repriced or not is_counted):
+            old_path = self.category.path if not moved else (
+                Category.objects
+                .values_list("path", flat=True)
+                .get(pk=previous["category_id"])
+            )
+            if moved or not is_counted:
+                Category.objects.adjust_product_count(old_path, -1)
+            Category.objects.shrink_price_range(
+                old_path, previous["price_current"]
+            )
+        if is_counted and (moved or repriced or not was_counted):
+            if moved or not was_counted:
+                Category.objects.adjust_product_count(self.category.path, 1)
+            Category.objects.widen_price_range(
+                self.category.path, self.price_current
+            )
+
+    def _record_price_change(self, previous):
+        previous_price = previous and previous["price_current"]
+        if previous is not None and previous_price == self.price_current:
+            return
+        PriceHistory.objects.create(
+            product=self,
+            price=self.price_current,
+            previous_price=previous_price
+        )
+
+    def hard_delete(self, *args, **kwargs):
+        with transaction.atomic():
+            super().hard_delete(*args, **kwargs)
+            if not self.is_deleted:
+                Category.objects.adjust_product_count(self.category.path, -1)
+                Category.objects.shrink_price_range(
+                    self.category.path, self.price_current
+                )
+        bump_model_version(Product)
+        invalidate_slug_lookups(Product)
+
 
 RATING_CHOICES = [
     (1, 1), (2, 2), (3, 3), (4, 4), (5, 5)
@@ -78,3 +370,160 @@ class Review(IsDeletedModel):
     text = models.TextField(
         null=True, blank=True
     )
+
+    class Meta(IsDeletedModel.Meta):
+        indexes = [
+            # Сортировка отзывов по дате и по оценке без полной сортировки
+            models.Index(
+                fields=["product", "is_deleted", "created_at", "id"],
+                name="review_product_created_idx"
+            ),
+            # rating ASC NULLS LAST - прямой проход по индексу в PostgreSQL
+            models.Index(
+                fields=["product", "is_deleted", "rating", "created_at", "id"],
+                name="review_product_rating_idx"
+            ),
+            # Обратный проход по индексу выше ставит NULL первыми
+            NullsLastIndex(
+                F("product"), F("is_deleted"),
+                F("rating").desc(nulls_last=True),
+                F("created_at").desc(), F("id").desc(),
+                name="review_product_top_idx"
+            ),
+        ]
+
+
+class PriceHistory(BaseModel):
+    """
+    Журнал изменений цены товара, записи только добавляются.
+    Записи старше срока хранения сворачиваются в PriceHistoryDaily
+    """
+    product = models.ForeignKey(
+        Product, on_delete=models.CASCADE, related_name="price_history"
+    )
+    price = models.DecimalField(max_digits=10, decimal_places=2)
+    previous_price = models.DecimalField(
+        max_digits=10, decimal_places=2, null=True
+    )
+
+    class Meta:
+        verbose_name_plural = "Price history"
+        indexes = [
+            models.Index(
+                fields=["product", "created_at"],
+                name="price_history_product_idx"
+            ),
+            models.Index(
+                fields=["created_at"], name="price_history_created_idx"
+            ),
+        ]
+
+
+class PriceHistoryDaily(BaseModel):
+    """
+    Дневная свёртка журнала цен: минимум, максимум и цена на конец дня
+    """
+    product = models.ForeignKey(
+        Product, on_delete=models.CASCADE, related_name="price_history_daily"
+    )
+    day = models.DateField()
+    price_min = models.DecimalField(max_digits=10, decimal_places=2)
+    price_max = models.DecimalField(max_digits=10, decimal_places=2)
+    price_close = models.DecimalField(max_digits=10, decimal_places=2)
+
+    class Meta:
+        verbose_name_plural = "Price history daily"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["product", "day"], name="price_history_daily_unique"
+            ),
+        ]
+
+
+class BoughtTogether(BaseModel):
+    """
+    Товары, которые чаще всего покупают вместе с товаром product.
+    Заполняется командой build_bought_together
+    """
+    product = models.ForeignKey(
+        Product, on_delete=models.CASCADE, related_name="bought_together"
+    )
+    recommended = models.ForeignKey(
+        Product, on_delete=models.CASCADE, related_name="+"
+    )
+    score = models.PositiveIntegerField()
+    rank = models.PositiveSmallIntegerField()
+
+    class Meta:
+        verbose_name_plural = "Bought together"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["product", "rank"], name="bought_together_rank_unique"
+            ),
+        ]
+
+
+class ProductActivity(BaseModel):
+    """
+    Просмотры и добавления в корзину товара за один час.
+    Пишется пачками из буфера воркера, см. apps.shop.popularity
+    """
+    product = models.ForeignKey(
+        Product, on_delete=models.CASCADE, related_name="activity"
+    )
+    # Номер часа от начала эпохи Unix
+    hour = models.PositiveIntegerField()
+    views = models.PositiveIntegerField(default=0)
+    cart_adds = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = "Product activity"
+        constraints = [
+            # Ведущий hour: окно последних часов читается диапазоном
+            models.UniqueConstraint(
+                fields=["hour", "product"], name="product_activity_unique"
+            ),
+        ]
+
+
+class BoughtTogetherBuild(BaseModel):
+    """Отметка последнего заказа, учтённого в BoughtTogether"""
+    last_order_created_at = models.DateTimeField(null=True)
+    orders_processed = models.PositiveIntegerField(default=0)
+    # id учтённых заказов в окне перекрытия перед last_order_created_at:
+    # следующая сборка перечитывает окно и пропускает их
+    recent_order_ids = models.JSONField(default=list)
+
+
+STOCK_MOVEMENT_CHOICES = (
+    ("RESTOCK", "RESTOCK"),
+    ("SALE", "SALE"),
+    ("ADJUSTMENT", "ADJUSTMENT"),
+    ("RETURN", "RETURN"),
+    ("RELEASE", "RELEASE"),
+)
+
+
+class StockMovement(BaseModel):
+    """
+    Журнал движения остатков, записи только добавляются.
+    Доступный остаток = Product.in_stock + несжатые записи (хвост)
+    """
+    product = models.ForeignKey(
+        Product, on_delete=models.CASCADE, related_name="stock_movements"
+    )
+    kind = models.CharField(max_length=20, choices=STOCK_MOVEMENT_CHOICES)
+    # Со знаком: поступления положительные, списания отрицательные
+    quantity = models.IntegerField()
+    # tx_ref заказа, а не внешний ключ: заказ уходит в архив, а журнал
+    # при этом не обновляется и продолжает указывать на него
+    order_ref = models.CharField(max_length=100, null=True, blank=True)
+    is_compacted = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["product", "is_compacted"],
+                name="stock_movement_tail_idx"
+            ),
+        ]
@@ -0,0 +1,209 @@
+import atexit
+import logging
+import math
+import os
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import Error, connections, transaction
+from django.db.models import F, FloatField, Sum
+from django.db.models.functions import Exp
+from django.utils import timezone
+
+from apps.shop.models import Product, ProductActivity
+
+
+logger = logging.getLogger(__name__)
+
+VIEWS, CART_ADDS = 0, 1
+
+
+def current_hour(now=None):
+    return int((time.time() if now is None else now) // 3600)
+
+
+def write_counters(pending):
+    """
+    Adds {(product_id, hour): [views, cart_adds]} to ProductActivity:
+    one INSERT of the missing rows, then one UPDATE ... SET views =
+    views + n per distinct (hour, views, cart_adds) increment. Popularity
+    is Zipf-like, so most products share the same small increments.
+    """
+    existing = set(
+        Product.objects.unfiltered()
+        .filter(id__in={product_id for product_id, _ in pending})
+        .values_list("id", flat=True)
+    )
+    increments = defaultdict(list)
+    for (product_id, hour), (views, cart_adds) in pending.items():
+        if product_id in existing:
+            increments[(hour, views, cart_adds)].append(product_id)
+    with transaction.atomic():
+        ProductActivity.objects.bulk_create(
+            [
+                ProductActivity(product_id=product_id, hour=hour)
+                for (product_id, hour) in pending
+                if product_id in existing
+            ],
+            ignore_conflicts=True, batch_size=500
+        )
+        for (hour, views, cart_adds), product_ids in increments.items():
+            ProductActivity.objects.filter(
+                hour=hour, product_id__in=product_ids
+            ).update(
+                views=F("views") + views,
+                cart_adds=F("cart_adds") + cart_adds,
+                updated_at=timezone.now()
+            )
+    return len(existing)
+
+
+class PopularityBuffer:
+    """
+    Per-process counters of product views and add-to-cart events.
+
+    Recording an event only updates a dict under a lock. A daemon thread
+    writes the sums with write_counters every FLUSH_INTERVAL seconds, or
+    earlier once MAX_PENDING (product, hour) pairs are waiting. Past twice
+    that, e.g. while the database is down, events for new pairs are
+    dropped and counted, so memory per worker stays bounded. A failed
+    write is merged back and retried on the next flush; whatever is
+    pending is written at interpreter exit.
+    """
+
+    def __init__(self):
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._pruned_hour = None
+        self.dropped = 0
+        self.flushed = 0
+        self.failures = 0
+
+    def record_view(self, product_id):
+        self._add(product_id, VIEWS)
+
+    def record_cart_add(self, product_id):
+        self._add(product_id, CART_ADDS)
+
+    def _add(self, product_id, counter):
+        options = settings.POPULARITY
+        key = (product_id, current_hour())
+        with self._lock:
+            if self._pid != os.getpid():
+                # Счётчики родителя после fork уже не наши
+                self._pending, self._thread = {}, None
+                self._pid = os.getpid()
+            counts = self._pending.get(key)
+            if counts is None:
+                if len(self._pending) >= 2 * options["MAX_PENDING"]:
+                    self.dropped += 1
+                    return
+                counts = self._pending[key] = [0, 0]
+            counts[counter] += 1
+            size = len(self._pending)
+            if self._thread is None and options["FLUSH_INTERVAL"]:
+                self._thread = threading.Thread(
+                    target=self._run, name="popularity-flush", daemon=True
+                )
+                self._thread.start()
+        if size >= options["MAX_PENDING"]:
+            self._wakeup.set()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(settings.POPULARITY["FLUSH_INTERVAL"])
+            self._wakeup.clear()
+            # Поток не должен умереть: без него буфер только переполняется
+            try:
+                self.flush()
+                self.prune()
+            except Exception:
+                logger.exception("Popularity flush failed")
+            finally:
+                connections.close_all()
+
+    def flush(self):
+        """Writes pending counters, returns the number of products written"""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+            try:
+                written = write_counters(pending)
+            except Error:
+                logger.exception("Popularity counters were not written")
+                self.failures += 1
+                with self._lock:
+                    for key, (views, cart_adds) in pending.items():
+                        counts = self._pending.setdefault(key, [0, 0])
+                        counts[VIEWS] += views
+                        counts[CART_ADDS] += cart_adds
+                return 0
+            self.flushed += written
+            return written
+
+    def prune(self):
+        """Deletes buckets past RETENTION_DAYS, at most once an hour"""
+        hour = current_hour()
+        if self._pruned_hour == hour:
+            return 0
+        self._pruned_hour = hour
+        retention = settings.POPULARITY["RETENTION_DAYS"] * 24
+        try:
+            deleted, _ = ProductActivity.objects.filter(
+                hour__lt=hour - retention
+            ).delete()
+        except Error:
+            logger.exception("Old popularity buckets were not deleted")
+            return 0
+        return deleted
+
+    def clear(self):
+        with self._lock:
+            self._pending = {}
+        self.dropped = self.flushed = self.failures = 0
+
+    def stats(self):
+        with self._lock:
+            pending = len(self._pending)
+        return {
+            "pending": pending,
+            "flushed": self.flushed,
+            "dropped": self.dropped,
+            "failures": self.failures,
+        }
+
+
+buffer = PopularityBuffer()
+atexit.register(buffer.flush)
+
+
+def top_products(hours, limit, half_life_hours=None, now=None):
+    """
+    [(product_id, score)] over the last `hours` hourly buckets, best
+    first. An add to cart weighs CART_ADD_WEIGHT views. With
+    `half_life_hours` every bucket is weighted by
+    2 ** (-age / half_life_hours), which ranks what is trending now;
+    without it the counts are summed as they are.
+    """
+    hour = current_hour(now)
+    weight = settings.POPULARITY["CART_ADD_WEIGHT"]
+    events = F("views") + weight * F("cart_adds")
+    if half_life_hours:
+        decay = math.log(2) / half_life_hours
+        events = events * Exp((F("hour") - hour) * decay)
+    return list(
+        ProductActivity.objects
+        .filter(hour__gt=hour - hours, product__is_deleted=False)
+        .values("product")
+        .annotate(score=Sum(events, output_field=FloatField()))
+        .order_by("-score", "product")
+        .values_list("product", "score")[:limit]
+    )
@@ -1,5 +1,7 @@
 from drf_spectacular.utils import OpenApiParameter, OpenApiTypes
-from drf_ecommerce import settings
+from django.conf import settings
+
+from apps.shop.filters import PRODUCT_ORDERINGS
 
 
 PRODUCT_PARAM_EXAMPLE = [
@@ -40,3 +42,74 @@ PRODUCT_PARAM_EXAMPLE = [
         type=OpenApiTypes.INT,
     ),
 ]
+
+IDEMPOTENCY_KEY_PARAMS = [
+    OpenApiParameter(
+        name="Idempotency-Key",
+        location=OpenApiParameter.HEADER,
+        description=(
+            "Unique key of the operation. Retries with the same key get "
+            "the first response back instead of running it again"
+        ),
+        required=False,
+        type=OpenApiTypes.STR,
+    ),
+]
+
+PRODUCT_BATCH_PARAMS = [
+    OpenApiParameter(
+        name="slugs",
+        description="Comma separated product slugs, up to 200",
+        required=True,
+        type=OpenApiTypes.STR,
+    ),
+]
+
+SPARSE_FIELDSET_PARAMS = [
+    OpenApiParameter(
+        name="fields",
+        description=(
+            "Comma separated fields to return, nested ones with a dot, "
+            "e.g. name,slug,price_current,seller.name"
+        ),
+        required=False,
+        type=OpenApiTypes.STR,
+    ),
+    OpenApiParameter(
+        name="exclude",
+        description="Comma separated fields to leave out, e.g. desc,category",
+        required=False,
+        type=OpenApiTypes.STR,
+    ),
+]
+
+PRODUCT_ORDERING_PARAMS = [
+    OpenApiParameter(
+        name="ordering",
+        description=(
+            "Sort products: price and -price by current price, newest first, "
+            "best rating first or most reviewed first (popularity)"
+        ),
+        required=False,
+        type=OpenApiTypes.STR,
+        enum=list(PRODUCT_ORDERINGS),
+    ),
+]
+
+POPULARITY_PARAMS = [
+    OpenApiParameter(
+        name="days",
+        description=(
+            "Size of the window in days. Defaults to 7, at most "
+            f"{settings.POPULARITY['RETENTION_DAYS']}"
+        ),
+        required=False,
+        type=OpenApiTypes.INT,
+    ),
+    OpenApiParameter(
+        name="limit",
+        description="Number of products, 1 to 100. Defaults to 20",
+        required=False,
+        type=OpenApiTypes.INT,
+    ),
+]
@@ -10,6 +10,20 @@ class CategorySerializer(serializers.Serializer):
     image = serializers.ImageField()
 
 
+class CategoryTreeSerializer(CategorySerializer):
+    parent_slug = serializers.SlugField(
+        source="parent.slug", required=False, allow_null=True
+    )
+    depth = serializers.IntegerField(read_only=True)
+    product_count = serializers.IntegerField(read_only=True)
+    min_price = serializers.DecimalField(
+        max_digits=10, decimal_places=2, read_only=True
+    )
+    max_price = serializers.DecimalField(
+        max_digits=10, decimal_places=2, read_only=True
+    )
+
+
 class SellerShopSerializer(serializers.Serializer):
     name = serializers.CharField(source="business_name")
     slug = serializers.SlugField()
@@ -28,10 +42,30 @@ class ProductSerializer(serializers.Serializer):
         max_digits=10, decimal_places=2
     )
     category = CategorySerializer()
-    in_stock = serializers.IntegerField()
+    # Сжатый остаток плюс хвост журнала, см. ProductQuerySet.with_stock()
+    in_stock = serializers.IntegerField(source="stock_available")
     image1 = serializers.ImageField()
     image2 = serializers.ImageField(required=False)
     image3 = serializers.ImageField(required=False)
+    rating_avg = serializers.DecimalField(
+        max_digits=3, decimal_places=2, read_only=True
+    )
+    rating_count = serializers.IntegerField(read_only=True)
+
+
+PRODUCT_BATCH_MAX_SLUGS = 200
+
+
+class ProductBatchSerializer(serializers.Serializer):
+    slugs = serializers.ListField(
+        child=serializers.SlugField(),
+        min_length=1, max_length=PRODUCT_BATCH_MAX_SLUGS
+    )
+
+
+class BoughtTogetherSerializer(serializers.Serializer):
+    product = ProductSerializer(source="recommended")
+    score = serializers.IntegerField()
 
 
 class CreateProductSerializer(serializers.Serializer):
@@ -100,11 +134,37 @@ class CheckItemOrderSerializer(serializers.Serializer):
     total = serializers.FloatField(source="get_total")
 
 
+class PriceHistorySerializer(serializers.Serializer):
+    price = serializers.DecimalField(max_digits=10, decimal_places=2)
+    previous_price = serializers.DecimalField(
+        max_digits=10, decimal_places=2
+    )
+    recorded_at = serializers.DateTimeField(source="created_at")
+
+
+class PriceHistoryDailySerializer(serializers.Serializer):
+    day = serializers.DateField()
+    price_min = serializers.DecimalField(max_digits=10, decimal_places=2)
+    price_max = serializers.DecimalField(max_digits=10, decimal_places=2)
+    price_close = serializers.DecimalField(max_digits=10, decimal_places=2)
+
+
+class PriceDropSerializer(serializers.Serializer):
+    name = serializers.CharField(source="product.name")
+    slug = serializers.SlugField(source="product.slug")
+    image1 = serializers.ImageField(source="product.image1")
+    price = serializers.DecimalField(max_digits=10, decimal_places=2)
+    previous_price = serializers.DecimalField(
+        max_digits=10, decimal_places=2
+    )
+    dropped_at = serializers.DateTimeField(source="created_at")
+
+
 class ProductReviewSerializer(serializers.Serializer):
     """
     Сериализатор для представления отзывов о товаре
     """
-    user = serializers.CharField()
+    user = serializers.CharField(source="user.full_name")
     rating = serializers.IntegerField(
         min_value=1, max_value=5
     )
@@ -0,0 +1,39 @@
+from django.db.models import Avg, Count
+
+from apps.common.tasks import task
+from apps.shop import inventory
+from apps.shop.models import Product, Review
+
+
+@task("shop.recompute_product_rating", batch=True)
+def recompute_product_rating(payloads):
+    """Обновляет среднюю оценку и число отзывов у товаров из пачки задач"""
+    product_ids = {payload["product_id"] for payload in payloads}
+    stats = {
+        row["product_id"]: row
+        for row in (
+            Review.objects
+            .filter(product_id__in=product_ids, rating__isnull=False)
+            .values("product_id")
+            .annotate(avg=Avg("rating"), total=Count("id"))
+            .order_by()
+        )
+    }
+    products = list(
+        Product.objects.unfiltered()
+        .filter(id__in=product_ids)
+        .only("id", "rating_avg", "rating_count")
+    )
+    for product in products:
+        row = stats.get(product.id, {"avg": 0, "total": 0})
+        product.rating_avg = round(row["avg"], 2)
+        product.rating_count = row["total"]
+    Product.objects.bulk_update(products, ["rating_avg", "rating_count"])
+
+
+@task("shop.compact_stock", batch=True)
+def compact_stock(payloads):
+    """Сворачивает журнал движений остатков у товаров из пачки задач"""
+    product_ids = {payload["product_id"] for payload in payloads}
+    while inventory.compact(product_ids):
+        pass
@@ -3,7 +3,9 @@ from django.urls import path
 from apps.shop.views import (
     CategoriesView, ProductView, ProductsView,
     ProductsByCategoryView, ProductsBySellerView,
-    CartView, CheckoutView
+    CartView, CheckoutView, PriceHistoryView, PriceDropsView,
+    BoughtTogetherView, ProductsBatchView, PopularProductsView,
+    TrendingProductsView
 )
 
 
@@ -20,9 +22,27 @@ urlpatterns = [
     path(
         "products/", ProductsView.as_view()
     ),
+    path(
+        "products/batch/", ProductsBatchView.as_view()
+    ),
+    path(
+        "products/popular/", PopularProductsView.as_view()
+    ),
+    path(
+        "products/trending/", TrendingProductsView.as_view()
+    ),
     path(
         "products/<slug:slug>/", ProductView.as_view()
     ),
+    path(
+        "products/<slug:slug>/price-history/", PriceHistoryView.as_view()
+    ),
+    path(
+        "products/<slug:slug>/bought-together/", BoughtTogetherView.as_view()
+    ),
+    path(
+        "price-drops/", PriceDropsView.as_view()
+    ),
     path(
         "cart/", CartView.as_view()
     ),
@@ -1,37 +1,60 @@
-from drf_spectacular.utils import extend_schema
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiTypes
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework.pagination import PageNumberPagination
 
 from apps.accounts.models import User
 from apps.sellers.models import Seller
 from apps.profiles.models import OrderItem, ShippingAddress, Order
-from apps.shop.models import Category, Product
+from apps.shop.models import (
+    Category, Product, PriceHistory, PriceHistoryDaily, BoughtTogether
+)
 from apps.shop.serializers import (
-    CategorySerializer, ProductSerializer,
+    CategoryTreeSerializer, ProductSerializer,
     OrderItemSerializer, ToggleCartItemSerializer,
-    CheckoutSerializer, OrderSerializer
+    CheckoutSerializer, OrderSerializer,
+    PriceHistorySerializer, PriceHistoryDailySerializer, PriceDropSerializer,
+    BoughtTogetherSerializer, ProductBatchSerializer
 )
 
-from apps.shop.filters import ProductFilter
-from apps.shop.schema_examples import PRODUCT_PARAM_EXAMPLE
-from apps.common.paginations import CustomPagination
+from apps.shop import inventory, popularity
+from apps.shop.carts import GuestCart
+from apps.shop.lookups import category_slugs, product_slugs
+from apps.shop.filters import ProductFilter, ProductOrderingFilter
+from apps.shop.schema_examples import (
+    IDEMPOTENCY_KEY_PARAMS, PRODUCT_PARAM_EXAMPLE, PRODUCT_BATCH_PARAMS,
+    POPULARITY_PARAMS, PRODUCT_ORDERING_PARAMS, SPARSE_FIELDSET_PARAMS
+)
+from apps.common.idempotency import idempotent
+from apps.common.paginations import CustomPagination, KeysetCursorPagination
+from apps.common.serializers import SparseFieldset
 
 tags = ["Shop"]
 
 
 class CategoriesView(APIView):
-    serializer_class = CategorySerializer
+    serializer_class = CategoryTreeSerializer
 
     @extend_schema(
         summary="Categories Fetch",
         description=(
-            "This endpoint returns all categories"
+            "This endpoint returns all categories ordered as a tree,\n"
+            "each with the number of products and the price range\n"
+            "of its subtree"
         ),
         tags=tags
     )
     def get(self, request, *args, **kwargs):
-        categories = Category.objects.all()
+        categories = (
+            Category.objects
+            .select_related("parent")
+            .order_by("path")
+        )
         serializer = self.serializer_class(categories, many=True)
         return Response(
             data=serializer.data, status=200
@@ -40,14 +63,29 @@ class CategoriesView(APIView):
     @extend_schema(
         summary="Category Creating",
         description=(
-            "This endpoint creates categories"
+            "This endpoint creates categories. Pass parent_slug\n"
+            "to create a subcategory"
         ),
         tags=tags
     )
     def post(self, request, *args, **kwargs):
         serializer = self.serializer_class(data=request.data)
         if serializer.is_valid():
-            new_cat = Category.objects.create(**serializer.validated_data)
+            data = serializer.validated_data
+            parent_slug = data.pop("parent", {}).get("slug")
+            if parent_slug:
+                parent = category_slugs.get(parent_slug)
+                if not parent:
+                    return Response(
+                        data={
+                            "message": "Parent category does not exist!"
+                        }, status=404
+                    )
+                data["parent"] = parent
+            try:
+                new_cat = Category.objects.create(**data)
+            except ValueError as error:
+                return Response(data={"message": str(error)}, status=400)
             serializer = self.serializer_class(new_cat)
             return Response(serializer.data, status=201)
         return Response(serializer.errors, status=400)
@@ -60,30 +98,42 @@ class ProductsByCategoryView(APIView):
         operation_id="category_products",
         summary="Category Products Fetch",
         description=(
-            "This endpoint returns all products in a particular category"
+            "This endpoint returns all products in a particular category\n"
+            "and all of its subcategories"
         ),
-        tags=tags
+        tags=tags,
+        parameters=PRODUCT_ORDERING_PARAMS + SPARSE_FIELDSET_PARAMS,
     )
     def get(self, request, *args, **kwargs):
-        category = Category.objects.get_or_none(slug=kwargs["slug"])
+        category = category_slugs.get(kwargs["slug"])
         if not category:
             return Response(
                 data={
                     "message": "Category does not exist!"
                 }, status=404
             )
-        products = (
+        fieldset = SparseFieldset.from_request(request)
+        products = fieldset.trim_queryset(
             Product.objects
             .select_related("category", "seller", "seller__user")
-            .filter(category=category)
+            .with_stock()
+            .in_category_tree(category),
+            self.serializer_class
+        )
+        filterset = ProductOrderingFilter(
+            request.query_params, queryset=products
+        )
+        if not filterset.is_valid():
+            return Response(filterset.errors, status=400)
+        serializer = fieldset.serialize(
+            self.serializer_class, filterset.qs, many=True
         )
-        serializer = self.serializer_class(products, many=True)
         return Response(data=serializer.data, status=200)
 
 
 class ProductsView(APIView):
     serializer_class = ProductSerializer
-    pagination_class = PageNumberPagination
+    pagination_class = CustomPagination
 
     @extend_schema(
         operation_id="all_products",
@@ -92,21 +142,30 @@ class ProductsView(APIView):
             "This endpoint returns all products"
         ),
         tags=tags,
-        parameters=PRODUCT_PARAM_EXAMPLE,
+        parameters=(
+            PRODUCT_PARAM_EXAMPLE + PRODUCT_ORDERING_PARAMS
+            + SPARSE_FIELDSET_PARAMS
+        ),
     )
     def get(self, request, *args, **kwargs):
-        products = (
+        fieldset = SparseFieldset.from_request(request)
+        products = fieldset.trim_queryset(
             Product.objects
             .select_related("category", "seller", "seller__user")
-            .all()
+            .with_stock()
+            .all(),
+            self.serializer_class
         )
         filterset = ProductFilter(request.query_params, queryset=products)
-        serializer = self.serializer_class(products, many=True)
         if filterset.is_valid():
             queryset = filterset.qs
             paginator = self.pagination_class()
-            paginated_queryset = paginator.paginate_queryset(queryset, request)
-            serializer = self.serializer_class(paginated_queryset, many=True)
+            paginated_queryset = paginator.paginate_queryset(
+                queryset, request
+            )
+            serializer = fieldset.serialize(
+                self.serializer_class, paginated_queryset, many=True
+            )
             return paginator.get_paginated_response(serializer.data)
         return Response(filterset.errors, status=400)
 
@@ -119,7 +178,8 @@ class ProductsBySellerView(APIView):
         description=(
             "This endpoint returns all products in a pariculer seller"
         ),
-        tags=tags
+        tags=tags,
+        parameters=PRODUCT_ORDERING_PARAMS + SPARSE_FIELDSET_PARAMS,
     )
     def get(self, request, *args, **kwargs):
         seller = Seller.objects.get_or_none(slug=kwargs["slug"])
@@ -129,12 +189,22 @@ class ProductsBySellerView(APIView):
                     "message": "Seller does not exist!"
                 }, status=404
             )
-        products = (
+        fieldset = SparseFieldset.from_request(request)
+        products = fieldset.trim_queryset(
             Product.objects
             .select_related("category", "seller", "seller__user")
-            .filter(seller=seller)
+            .with_stock()
+            .filter(seller=seller),
+            self.serializer_class
+        )
+        filterset = ProductOrderingFilter(
+            request.query_params, queryset=products
+        )
+        if not filterset.is_valid():
+            return Response(filterset.errors, status=400)
+        serializer = fieldset.serialize(
+            self.serializer_class, filterset.qs, many=True
         )
-        serializer = self.serializer_class(products, many=True)
         return Response(data=serializer.data, status=200)
 
 
@@ -142,30 +212,342 @@ class ProductView(APIView):
     serializer_class = ProductSerializer
     pagination_class = CustomPagination
 
-    def get_object(self, slug):
-        product = Product.objects.get_or_none(slug=slug)
-        return product
-    
+    def get_object(self, slug, fieldset=None):
+        products = Product.objects.select_related(
+            "category", "seller", "seller__user"
+        ).with_stock()
+        if fieldset:
+            products = fieldset.trim_queryset(products, self.serializer_class)
+        return product_slugs.get(slug, products)
+
     @extend_schema(
         operation_id="product_detail",
         summary="Product Details Fetch",
         description=(
             "This endpoint returns the details for a product via the slug"
         ),
-        tags=tags
+        tags=tags,
+        parameters=SPARSE_FIELDSET_PARAMS,
     )
     def get(self, request, *args, **kwargs):
-        product = self.get_object(kwargs["slug"])
+        fieldset = SparseFieldset.from_request(request)
+        product = self.get_object(kwargs["slug"], fieldset)
         if not product:
             return Response(
                 data={
                     "message": "Product does not exist!"
                 }, status=404
             )
-        serializer = self.serializer_class(product)
+        popularity.buffer.record_view(product.id)
+        serializer = fieldset.serialize(self.serializer_class, product)
+        return Response(data=serializer.data, status=200)
+
+
+class PopularProductsView(APIView):
+    serializer_class = ProductSerializer
+    # Период полураспада весов по часам, None — простая сумма за окно
+    half_life_hours = None
+
+    def get_ranking(self, request):
+        days = get_days_param(
+            request, default=7,
+            maximum=settings.POPULARITY["RETENTION_DAYS"]
+        )
+        try:
+            limit = int(request.query_params.get("limit", 20))
+        except ValueError:
+            limit = 0
+        if not days or not 0 < limit <= 100:
+            return None
+        return popularity.top_products(
+            days * 24, limit, half_life_hours=self.half_life_hours
+        )
+
+    @extend_schema(
+        operation_id="popular_products",
+        summary="Popular Products Fetch",
+        description=(
+            "This endpoint returns the most viewed and added to cart\n"
+            "products of the last `days` days, most popular first.\n"
+            "Counters are written in batches every few seconds"
+        ),
+        tags=tags,
+        parameters=POPULARITY_PARAMS + SPARSE_FIELDSET_PARAMS,
+    )
+    def get(self, request, *args, **kwargs):
+        ranking = self.get_ranking(request)
+        if ranking is None:
+            return Response(
+                data={
+                    "message": (
+                        "days must be a number between 1 and "
+                        f"{settings.POPULARITY['RETENTION_DAYS']}, "
+                        "limit between 1 and 100"
+                    )
+                }, status=400
+            )
+        fieldset = SparseFieldset.from_request(request)
+        products = fieldset.trim_queryset(
+            Product.objects
+            .select_related("category", "seller", "seller__user")
+            .with_stock()
+            .filter(id__in=[product_id for product_id, _ in ranking]),
+            self.serializer_class
+        )
+        found = {product.id: product for product in products}
+        serializer = fieldset.serialize(
+            self.serializer_class,
+            [found[product_id] for product_id, _ in ranking
+             if product_id in found],
+            many=True
+        )
+        return Response(data=serializer.data, status=200)
+
+
+class TrendingProductsView(PopularProductsView):
+    half_life_hours = settings.POPULARITY["HALF_LIFE_HOURS"]
+
+    @extend_schema(
+        operation_id="trending_products",
+        summary="Trending Products Fetch",
+        description=(
+            "This endpoint ranks products like the popular one, but every\n"
+            "hour of activity loses half of its weight after\n"
+            f"{settings.POPULARITY['HALF_LIFE_HOURS']} hours, so recent\n"
+            "views and adds to cart count the most"
+        ),
+        tags=tags,
+        parameters=POPULARITY_PARAMS + SPARSE_FIELDSET_PARAMS,
+    )
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+
+class ProductsBatchView(APIView):
+    serializer_class = ProductSerializer
+
+    def get_response(self, request, data):
+        serializer = ProductBatchSerializer(data=data)
+        serializer.is_valid(raise_exception=True)
+        slugs = list(dict.fromkeys(serializer.validated_data["slugs"]))
+        fieldset = SparseFieldset.from_request(request)
+        products = fieldset.trim_queryset(
+            Product.objects
+            .select_related("category", "seller", "seller__user")
+            .with_stock()
+            .filter(slug__in=slugs),
+            self.serializer_class
+        )
+        found = {product.slug: product for product in products}
+        serializer = fieldset.serialize(
+            self.serializer_class,
+            [found[slug] for slug in slugs if slug in found],
+            many=True
+        )
+        return Response(
+            data={
+                "results": serializer.data,
+                "missing": [slug for slug in slugs if slug not in found],
+            }, status=200
+        )
+
+    @extend_schema(
+        operation_id="products_batch",
+        summary="Products Batch Fetch",
+        description=(
+            "This endpoint returns products for a comma separated list of\n"
+            "slugs in the order they were requested, plus the slugs that\n"
+            "were not found"
+        ),
+        tags=tags,
+        parameters=PRODUCT_BATCH_PARAMS + SPARSE_FIELDSET_PARAMS,
+    )
+    def get(self, request, *args, **kwargs):
+        slugs = request.query_params.get("slugs", "")
+        return self.get_response(request, {
+            "slugs": [slug.strip() for slug in slugs.split(",") if slug.strip()]
+        })
+
+    @extend_schema(
+        operation_id="products_batch_post",
+        summary="Products Batch Fetch (long lists)",
+        description=(
+            "Same as the GET form, but takes the slugs in the request body"
+        ),
+        tags=tags,
+        request=ProductBatchSerializer,
+        parameters=SPARSE_FIELDSET_PARAMS,
+    )
+    def post(self, request, *args, **kwargs):
+        return self.get_response(request, request.data)
+
+
+class BoughtTogetherView(APIView):
+    serializer_class = BoughtTogetherSerializer
+
+    @extend_schema(
+        operation_id="product_bought_together",
+        summary="Frequently Bought Together Fetch",
+        description=(
+            "This endpoint returns products that are most often ordered\n"
+            "together with the product. Unknown products get an empty list"
+        ),
+        tags=tags
+    )
+    def get_neighbours(self, product_id, slug):
+        # slug и is_deleted сверяются в том же запросе: id из кэша мог
+        # устареть, если товар удалили или сменили slug в другом воркере
+        return list(
+            BoughtTogether.objects
+            .filter(
+                product_id=product_id,
+                product__slug=slug,
+                product__is_deleted=False,
+                recommended__is_deleted=False
+            )
+            .select_related(
+                "recommended", "recommended__category",
+                "recommended__seller", "recommended__seller__user"
+            )
+            .order_by("rank")
+        )
+
+    def get(self, request, *args, **kwargs):
+        slug = kwargs["slug"]
+        product_id = product_slugs.get_id(slug)
+        if product_id is None:
+            return Response(data=[], status=200)
+        neighbours = self.get_neighbours(product_id, slug)
+        if not neighbours:
+            # Соседей нет или id устарел: берём свежий id из базы
+            product_slugs.forget(slug)
+            fresh_id = product_slugs.get_id(slug)
+            if fresh_id is not None and fresh_id != product_id:
+                neighbours = self.get_neighbours(fresh_id, slug)
+        inventory.attach_stock(neighbours, "recommended")
+        serializer = self.serializer_class(neighbours, many=True)
         return Response(data=serializer.data, status=200)
 
 
+def get_days_param(request, default, maximum=365):
+    try:
+        days = int(request.query_params.get("days", default))
+    except ValueError:
+        return None
+    if not 0 < days <= maximum:
+        return None
+    return days
+
+
+class PriceHistoryView(APIView):
+
+    @extend_schema(
+        operation_id="product_price_history",
+        summary="Product Price History Fetch",
+        description=(
+            "This endpoint returns price changes of a product for the last\n"
+            "`days` days together with the lowest and highest price.\n"
+            "Changes older than the retention window come as daily buckets"
+        ),
+        parameters=[
+            OpenApiParameter(
+                name="days",
+                description="Size of the window in days. Defaults to 30",
+                required=False,
+                type=OpenApiTypes.INT,
+            ),
+        ],
+        tags=tags
+    )
+    def get(self, request, *args, **kwargs):
+        days = get_days_param(request, default=30)
+        if not days:
+            return Response(
+                data={
+                    "message": "days must be a number between 1 and 365"
+                }, status=400
+            )
+        product = product_slugs.get(kwargs["slug"])
+        if not product:
+            return Response(
+                data={
+                    "message": "Product does not exist!"
+                }, status=404
+            )
+        since = timezone.now() - timedelta(days=days)
+        points = list(
+            PriceHistory.objects
+            .filter(product=product, created_at__gte=since)
+            .order_by("created_at")
+        )
+        daily = list(
+            PriceHistoryDaily.objects
+            .filter(product=product, day__gte=since.date())
+            .order_by("day")
+        )
+        # Цена, действовавшая на начало окна, тоже входит в диапазон
+        prices = [product.price_current]
+        prices += [point.price for point in points]
+        if points and points[0].previous_price is not None:
+            prices.append(points[0].previous_price)
+        for bucket in daily:
+            prices += [bucket.price_min, bucket.price_max]
+        return Response(
+            data={
+                "current_price": product.price_current,
+                "lowest_price": min(prices),
+                "highest_price": max(prices),
+                "points": PriceHistorySerializer(points, many=True).data,
+                "daily": PriceHistoryDailySerializer(daily, many=True).data,
+            }, status=200
+        )
+
+
+class PriceDropsView(APIView):
+    serializer_class = PriceDropSerializer
+    pagination_class = KeysetCursorPagination
+
+    @extend_schema(
+        operation_id="price_drops",
+        summary="Price Drops Feed",
+        description=(
+            "This endpoint returns the latest price drops of the last\n"
+            "`days` days, newest first"
+        ),
+        parameters=[
+            OpenApiParameter(
+                name="days",
+                description="Size of the window in days. Defaults to 7",
+                required=False,
+                type=OpenApiTypes.INT,
+            ),
+        ],
+        tags=tags
+    )
+    def get(self, request, *args, **kwargs):
+        days = get_days_param(request, default=7, maximum=90)
+        if not days:
+            return Response(
+                data={
+                    "message": "days must be a number between 1 and 90"
+                }, status=400
+            )
+        since = timezone.now() - timedelta(days=days)
+        drops = (
+            PriceHistory.objects
+            .filter(
+                created_at__gte=since,
+                price__lt=F("previous_price"),
+                product__is_deleted=False
+            )
+            .select_related("product")
+        )
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(drops, request, view=self)
+        serializer = self.serializer_class(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
+
 class CartView(APIView):
     serializer_class = OrderItemSerializer
 
@@ -174,29 +556,44 @@ class CartView(APIView):
         description=(
             "This endpoint returns all items in a uxer cart"
         ),
-        tags=tags
+        tags=tags,
+        parameters=SPARSE_FIELDSET_PARAMS,
     )
     def get(self, request, *args, **kwargs):
         user = request.user
-        orderitems = (
+        fieldset = SparseFieldset.from_request(request)
+        if not user.is_authenticated:
+            orderitems = GuestCart.from_request(request).get_orderitems()
+            serializer = fieldset.serialize(
+                self.serializer_class, orderitems, many=True
+            )
+            return Response(data=serializer.data)
+        orderitems = fieldset.trim_queryset(
             OrderItem.objects
             .filter(user=user, order=None)
             .select_related(
                 "product", "product__seller", "product__seller__user"
-            )
+            ),
+            self.serializer_class
+        )
+        serializer = fieldset.serialize(
+            self.serializer_class, orderitems, many=True
         )
-        serializer = self.serializer_class(orderitems, many=True)
         return Response(data=serializer.data)
     
     @extend_schema(
         summary="Toggle Item in cart",
         description=(
             "This endpoint allows a user or guest to add/update/remove\n"
-            "an item in cart. If quantity is 0, the item is removed from cart"
+            "an item in cart. If quantity is 0, the item is removed from cart.\n"
+            "Guest carts are kept in a signed cookie and merged into the\n"
+            "user cart on login"
         ),
         tags=tags,
         request=ToggleCartItemSerializer,
+        parameters=IDEMPOTENCY_KEY_PARAMS,
     )
+    @idempotent
     def post(self, request, *args, **kwargs):
         user = request.user
         serializer = ToggleCartItemSerializer(data=request.data)
@@ -204,10 +601,9 @@ class CartView(APIView):
         data = serializer.validated_data
         quantity = data["quantity"]
 
-        product = (
-            Product.objects
-            .select_related("seller", "seller__user")
-            .get_or_none(slug=data["slug"])
+        product = product_slugs.get(
+            data["slug"],
+            Product.objects.select_related("seller", "seller__user")
         )
         if not product:
             return Response(
@@ -215,6 +611,8 @@ class CartView(APIView):
                     "message": "No Product with that slug"
                 }, status=404
             )
+        if not user.is_authenticated:
+            return self.toggle_guest_item(request, product, quantity)
         orderitem, created = (
             OrderItem.objects
             .update_or_create(
@@ -231,6 +629,8 @@ class CartView(APIView):
         if created:
             status_code = 201
             resp_message_substring = "Added To"
+            if quantity:
+                popularity.buffer.record_cart_add(product.id)
         if orderitem.quantity == 0:
             resp_message_substring = "Removed From"
             orderitem.delete()
@@ -245,6 +645,35 @@ class CartView(APIView):
             }, status=status_code
         )
 
+    def toggle_guest_item(self, request, product, quantity):
+        cart = GuestCart.from_request(request)
+        created = product.slug not in cart.items
+        if not cart.set(product.slug, quantity):
+            return Response(
+                data={
+                    "message": "Cart is full"
+                }, status=400
+            )
+        resp_message_substring = "Added To" if created else "Updated In"
+        status_code = 201 if created else 200
+        data = None
+        if quantity == 0:
+            resp_message_substring = "Removed From"
+            status_code = 200
+        else:
+            if created:
+                popularity.buffer.record_cart_add(product.id)
+            orderitem = OrderItem(product=product, quantity=quantity)
+            data = self.serializer_class(orderitem).data
+        response = Response(
+            data={
+                "message": f"Item {resp_message_substring} Cart",
+                "item": data
+            }, status=status_code
+        )
+        cart.save(response)
+        return response
+
 
 class CheckoutView(APIView):
     serializer_class = CheckoutSerializer
@@ -256,13 +685,22 @@ class CheckoutView(APIView):
             "payment can then be made through"
         ),
         tags=tags,
-        request=CheckoutSerializer
+        request=CheckoutSerializer,
+        parameters=IDEMPOTENCY_KEY_PARAMS,
     )
+    @idempotent
     def post(self, request, *args, **kwargs):
         # Proceed to checkout
         user = request.user
+        if not user.is_authenticated:
+            return Response(
+                data={
+                    "message": "Log in to checkout, your cart will be kept"
+                }, status=401
+            )
         orderitems = OrderItem.objects.filter(user=user, order=None)
-        if not orderitems.exists():
+        items = set(orderitems.values_list("id", "product_id", "quantity"))
+        if not items:
             return Response(
                 data={
                     "message": "Noe Items in Cart"
@@ -293,8 +731,52 @@ class CheckoutView(APIView):
             value = getattr(shipping, field)
             data[field] = value
 
-        order = Order.objects.create(user=user, **data)
-        orderitems.update(order=order)
+        quantities = {}
+        for _, product_id, quantity in items:
+            quantities[product_id] = quantities.get(product_id, 0) + quantity
+        # Остаток резервируется до транзакции заказа и без блокировок:
+        # покупатели одного товара не ждут друг друга
+        tx_ref = Order.new_tx_ref()
+        try:
+            sales = inventory.reserve(quantities, order_ref=tx_ref)
+        except inventory.OutOfStock as exc:
+            slugs = Product.objects.filter(
+                id__in=exc.product_ids
+            ).values_list("slug", flat=True)
+            return Response(
+                data={
+                    "message": "Not enough stock",
+                    "products": list(slugs)
+                }, status=409
+            )
+
+        order = None
+        placed = False
+        try:
+            with transaction.atomic():
+                # Корзина могла измениться после резервирования: заказ
+                # создаётся, только если её строки те же самые
+                locked = set(
+                    orderitems.select_for_update()
+                    .values_list("id", "product_id", "quantity")
+                )
+                if locked == items:
+                    order = Order.objects.create(
+                        user=user, tx_ref=tx_ref, **data
+                    )
+                    OrderItem.objects.filter(
+                        id__in=[item_id for item_id, _, _ in items]
+                    ).update(order=order)
+            placed = order is not None
+        finally:
+            if not placed:
+                inventory.release(sales)
+        if not placed:
+            return Response(
+                data={
+                    "message": "Cart changed during checkout, try again"
+                }, status=409
+            )
 
         serializer = OrderSerializer(order)
         return Response(
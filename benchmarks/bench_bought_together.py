@@ -0,0 +1,31 @@
+"""
+Full rebuild of the frequently-bought-together table on a seeded shop.
+
+    python -m benchmarks.bench_bought_together --orders 100000
+"""
+import argparse
+from io import StringIO
+
+from benchmarks.utils import seed_shop, setup_django, test_database, timer
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--products", type=int, default=20000)
+    parser.add_argument("--orders", type=int, default=100000)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.core.management import call_command
+
+    with test_database():
+        print(seed_shop(
+            users=args.orders // 5, sellers=100, products=args.products,
+            orders=args.orders, reviews=0, carts=0
+        ))
+        with timer(f"build_bought_together, {args.orders} orders", args.orders):
+            call_command("build_bought_together", full=True, stdout=StringIO())
+
+
+if __name__ == "__main__":
+    main()
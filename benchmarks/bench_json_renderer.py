@@ -0,0 +1,79 @@
+"""
+JSONRenderer vs FastJSONRenderer on 10k-item payloads.
+
+    python -m benchmarks.bench_json_renderer --items 10000
+"""
+import argparse
+import datetime
+import decimal
+import timeit
+import uuid
+
+from benchmarks.utils import setup_django
+
+
+def typed_payload(items):
+    """Values as returned by .values() or coerce_to_string=False fields"""
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return [
+        {
+            "id": uuid.uuid4(),
+            "tx_ref": f"TX{index:010d}",
+            "price_current": decimal.Decimal("199.99"),
+            "price_old": decimal.Decimal("249.00"),
+            "created_at": now,
+            "date_delivered": now.date(),
+            "quantity": index % 7,
+        }
+        for index in range(items)
+    ]
+
+
+def serialized_payload(items):
+    """Values as returned by the project serializers (already strings)"""
+    return [
+        {
+            "name": f"Product {index}",
+            "slug": f"product-{index}",
+            "price_current": "199.99",
+            "price_old": "249.00",
+            "created_at": "2025-01-01T12:00:00Z",
+            "category": {"name": "Phones", "slug": "phones"},
+        }
+        for index in range(items)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+    from rest_framework.renderers import JSONRenderer
+    from apps.common.renderers import FastJSONRenderer
+
+    for label, payload in (
+            ("typed", typed_payload(args.items)),
+            ("serialized", serialized_payload(args.items)),
+    ):
+        data = {"results": payload}
+        assert JSONRenderer().render(data) == FastJSONRenderer().render(data)
+        # Замеры чередуются, чтобы шум машины одинаково влиял на оба
+        base = fast = float("inf")
+        for _ in range(args.repeat):
+            base = min(base, timeit.timeit(
+                lambda: JSONRenderer().render(data), number=1
+            ))
+            fast = min(fast, timeit.timeit(
+                lambda: FastJSONRenderer().render(data), number=1
+            ))
+        print(
+            f"{label:>10}: JSONRenderer {base * 1000:.1f} ms, "
+            f"FastJSONRenderer {fast * 1000:.1f} ms, x{base / fast:.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Bulk order status transitions for one seller.
+
+    python -m benchmarks.bench_order_status --orders 10000
+"""
+import argparse
+
+from benchmarks.utils import setup_django, test_database, timer
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--orders", type=int, default=10000)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.contrib.auth.hashers import make_password
+    from rest_framework.test import APIRequestFactory, force_authenticate
+
+    from apps.accounts.models import User
+    from apps.profiles.models import Order, OrderItem
+    from apps.sellers.models import Seller
+    from apps.sellers.views import SellerOrdersStatusView
+    from apps.shop.models import Category, Product
+
+    with test_database():
+        password = make_password("benchmark")
+        seller_user, buyer = User.objects.bulk_create([
+            User(email="seller@bench.local", first_name="S", last_name="S",
+                 password=password, account_type="SELLER"),
+            User(email="buyer@bench.local", first_name="B", last_name="B",
+                 password=password),
+        ])
+        seller = Seller.objects.create(
+            user=seller_user, business_name="Bench", is_approved=True
+        )
+        category = Category.objects.create(name="Bench")
+        product = Product.objects.create(
+            seller=seller, category=category, name="Bench product",
+            desc="", price_current=10
+        )
+        orders = Order.objects.bulk_create(
+            [Order(user=buyer, tx_ref=f"BENCH{i:08d}")
+             for i in range(args.orders)],
+            batch_size=2000
+        )
+        OrderItem.objects.bulk_create(
+            [OrderItem(user=buyer, order=order, product=product)
+             for order in orders],
+            batch_size=2000
+        )
+        tx_refs = [order.tx_ref for order in orders]
+
+        factory = APIRequestFactory()
+        view = SellerOrdersStatusView.as_view()
+        for target in ("PACKING", "SHIPPING", "SUCCESS"):
+            request = factory.post(
+                "/", {"tx_refs": tx_refs, "delivery_status": target},
+                format="json"
+            )
+            force_authenticate(request, user=seller_user)
+            with timer(f"{args.orders} orders -> {target}", args.orders):
+                response = view(request)
+            assert response.data["updated"] == args.orders, response.data
+
+
+if __name__ == "__main__":
+    main()
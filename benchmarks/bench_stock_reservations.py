@@ -0,0 +1,126 @@
+"""
+Many concurrent buyers checking out one SKU through CheckoutView while
+the compactor folds the stock ledger next to them. Every order belongs
+to its own buyer with a one item cart prepared before the timer starts.
+
+    python -m benchmarks.bench_stock_reservations --buyers 32 --orders 2000
+
+Runs on a file based SQLite test database so the threads get real
+separate connections. SQLite locks the whole database, so transactions
+start IMMEDIATE and writers queue instead of deadlocking on the lock
+upgrade; point DATABASES at PostgreSQL for numbers that reflect row
+level concurrency.
+"""
+import argparse
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.utils import setup_django, test_database, timer
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--buyers", type=int, default=32)
+    parser.add_argument("--orders", type=int, default=2000)
+    parser.add_argument("--stock", type=int, default=1500)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import connection, connections
+
+    from rest_framework.test import APIRequestFactory, force_authenticate
+
+    from apps.accounts.models import User
+    from apps.profiles.models import OrderItem, ShippingAddress
+    from apps.sellers.models import Seller
+    from apps.shop import inventory
+    from apps.shop.models import Category, Product
+    from apps.shop.views import CheckoutView
+
+    if connection.vendor == "sqlite":
+        test_settings = connection.settings_dict
+        test_settings["TEST"]["NAME"] = os.path.join(
+            tempfile.mkdtemp(), "bench_stock.sqlite3"
+        )
+        test_settings["OPTIONS"]["timeout"] = 60
+        test_settings["OPTIONS"]["transaction_mode"] = "IMMEDIATE"
+
+    with test_database():
+        seller_user = User.objects.create_user(
+            email="seller@bench.local", first_name="S", last_name="S",
+            password="benchmark", account_type="SELLER"
+        )
+        seller = Seller.objects.create(
+            user=seller_user, business_name="Bench", is_approved=True
+        )
+        category = Category.objects.create(name="Bench")
+        product = Product.objects.create(
+            seller=seller, category=category, name="Flash sale",
+            desc="", price_current=10, in_stock=args.stock
+        )
+
+        buyers = User.objects.bulk_create([
+            User(
+                email=f"buyer{number}@bench.local",
+                first_name="B", last_name="B"
+            )
+            for number in range(args.orders)
+        ])
+        addresses = ShippingAddress.objects.bulk_create([
+            ShippingAddress(
+                user=buyer, full_name="Buyer", email=buyer.email,
+                phone="123", address="Street 1", city="City",
+                country="Country", zipcode="123456"
+            )
+            for buyer in buyers
+        ])
+        OrderItem.objects.bulk_create([
+            OrderItem(user=buyer, product=product, quantity=1)
+            for buyer in buyers
+        ])
+
+        factory = APIRequestFactory()
+        view = CheckoutView.as_view()
+        sold = []
+        done = threading.Event()
+
+        def buy(number):
+            request = factory.post(
+                "/", {"shipping_id": str(addresses[number].id)},
+                format="json"
+            )
+            force_authenticate(request, user=buyers[number])
+            response = view(request)
+            if response.status_code == 200:
+                sold.append(1)
+            else:
+                assert response.status_code == 409, response.data
+
+        def compactor():
+            while not done.wait(0.05):
+                inventory.compact()
+            connections.close_all()
+
+        background = threading.Thread(target=compactor)
+        background.start()
+        with timer(
+                f"{args.orders} checkouts, {args.buyers} buyers",
+                args.orders
+        ):
+            with ThreadPoolExecutor(args.buyers) as pool:
+                list(pool.map(buy, range(args.orders)))
+        done.set()
+        background.join()
+        while inventory.compact():
+            pass
+
+        product.refresh_from_db()
+        print(f"sold {len(sold)} of {args.stock}, in_stock {product.in_stock}")
+        assert len(sold) <= args.stock
+        assert product.in_stock == args.stock - len(sold) >= 0
+
+
+if __name__ == "__main__":
+    main()
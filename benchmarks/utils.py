@@ -0,0 +1,47 @@
+import os
+import time
+from contextlib import contextmanager
+
+
+def setup_django():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "drf_ecommerce.settings")
+    import django
+    django.setup()
+
+
+@contextmanager
+def test_database():
+    """Runs the benchmark against a throwaway test database"""
+    from django.db import connection
+    from django.test.utils import (
+        setup_test_environment, teardown_test_environment
+    )
+
+    setup_test_environment()
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+@contextmanager
+def timer(label, items=None):
+    started = time.perf_counter()
+    yield
+    elapsed = time.perf_counter() - started
+    rate = f", {items / elapsed:,.0f} items/s" if items else ""
+    print(f"{label}: {elapsed * 1000:.1f} ms{rate}")
+
+
+def seed_shop(**options):
+    """Fills the current database with the seed_shop command, quietly"""
+    from io import StringIO
+
+    from django.core.management import call_command
+
+    out = StringIO()
+    call_command("seed_shop", stdout=out, **options)
+    return out.getvalue().splitlines()[-1]
@@ -60,6 +60,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'apps.common.middleware.RequestProfilerMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -94,6 +95,19 @@ DATABASES = {
     }
 }
 
+# Кэш в памяти процесса: версии моделей (apps.common.cache), кэш COUNT(*)
+# пагинации, версии slug-кэшей и одобрение продавцов видны только своему
+# воркеру. При нескольких воркерах изменение в одном не сбрасывает кэш
+# других: они отдают старые значения до истечения таймаута (COUNT — до
+# 300 секунд). id из slug-кэшей не устаревает незаметно: запрос сверяет
+# его со slug и is_deleted. Для такого развёртывания укажите общий
+# бэкенд, например django.core.cache.backends.redis.RedisCache
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -144,6 +158,12 @@ REST_FRAMEWORK = {
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ],
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    # Тот же JSON, что у JSONRenderer, но с быстрым кодированием
+    # Decimal/UUID/datetime (см. benchmarks/bench_json_renderer.py)
+    # 'DEFAULT_RENDERER_CLASSES': [
+    #     'apps.common.renderers.FastJSONRenderer',
+    #     'rest_framework.renderers.BrowsableAPIRenderer',
+    # ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 2,
     'DEFAULT_THROTTLE_CLASSES': [
@@ -171,6 +191,28 @@ SPECTACULAR_SETTINGS = {
     # SCHEMA_PATH_PREFIX
 }
 
+# Схема собирается командой build_openapi_schema при сборке,
+# см. apps.common.views.OpenAPISchemaView
+OPENAPI_SCHEMA = {
+    "DIR": BASE_DIR / "var" / "openapi",
+}
+
+# Бюджет холодного старта воркера: django.setup() и загрузка URLconf.
+# Модули проверяет тест, время - команда profile_startup --check на
+# стабильной машине (тест проверяет время только с переменной окружения
+# STARTUP_BUDGET_SECONDS)
+STARTUP_BUDGET = {
+    "SECONDS": 2.0,
+    "MODULES": 900,
+    # тяжёлые модули, которые не должны загружаться при старте
+    "FORBIDDEN_MODULES": [
+        "tkinter",
+        "turtle",
+        "drf_spectacular.generators",
+        "drf_spectacular.views",
+    ],
+}
+
 SIMPLE_JWT = {
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
@@ -178,6 +220,56 @@ SIMPLE_JWT = {
     'REFRESH_TOKEN_LIFETIME': timedelta(days=30),
 }
 
+# id продавца берётся из claim seller_id access-токена, а одобрение из
+# кэша на SELLER_APPROVAL_CACHE_TTL секунд. Seller.save сбрасывает запись
+# только в кэше своего воркера (см. CACHES): отзыв одобрения действует
+# в нём сразу, в остальных воркерах и через queryset.update() - не позже
+# чем через TTL. Обновление токена одобрение не продлевает
+SELLER_TOKEN_CLAIMS = True
+SELLER_APPROVAL_CACHE_TTL = 60
+
+# Завершённые заказы старше AFTER_DAYS переносятся в архивные таблицы
+# командой archive_orders
+ORDER_ARCHIVE = {
+    "AFTER_DAYS": 365,
+    "BATCH_SIZE": 1000,
+}
+
+# Счётчики просмотров и добавлений в корзину копятся в памяти воркера
+# и пишутся пачками, см. apps.shop.popularity
+POPULARITY = {
+    "FLUSH_INTERVAL": 10,  # сек; 0 — только явный flush() и выход процесса
+    "MAX_PENDING": 10000,  # пар (товар, час) в буфере до досрочной записи
+    "CART_ADD_WEIGHT": 5,  # добавление в корзину весит столько просмотров
+    "HALF_LIFE_HOURS": 24,  # период полураспада для трендов
+    "RETENTION_DAYS": 30,
+}
+
+# Корзина гостя хранится вне базы данных до входа в аккаунт
+GUEST_CART = {
+    "STORAGE": "cookie",  # "cookie" (подписанная cookie) или "cache"
+    "COOKIE_NAME": "guest_cart",
+    "MAX_AGE": 60 * 60 * 24 * 30,
+    "MAX_ITEMS": 50,
+}
+
+# Профилирование отдельных запросов: сотрудник отправляет заголовок
+# X-Profile: cprofile|sampling, см. apps.common.middleware
+REQUEST_PROFILER = {
+    "HEADER": "X-Profile",
+    "SAMPLE_RATE": 0.0,  # доля всех запросов, профилируемых без заголовка
+    "ENGINE": "sampling",  # движок для запросов из SAMPLE_RATE
+    "SAMPLING_INTERVAL": 0.001,
+    "OUTPUT_DIR": BASE_DIR / "var" / "profiles",
+}
+
+# Повторы запросов с заголовком Idempotency-Key получают сохранённый ответ
+IDEMPOTENCY = {
+    "TTL": 60 * 60 * 24,
+    "WAIT_TIMEOUT": 10,  # сколько ждать завершения такого же запроса, сек
+    "POLL_INTERVAL": 0.1,
+}
+
 # CORS
 CORS_ALLOWED_ORIGINS = [
     "http://example.com",
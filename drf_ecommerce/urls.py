@@ -16,17 +16,21 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
-from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
+
+from apps.common.views import OpenAPISchemaView, lazy_view
 
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path(
-        'api/schema/', SpectacularAPIView.as_view(),
+        'api/schema/', OpenAPISchemaView.as_view(),
         name='schema',
     ),
     path(
-        'api/docs/', SpectacularSwaggerView.as_view(url_name='schema'),
+        'api/docs/',
+        lazy_view(
+            'drf_spectacular.views.SpectacularSwaggerView', url_name='schema'
+        ),
         name='swagger-ui'
     ),
     path(
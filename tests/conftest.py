@@ -1,6 +1,7 @@
 import pytest
 from faker import Faker
 
+from django.core.cache import cache
 from django.urls import reverse
 
 from rest_framework.test import APIRequestFactory
@@ -8,6 +9,7 @@ from rest_framework_simplejwt.tokens import RefreshToken
 
 from apps.accounts.models import User
 from apps.shop.models import Review, Product, Category
+from apps.shop.popularity import buffer as popularity_buffer
 from apps.sellers.models import Seller
 
 
@@ -15,6 +17,23 @@ fake = Faker()  # Создаем экземпляр Faker
 Faker.seed(42)  # Для воспроизводимости результатов
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Кэш не переживает тест, как и данные в базе"""
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def popularity_without_thread(settings):
+    """Счётчики популярности пишутся в базу только явным flush()"""
+    settings.POPULARITY = {**settings.POPULARITY, "FLUSH_INTERVAL": 0}
+    popularity_buffer.clear()
+    yield
+    popularity_buffer.clear()
+
+
 @pytest.fixture
 def api_request_factory():
     """Создаёт фабрику api-реквестов"""
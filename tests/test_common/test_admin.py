@@ -0,0 +1,134 @@
+import pytest
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.accounts.models import User
+from apps.common.paginations import EstimatedCountPaginator
+from apps.profiles.models import Order, OrderItem
+from apps.shop.models import Product
+
+
+CHANGELISTS = (
+    "/admin/accounts/user/",
+    "/admin/sellers/seller/",
+    "/admin/shop/product/",
+    "/admin/shop/review/",
+    "/admin/profiles/order/",
+    "/admin/profiles/orderitem/",
+)
+
+
+def changelist_queries(client):
+    counts = {}
+    for url in CHANGELISTS:
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == 200, url
+        counts[url] = len(context)
+    return counts
+
+
+@pytest.mark.django_db
+def test_admin_changelists_have_fixed_query_count(
+        client, faker_user_factory, faker_review_factory
+):
+    """Число запросов страницы списка в админке не зависит от числа строк"""
+    staff = faker_user_factory(is_staff=True)
+    client.force_login(staff)
+
+    def add_rows():
+        for _ in range(3):
+            review = faker_review_factory()
+            order = Order.objects.create(user=review.user)
+            OrderItem.objects.create(
+                user=review.user, order=order, product=review.product
+            )
+
+    add_rows()
+    few = changelist_queries(client)
+    add_rows()
+    add_rows()
+    assert changelist_queries(client) == few
+    assert max(few.values()) <= 5
+
+
+@pytest.mark.django_db
+def test_estimated_count_paginator(faker_product_factory):
+    """Для большой таблицы без фильтров число строк берётся из статистики"""
+    for _ in range(3):
+        faker_product_factory()
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+
+    paginator = EstimatedCountPaginator(
+        Product.objects.unfiltered().order_by("pk"), 2
+    )
+    paginator.estimate_threshold = 1
+    with CaptureQueriesContext(connection) as context:
+        assert paginator.count == 3
+    assert "COUNT" not in context.captured_queries[0]["sql"]
+    assert paginator.num_pages == 2
+
+    filtered = EstimatedCountPaginator(
+        Product.objects.filter(in_stock__gte=0).order_by("pk"), 2
+    )
+    filtered.estimate_threshold = 1
+    with CaptureQueriesContext(connection) as context:
+        assert filtered.count == 3
+    assert "COUNT" in context.captured_queries[0]["sql"]
+
+
+@pytest.mark.django_db
+def test_user_admin_hashes_password(client, faker_user_factory):
+    """Пользователь из админки создаётся с хешем пароля, а не с открытым"""
+    staff = faker_user_factory(is_staff=True)
+    client.force_login(staff)
+    response = client.post("/admin/accounts/user/add/", {
+        "email": "new@example.com",
+        "first_name": "New",
+        "last_name": "User",
+        "account_type": "BUYER",
+        "usable_password": "true",
+        "password1": "S3cure-passw0rd",
+        "password2": "S3cure-passw0rd",
+    })
+    assert response.status_code == 302, response.context["adminform"].errors
+    user = User.objects.get(email="new@example.com")
+    assert user.password != "S3cure-passw0rd"
+    assert user.check_password("S3cure-passw0rd")
+
+    for url in (
+            f"/admin/accounts/user/{user.pk}/change/",
+            f"/admin/accounts/user/{user.pk}/password/",
+    ):
+        assert client.get(url).status_code == 200, url
+
+
+@pytest.mark.django_db
+def test_admin_search_is_index_friendly(
+        client, faker_user_factory, faker_product_factory
+):
+    """
+    Поиск в админке сравнивает столбец как есть, без UPPER():
+    точное совпадение и начало строки читаются по индексу
+    """
+    staff = faker_user_factory(is_staff=True)
+    client.force_login(staff)
+    product = faker_product_factory(name="Wireless Speaker")
+    faker_product_factory(name="Speaker Wireless")
+
+    for url, term, found in (
+            ("/admin/shop/product/", "Wireless Sp", [product]),
+            ("/admin/accounts/user/", staff.email, [staff]),
+    ):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url, {"q": term})
+        assert response.status_code == 200
+        assert list(response.context["cl"].result_list) == found
+        searches = [
+            query["sql"] for query in context.captured_queries
+            if "LIKE" in query["sql"] or "email\" =" in query["sql"]
+        ]
+        assert searches, url
+        assert not any("UPPER(" in sql for sql in searches), searches
@@ -0,0 +1,85 @@
+import pytest
+
+from django.db import connection
+
+from rest_framework.request import Request
+
+from apps.common.paginations import CachedCountPagination
+from apps.shop.models import Product
+from apps.shop.views import ProductsView
+
+
+@pytest.mark.django_db
+def test_products_count_is_cached_per_filter_set(
+        api_request_factory, faker_product_factory, django_assert_num_queries
+):
+    """
+    Число товаров считается один раз на набор фильтров
+    и пересчитывается после изменения товаров
+    """
+    for price in (10, 20, 30):
+        faker_product_factory(price_current=price)
+    view = ProductsView.as_view()
+
+    def fetch(params):
+        response = view(api_request_factory.get("/", params))
+        return response.data
+
+    # статистика таблицы + число строк + страница
+    with django_assert_num_queries(3):
+        data = fetch({"min_price": "15", "page_size": 1})
+    assert data["count"] == 2 and data["count_is_estimate"] is False
+
+    # Та же выборка в другой записи и на другой странице: только страница
+    with django_assert_num_queries(1):
+        data = fetch({"min_price": "15.00", "page": 2, "page_size": 1})
+    assert data["count"] == 2
+
+    faker_product_factory(price_current=40)
+    assert fetch({"min_price": "15"})["count"] == 3
+    assert fetch({})["count"] == 4
+
+
+@pytest.mark.django_db
+def test_count_is_estimated_for_big_tables(
+        api_request_factory, faker_product_factory
+):
+    """Для большой таблицы без фильтров число берётся из статистики"""
+    for _ in range(3):
+        faker_product_factory()
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+    pagination = CachedCountPagination()
+    pagination.estimate_threshold = 1
+
+    request = Request(api_request_factory.get("/", {"page": 5}))
+    page = pagination.paginate_queryset(
+        Product.objects.unfiltered().order_by("pk"), request
+    )
+    response = pagination.get_paginated_response([])
+    assert page == []
+    assert response.data["count"] == 3
+    assert response.data["count_is_estimate"] is True
+
+
+@pytest.mark.django_db
+def test_count_cache_key_follows_queryset(
+        api_request_factory, faker_product_factory, faker_sellers_factory
+):
+    """
+    Ключ кэша строится по запросу, а не по URL: списки разных
+    пользователей по одному адресу не делят число строк
+    """
+    first, second = faker_sellers_factory(), faker_sellers_factory()
+    faker_product_factory(seller=first)
+    for _ in range(2):
+        faker_product_factory(seller=second)
+    request = Request(api_request_factory.get("/", {"page_size": 1}))
+
+    for seller, count in ((first, 1), (second, 2), (first, 1)):
+        pagination = CachedCountPagination()
+        pagination.page_size = 1
+        pagination.paginate_queryset(
+            Product.objects.filter(seller=seller).order_by("pk"), request
+        )
+        assert pagination.get_paginated_response([]).data["count"] == count
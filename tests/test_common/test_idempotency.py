@@ -0,0 +1,59 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import force_authenticate
+
+from apps.common.models import IdempotencyKey
+from apps.profiles.models import Order, OrderItem, ShippingAddress
+from apps.shop.views import CheckoutView
+
+
+@pytest.mark.django_db
+def test_checkout_is_replayed_by_idempotency_key(
+        api_request_factory, faker_user_factory, faker_product_factory,
+        settings
+):
+    """Повтор оформления заказа с тем же ключом не создаёт второй заказ"""
+    settings.IDEMPOTENCY = {**settings.IDEMPOTENCY, "WAIT_TIMEOUT": 0}
+    buyer = faker_user_factory(account_type="BUYER")
+    OrderItem.objects.create(
+        user=buyer, product=faker_product_factory(in_stock=5), quantity=1
+    )
+    shipping = ShippingAddress.objects.create(
+        user=buyer, full_name="Buyer", email=buyer.email, phone="123",
+        address="Street 1", city="City", country="Country", zipcode="123456"
+    )
+    view = CheckoutView.as_view()
+
+    def checkout(key, shipping_id=shipping.id):
+        request = api_request_factory.post(
+            "/shop/checkout/", {"shipping_id": str(shipping_id)},
+            format="json", HTTP_IDEMPOTENCY_KEY=key
+        )
+        force_authenticate(request, user=buyer)
+        return view(request)
+
+    first = checkout("order-1")
+    retry = checkout("order-1")
+    assert first.status_code == retry.status_code == status.HTTP_200_OK
+    assert retry["Idempotent-Replayed"] == "true"
+    assert retry.data == first.data
+    assert Order.objects.count() == 1
+
+    response = checkout("order-1", shipping_id=buyer.id)
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    # Запрос с этим ключом ещё выполняется
+    IdempotencyKey.objects.filter(key="order-1").update(response_status=None)
+    assert checkout("order-1").status_code == status.HTTP_409_CONFLICT
+
+    IdempotencyKey.objects.update(expires_at=timezone.now() - timedelta(1))
+    out = StringIO()
+    call_command("purge_idempotency_keys", batch_size=1, stdout=out)
+    assert "Deleted 1 " in out.getvalue()
+    assert not IdempotencyKey.objects.exists()
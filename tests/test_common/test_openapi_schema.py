@@ -0,0 +1,64 @@
+import gzip
+import json
+import os
+
+from apps.common.schema import build_schema
+from apps.common.views import OpenAPISchemaView
+
+
+def test_prebuilt_openapi_schema(client, settings, tmp_path, monkeypatch):
+    """Схема отдаётся из собранного файла, сжатой и с ETag"""
+    settings.OPENAPI_SCHEMA = {"DIR": tmp_path}
+    monkeypatch.setattr(OpenAPISchemaView, "prebuilt", None)
+    path, prebuilt = build_schema()
+    assert path.parent == tmp_path
+    assert "/shop/products/" in json.loads(path.read_bytes())["paths"]
+
+    response = client.get("/api/schema/", HTTP_ACCEPT_ENCODING="gzip, br")
+    assert response.status_code == 200
+    assert response["Content-Encoding"] == "gzip"
+    assert response["ETag"] == prebuilt.etag
+    assert gzip.decompress(response.content) == path.read_bytes()
+
+    response = client.get("/api/schema/")
+    assert "Content-Encoding" not in response
+    assert response.content == path.read_bytes()
+
+    response = client.get("/api/schema/", HTTP_IF_NONE_MATCH=prebuilt.etag)
+    assert response.status_code == 304
+
+
+def test_openapi_schema_live_in_debug(client, settings, tmp_path, monkeypatch):
+    """Без собранного файла в DEBUG схема генерируется на лету"""
+    settings.OPENAPI_SCHEMA = {"DIR": tmp_path}
+    settings.DEBUG = True
+    monkeypatch.setattr(OpenAPISchemaView, "prebuilt", None)
+    response = client.get("/api/schema/")
+    assert response.status_code == 200
+    assert "ETag" not in response
+    assert OpenAPISchemaView.prebuilt is None
+
+
+def test_openapi_schema_reloads_after_rebuild(
+        client, settings, tmp_path, monkeypatch
+):
+    """
+    Пересобранный файл подхватывается по mtime без перезапуска:
+    build_openapi_schema запускается в другом процессе
+    """
+    settings.OPENAPI_SCHEMA = {"DIR": tmp_path}
+    monkeypatch.setattr(OpenAPISchemaView, "prebuilt", None)
+    path, prebuilt = build_schema()
+    response = client.get("/api/schema/")
+    assert response["ETag"] == prebuilt.etag
+
+    content = json.loads(path.read_bytes())
+    content["info"]["title"] = "Rebuilt"
+    path.write_bytes(json.dumps(content).encode())
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    response = client.get("/api/schema/", HTTP_ACCEPT_ENCODING="gzip")
+    assert response["ETag"] != prebuilt.etag
+    # Старый .gz не совпадает с новым файлом и не отдаётся
+    assert gzip.decompress(response.content) == path.read_bytes()
@@ -0,0 +1,46 @@
+import pstats
+
+import pytest
+
+from rest_framework import status
+
+
+@pytest.mark.django_db
+def test_request_profiler(
+        client, tmp_path, settings, access_token, faker_user_factory
+):
+    """Профилируются только запросы сотрудников с заголовком X-Profile"""
+    settings.REQUEST_PROFILER = {
+        **settings.REQUEST_PROFILER, "OUTPUT_DIR": tmp_path
+    }
+    staff = faker_user_factory(is_staff=True)
+    buyer = faker_user_factory(account_type="BUYER")
+
+    response = client.get(
+        "/shop/products/", HTTP_X_PROFILE="sampling",
+        HTTP_AUTHORIZATION=f"Bearer {access_token(buyer)}"
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert "X-Profile-Id" not in response
+
+    response = client.get(
+        "/shop/products/", HTTP_X_PROFILE="cprofile",
+        HTTP_AUTHORIZATION=f"Bearer {access_token(staff)}"
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["results"] == []
+    stored = tmp_path / response["X-Profile-Id"]
+    assert float(response["X-Profile-Overhead-Ms"]) >= 0
+    stats = pstats.Stats(str(stored))
+    assert any(
+        name == "get" and path.endswith("shop/views.py")
+        for path, _, name in stats.stats
+    )
+
+    client.force_login(staff)
+    response = client.get(
+        "/shop/products/", HTTP_X_PROFILE="sampling", HTTP_X_PROFILE_RETURN="1"
+    )
+    assert response["X-Profile-Status"] == "200"
+    assert response["Content-Type"] == "text/plain"
+    assert response["X-Profile-Id"].endswith(".collapsed")
@@ -0,0 +1,35 @@
+import datetime
+import decimal
+import uuid
+
+from rest_framework.renderers import JSONRenderer
+
+from apps.common.renderers import FastJSONRenderer
+
+
+PAYLOAD = {
+    "results": [
+        {
+            "id": uuid.UUID(int=index),
+            "price": decimal.Decimal("10.99") * index,
+            "created_at": datetime.datetime(
+                2025, 1, 1, 12, 30, index, 15, tzinfo=datetime.timezone.utc
+            ),
+            "naive": datetime.datetime(2025, 1, 1, 12, 30),
+            "day": datetime.date(2025, 1, index + 1),
+            "delta": datetime.timedelta(hours=index),
+            "name": f"Товар\u2028{index}",
+            "tags": ("a", None, True, 1.5),
+        }
+        for index in range(5)
+    ],
+    "next": None,
+}
+
+
+def test_fast_renderer_output_matches_drf():
+    """Вывод совпадает с JSONRenderer байт в байт, в том числе с отступами"""
+    for media_type in (None, "application/json; indent=4"):
+        expected = JSONRenderer().render(PAYLOAD, media_type)
+        assert FastJSONRenderer().render(PAYLOAD, media_type) == expected
+    assert FastJSONRenderer().render(None) == b""
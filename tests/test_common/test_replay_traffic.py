@@ -0,0 +1,41 @@
+import json
+from io import StringIO
+
+import pytest
+
+from django.core.management import call_command
+
+
+@pytest.mark.django_db
+def test_replay_traffic(tmp_path, faker_user_factory, faker_product_factory):
+    """
+    Записанный трафик проигрывается с токенами нужной роли,
+    отчёт группируется по шаблонам URL
+    """
+    faker_user_factory(account_type="BUYER")
+    product = faker_product_factory()
+    log = tmp_path / "traffic.ndjson"
+    entries = [
+        {"ts": 0, "method": "GET", "path": "/shop/products/",
+         "query": {"page": 1}},
+        {"ts": 1, "method": "get", "path": f"/shop/products/{product.slug}/"},
+        {"ts": 2, "method": "GET", "path": "/shop/products/missing/"},
+        {"ts": 3, "method": "GET", "path": "/profiles/orders/",
+         "role": "buyer"},
+        {"ts": 4, "method": "GET", "path": "/profiles/orders/"},
+    ]
+    log.write_text("\n".join(json.dumps(entry) for entry in entries))
+    report_path = tmp_path / "report.json"
+
+    call_command(
+        "replay_traffic", str(log), concurrency=1,
+        output=str(report_path), stdout=StringIO()
+    )
+
+    report = json.loads(report_path.read_text())
+    assert report["/shop/products/<slug:slug>/"]["statuses"] == {
+        "200": 1, "404": 1
+    }
+    assert report["/profiles/orders/"]["statuses"] == {"200": 1, "401": 1}
+    assert report["TOTAL"]["requests"] == 5
+    assert report["TOTAL"]["error_rate"] == 0
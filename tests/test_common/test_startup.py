@@ -0,0 +1,56 @@
+import os
+
+import pytest
+
+from apps.common.startup import (
+    check_budget, importtime_digest, measure_startup
+)
+
+
+def test_startup_budget(settings):
+    """Холодный старт укладывается в бюджет по модулям"""
+    result = measure_startup()
+    assert check_budget(result, timed=False) == []
+    assert "apps.shop.urls" in result["modules"]
+
+    tight = {**settings.STARTUP_BUDGET, "MODULES": 10}
+    assert check_budget(result, tight, timed=False) == [
+        f"{len(result['modules'])} modules imported, budget 10"
+    ]
+
+
+@pytest.mark.skipif(
+    "STARTUP_BUDGET_SECONDS" not in os.environ,
+    reason="wall time is checked by profile_startup --check"
+)
+def test_startup_budget_time(settings):
+    """
+    Время старта зависит от машины и её загрузки, поэтому лимит
+    задаётся переменной окружения STARTUP_BUDGET_SECONDS
+    """
+    budget = {
+        **settings.STARTUP_BUDGET,
+        "SECONDS": float(os.environ["STARTUP_BUDGET_SECONDS"]),
+    }
+    assert check_budget(measure_startup(), budget) == []
+
+
+def test_importtime_digest():
+    """Собственное время импортов суммируется по приложениям и пакетам"""
+    lines = [
+        "import time: self [us] | cumulative | imported package",
+        "import time:      1500 |       1500 |   apps.shop.managers",
+        "import time:      3000 |       4500 | apps.shop.models",
+        "import time:       700 |        700 | django.db",
+    ]
+    assert importtime_digest(lines) == [
+        {"group": "apps.shop", "self_ms": 4.5, "modules": 2},
+        {"group": "django", "self_ms": 0.7, "modules": 1},
+    ]
+
+
+def test_swagger_is_loaded_lazily(client):
+    """Swagger UI по-прежнему открывается через ленивую загрузку"""
+    response = client.get("/api/docs/")
+    assert response.status_code == 200
+    assert b"swagger" in response.content.lower()
@@ -0,0 +1,66 @@
+from io import StringIO
+
+import pytest
+
+from django.core.management import call_command
+
+from apps.common.models import Task
+from apps.common.tasks import (
+    claim, enqueue, enqueue_on_commit, run_claimed, task
+)
+from apps.shop.models import Product
+
+
+calls = []
+
+
+@task("tests.collect", batch=True, priority=5)
+def collect(payloads):
+    calls.append(sorted(payload["n"] for payload in payloads))
+
+
+@task("tests.flaky", max_attempts=2, retry_delay=0)
+def flaky(n):
+    raise RuntimeError(f"flaky {n}")
+
+
+@pytest.mark.django_db
+def test_tasks_are_batched_and_retried():
+    """Задачи одного типа выполняются пачкой, упавшие повторяются"""
+    calls.clear()
+    enqueue("tests.flaky", {"n": 1})
+    for n in range(3):
+        enqueue("tests.collect", {"n": n})
+
+    claimed = claim(limit=10)
+    assert claimed[0].name == "tests.collect"
+    assert run_claimed(claimed) == (3, 1)
+    assert calls == [[0, 1, 2]]
+
+    flaky_task = Task.objects.get()
+    assert (flaky_task.status, flaky_task.attempts) == ("PENDING", 1)
+
+    run_claimed(claim(limit=10))
+    flaky_task.refresh_from_db()
+    assert (flaky_task.status, flaky_task.attempts) == ("FAILED", 2)
+    assert "flaky 1" in flaky_task.last_error
+    assert claim(limit=10) == []
+
+
+@pytest.mark.django_db
+def test_review_rating_recomputed_by_worker(
+        faker_review_factory, django_capture_on_commit_callbacks
+):
+    """Оценка товара пересчитывается воркером после отзыва"""
+    review = faker_review_factory(rating=4)
+    faker_review_factory(product=review.product, rating=2)
+    with django_capture_on_commit_callbacks(execute=True):
+        enqueue_on_commit(
+            "shop.recompute_product_rating", {"product_id": review.product.id}
+        )
+
+    call_command("run_tasks", once=True, stdout=StringIO())
+
+    product = Product.objects.get(pk=review.product.pk)
+    assert (product.rating_avg, product.rating_count) == (3, 2)
+    assert not Task.objects.exists()
@@ -0,0 +1,119 @@
+import uuid
+from datetime import timedelta
+
+import pytest
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from apps.profiles.archive import archive_orders
+from apps.profiles.models import (
+    ArchivedOrder, ArchivedOrderItem, Order, OrderItem
+)
+from apps.shop import inventory
+from apps.shop.models import StockMovement
+
+
+@pytest.mark.django_db
+def test_order_archive(
+        client, access_token, faker_user_factory, faker_product_factory
+):
+    """
+    Старые завершённые заказы уходят в архив пачками,
+    история заказов листается по обеим таблицам
+    """
+    buyer = faker_user_factory(account_type="BUYER")
+    product = faker_product_factory()
+
+    def create_order(days_ago, **statuses):
+        order = Order.objects.create(user=buyer, **statuses)
+        OrderItem.objects.create(
+            user=buyer, order=order, product=product, quantity=2
+        )
+        Order.objects.filter(pk=order.pk).update(
+            created_at=timezone.now() - timedelta(days=days_ago)
+        )
+        return order
+
+    completed = {"delivery_status": "SUCCESS", "payment_status": "SUCCESSFUL"}
+    ancient = create_order(700, **completed)
+    old = create_order(600, payment_status="CANCELLED")
+    pending = create_order(500)
+    recent = create_order(1, **completed)
+    cart_item = OrderItem.objects.create(user=buyer, product=product)
+
+    assert archive_orders(days=365, batch_size=1) == 2
+    assert set(ArchivedOrder.objects.values_list("tx_ref", flat=True)) == {
+        ancient.tx_ref, old.tx_ref
+    }
+    assert ArchivedOrderItem.objects.count() == 2
+    assert set(Order.objects.values_list("id", flat=True)) == {
+        pending.id, recent.id
+    }
+    assert OrderItem.objects.filter(pk=cart_item.pk).exists()
+    archived = ArchivedOrder.objects.get(pk=ancient.pk)
+    assert archived.created_at < timezone.now() - timedelta(days=699)
+
+    headers = {"HTTP_AUTHORIZATION": f"Bearer {access_token(buyer)}"}
+    response = client.get("/profiles/orders/", **headers)
+    assert len(response.json()) == 2
+
+    seen = []
+    url = "/profiles/orders/history/?page_size=3"
+    while url:
+        page = client.get(url, **headers).json()
+        seen += [order["tx_ref"] for order in page["results"]]
+        url = page["next"]
+    assert seen == [recent.tx_ref, pending.tx_ref, old.tx_ref, ancient.tx_ref]
+
+    response = client.get(f"/profiles/orders/{ancient.tx_ref}/", **headers)
+    assert response.status_code == 200
+    assert response.json()[0]["quantity"] == 2
+
+
+@pytest.mark.django_db
+def test_new_order_skips_archived_tx_ref(monkeypatch, faker_user_factory):
+    """Новый заказ не получает tx_ref заказа из архива"""
+    buyer = faker_user_factory(account_type="BUYER")
+    now = timezone.now()
+    ArchivedOrder.objects.create(
+        id=uuid.uuid4(), user=buyer, tx_ref="A" * 12,
+        created_at=now, updated_at=now
+    )
+    chars = iter("A" * 12 + "B" * 12)
+    monkeypatch.setattr(
+        "apps.common.utils.secrets.choice", lambda allowed: next(chars)
+    )
+    assert Order.objects.create(user=buyer).tx_ref == "B" * 12
+
+
+@pytest.mark.django_db
+def test_archive_keeps_stock_ledger(faker_user_factory, faker_product_factory):
+    """
+    Архивация заказа не трогает журнал остатков: записи продажи
+    по-прежнему ссылаются на заказ по tx_ref
+    """
+    buyer = faker_user_factory(account_type="BUYER")
+    product = faker_product_factory(in_stock=5)
+    order = Order.objects.create(
+        user=buyer, delivery_status="SUCCESS", payment_status="SUCCESSFUL"
+    )
+    OrderItem.objects.create(
+        user=buyer, order=order, product=product, quantity=2
+    )
+    inventory.reserve({product.id: 2}, order_ref=order.tx_ref)
+    Order.objects.filter(pk=order.pk).update(
+        created_at=timezone.now() - timedelta(days=400)
+    )
+
+    with CaptureQueriesContext(connection) as context:
+        assert archive_orders(days=365) == 1
+    assert not [
+        query["sql"] for query in context.captured_queries
+        if StockMovement._meta.db_table in query["sql"]
+    ]
+    assert list(
+        StockMovement.objects.values_list("order_ref", "quantity")
+    ) == [(order.tx_ref, -2)]
+    assert ArchivedOrder.objects.filter(tx_ref=order.tx_ref).exists()
@@ -0,0 +1,92 @@
+import pytest
+
+from rest_framework import status
+from rest_framework.test import force_authenticate
+
+from apps.profiles.models import Order, OrderItem
+from apps.sellers.views import SellerOrdersStatusView
+
+
+@pytest.mark.django_db
+def test_bulk_order_status_transitions(
+        api_request_factory, faker_user_factory,
+        faker_sellers_factory, faker_product_factory
+):
+    """
+    Разрешённые переходы применяются, остальные отклоняются,
+    чужие заказы не найдены
+    """
+    seller = faker_sellers_factory(is_approved=True)
+    product = faker_product_factory(seller=seller)
+    foreign_product = faker_product_factory()
+    buyer = faker_user_factory(account_type="BUYER")
+
+    def create_order(item_product, **kwargs):
+        order = Order.objects.create(user=buyer, **kwargs)
+        OrderItem.objects.create(user=buyer, order=order, product=item_product)
+        return order
+
+    pending = create_order(product)
+    shipping = create_order(product, delivery_status="SHIPPING")
+    delivered = create_order(product, delivery_status="SUCCESS")
+    foreign = create_order(foreign_product)
+
+    request = api_request_factory.post("/", {
+        "tx_refs": [
+            pending.tx_ref, shipping.tx_ref, delivered.tx_ref, foreign.tx_ref
+        ],
+        "delivery_status": "SUCCESS",
+    }, format="json")
+    force_authenticate(request, user=seller.user)
+    response = SellerOrdersStatusView.as_view()(request)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["updated"] == 1
+    results = response.data["results"]
+    assert [r.get("delivery_status", {}).get("updated") for r in results] == [
+        False, True, False, None
+    ]
+    assert results[3]["error"]
+
+    shipping.refresh_from_db()
+    assert shipping.delivery_status == "SUCCESS"
+    assert shipping.date_delivered is not None
+    pending.refresh_from_db()
+    assert pending.delivery_status == "PENDING"
+
+
+@pytest.mark.django_db
+def test_bulk_order_status_seller_scope(
+        api_request_factory, faker_user_factory,
+        faker_sellers_factory, faker_product_factory
+):
+    """
+    Продавец не меняет заказы с чужими товарами
+    и не меняет статус оплаты
+    """
+    seller = faker_sellers_factory(is_approved=True)
+    buyer = faker_user_factory(account_type="BUYER")
+    order = Order.objects.create(user=buyer)
+    for product in (
+            faker_product_factory(seller=seller), faker_product_factory()
+    ):
+        OrderItem.objects.create(user=buyer, order=order, product=product)
+    view = SellerOrdersStatusView.as_view()
+
+    request = api_request_factory.post("/", {
+        "tx_refs": [order.tx_ref], "delivery_status": "PACKING",
+    }, format="json")
+    force_authenticate(request, user=seller.user)
+    response = view(request)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["updated"] == 0
+    assert "other sellers" in response.data["results"][0]["error"]
+
+    request = api_request_factory.post("/", {
+        "tx_refs": [order.tx_ref], "payment_status": "SUCCESSFUL",
+    }, format="json")
+    force_authenticate(request, user=seller.user)
+    assert view(request).status_code == status.HTTP_403_FORBIDDEN
+
+    order.refresh_from_db()
+    assert order.delivery_status == "PENDING"
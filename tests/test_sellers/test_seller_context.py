@@ -0,0 +1,97 @@
+import pytest
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+
+from apps.accounts.serializers import MyTokenObtainPairSerializer
+from apps.sellers.models import Seller
+
+
+def bearer(user):
+    token = MyTokenObtainPairSerializer.get_token(user).access_token
+    return f"Bearer {token}"
+
+
+@pytest.mark.django_db
+def test_seller_claims_skip_seller_queries(
+        client, faker_sellers_factory, faker_product_factory
+):
+    """
+    Одобренный продавец проверяется по claims токена,
+    без запросов к таблице продавцов
+    """
+    seller = faker_sellers_factory(is_approved=True)
+    own = faker_product_factory(seller=seller)
+    foreign = faker_product_factory()
+    authorization = bearer(seller.user)
+
+    with CaptureQueriesContext(connection) as queries:
+        denied = client.delete(
+            f"/sellers/products/{foreign.slug}/",
+            HTTP_AUTHORIZATION=authorization
+        )
+        deleted = client.delete(
+            f"/sellers/products/{own.slug}/",
+            HTTP_AUTHORIZATION=authorization
+        )
+    assert denied.status_code == status.HTTP_403_FORBIDDEN
+    assert deleted.status_code == status.HTTP_200_OK
+    assert not any(
+        Seller._meta.db_table in query["sql"]
+        for query in queries.captured_queries
+    )
+
+
+@pytest.mark.django_db
+def test_seller_approval_without_new_token(client, faker_sellers_factory):
+    """Продавцу, одобренному после входа, не нужен новый токен"""
+    seller = faker_sellers_factory(is_approved=False)
+    authorization = bearer(seller.user)
+    payload = {"tx_refs": ["UNKNOWN"], "delivery_status": "PACKING"}
+
+    response = client.post(
+        "/sellers/orders/status/", payload,
+        content_type="application/json", HTTP_AUTHORIZATION=authorization
+    )
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    Seller.objects.filter(pk=seller.pk).update(is_approved=True)
+    response = client.post(
+        "/sellers/orders/status/", payload,
+        content_type="application/json", HTTP_AUTHORIZATION=authorization
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["results"][0]["error"]
+
+
+@pytest.mark.django_db
+def test_seller_revoked_approval_after_token_refresh(
+        client, faker_sellers_factory
+):
+    """
+    Снятое одобрение сразу действует в воркере, который сохранил
+    продавца, и не возвращается после обновления токена
+    """
+    seller = faker_sellers_factory(is_approved=True)
+    refresh = MyTokenObtainPairSerializer.get_token(seller.user)
+    payload = {"tx_refs": ["UNKNOWN"], "delivery_status": "PACKING"}
+
+    response = client.post(
+        "/sellers/orders/status/", payload, content_type="application/json",
+        HTTP_AUTHORIZATION=f"Bearer {refresh.access_token}"
+    )
+    assert response.status_code == status.HTTP_200_OK
+
+    seller.is_approved = False
+    seller.save()
+    response = client.post(
+        "/auth/token/refresh/", {"refresh": str(refresh)},
+        content_type="application/json"
+    )
+    assert response.status_code == status.HTTP_200_OK
+    response = client.post(
+        "/sellers/orders/status/", payload, content_type="application/json",
+        HTTP_AUTHORIZATION=f"Bearer {response.json()['access']}"
+    )
+    assert response.status_code == status.HTTP_403_FORBIDDEN
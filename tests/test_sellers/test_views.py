@@ -228,3 +228,72 @@ def test_delete_product_review(
     assert response2.status_code == status.HTTP_404_NOT_FOUND
     assert response3.status_code == status.HTTP_403_FORBIDDEN
     # assert response4.status_code == status.HTTP_204_NO_CONTENT
+
+
+@pytest.mark.django_db
+def test_product_reviews_pagination(
+        api_request_factory, faker_review_factory,
+        django_assert_max_num_queries
+):
+    """
+    Отзывы отдаются страницами по курсору, распределение оценок
+    считается по всем отзывам, число запросов не зависит от страницы
+    """
+    review = faker_review_factory(rating=1)
+    for i in range(6):
+        faker_review_factory(product=review.product, rating=i % 5 + 1)
+    slug = review.product.slug
+    url = reverse('products_reviews', kwargs={'slug': slug})
+    view = ProductReviewsView.as_view()
+
+    request = api_request_factory.get(
+        url, {'page_size': 3, 'ordering': 'highest'}
+    )
+    with django_assert_max_num_queries(3):
+        response = view(request, slug=slug)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [r['rating'] for r in response.data['reviews']] == [5, 4, 3]
+    assert response.data['reviews_count'] == 7
+    assert response.data['rating_distribution'] == {
+        '1': 3, '2': 1, '3': 1, '4': 1, '5': 1
+    }
+
+    seen = []
+    next_url = url + '?page_size=3&ordering=highest'
+    while next_url:
+        response = view(api_request_factory.get(next_url), slug=slug)
+        seen += [r['rating'] for r in response.data['reviews']]
+        next_url = response.data['next']
+    assert seen == [5, 4, 3, 2, 1, 1, 1]
+
+    request = api_request_factory.get(url, {'ordering': 'unknown'})
+    assert view(request, slug=slug).status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_product_reviews_without_rating_go_last(
+        api_request_factory, faker_review_factory
+):
+    """
+    Отзывы без оценки не пропадают при сортировке по оценке,
+    а идут после остальных, в том числе на следующих страницах
+    """
+    review = faker_review_factory(rating=None)
+    for rating in (None, 2, 5, 3):
+        faker_review_factory(product=review.product, rating=rating)
+    slug = review.product.slug
+    url = reverse('products_reviews', kwargs={'slug': slug})
+    view = ProductReviewsView.as_view()
+
+    for ordering, expected in (
+        ('highest', [5, 3, 2, None, None]),
+        ('lowest', [2, 3, 5, None, None]),
+    ):
+        seen = []
+        next_url = f'{url}?page_size=2&ordering={ordering}'
+        while next_url:
+            response = view(api_request_factory.get(next_url), slug=slug)
+            seen += [r['rating'] for r in response.data['reviews']]
+            next_url = response.data['next']
+        assert seen == expected
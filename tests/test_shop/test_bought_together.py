@@ -0,0 +1,138 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework import status
+
+from apps.profiles.models import Order, OrderItem
+from apps.shop.lookups import product_slugs
+from apps.shop.models import BoughtTogether, Product
+from apps.shop.views import BoughtTogetherView
+
+
+def create_orders(user, baskets):
+    # bulk_create, чтобы не зависеть от Order.save
+    orders = Order.objects.bulk_create([Order(user=user) for _ in baskets])
+    OrderItem.objects.bulk_create([
+        OrderItem(user=user, order=order, product=product)
+        for order, basket in zip(orders, baskets)
+        for product in basket
+    ])
+
+
+@pytest.mark.django_db
+def test_build_bought_together(
+        api_request_factory, django_assert_num_queries,
+        faker_user_factory, faker_product_factory
+):
+    """
+    Соседи упорядочены по числу совместных заказов,
+    повторный запуск учитывает только новые заказы
+    """
+    buyer = faker_user_factory(account_type="BUYER")
+    phone, case, charger, cable = (faker_product_factory() for _ in range(4))
+    create_orders(buyer, [[phone, case], [phone, case, charger], [phone, cable]])
+
+    call_command("build_bought_together", stdout=StringIO())
+    assert list(
+        BoughtTogether.objects.filter(product=phone)
+        .order_by("rank").values_list("recommended_id", "score")
+    )[0] == (case.id, 2)
+
+    create_orders(buyer, [[phone, cable], [phone, cable]])
+    call_command("build_bought_together", stdout=StringIO())
+    top = BoughtTogether.objects.get(product=phone, rank=1)
+    assert (top.recommended_id, top.score) == (cable.id, 3)
+
+    view = BoughtTogetherView.as_view()
+    # Первый запрос находит id товара по slug, дальше он берётся из памяти.
+    # Остаются соседи и хвост журнала остатков для них
+    view(api_request_factory.get("/"), slug=phone.slug)
+    with django_assert_num_queries(2):
+        response = view(api_request_factory.get("/"), slug=phone.slug)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data[0]["product"]["slug"] == cable.slug
+        assert len(response.data) == 3
+
+
+@pytest.mark.django_db
+def test_full_rebuild_reads_archived_orders(
+        faker_user_factory, faker_product_factory
+):
+    """Полная пересборка учитывает и заказы, перенесённые в архив"""
+    buyer = faker_user_factory(account_type="BUYER")
+    phone, case, cable = (faker_product_factory() for _ in range(3))
+    create_orders(buyer, [[phone, case], [phone, case]])
+    Order.objects.update(
+        payment_status="SUCCESSFUL", delivery_status="SUCCESS",
+        created_at=timezone.now() - timedelta(days=400)
+    )
+    call_command("archive_orders", "--days", "365", stdout=StringIO())
+    assert not Order.objects.exists()
+    create_orders(buyer, [[phone, cable]])
+
+    call_command("build_bought_together", "--full", stdout=StringIO())
+    assert list(
+        BoughtTogether.objects.filter(product=phone)
+        .order_by("rank").values_list("recommended_id", "score")
+    ) == [(case.id, 2), (cable.id, 1)]
+
+
+@pytest.mark.django_db
+def test_build_bought_together_late_commits(
+        faker_user_factory, faker_product_factory
+):
+    """
+    Заказ, закоммиченный после сборки с датой раньше её отметки,
+    учитывается следующей сборкой, уже учтённые заказы не удваиваются
+    """
+    buyer = faker_user_factory(account_type="BUYER")
+    phone, case = faker_product_factory(), faker_product_factory()
+    create_orders(buyer, [[phone, case]])
+    call_command("build_bought_together", stdout=StringIO())
+
+    create_orders(buyer, [[phone, case]])
+    late = Order.objects.order_by("-created_at").first()
+    Order.objects.filter(pk=late.pk).update(
+        created_at=timezone.now() - timedelta(minutes=5)
+    )
+    call_command("build_bought_together", stdout=StringIO())
+    call_command("build_bought_together", stdout=StringIO())
+    assert BoughtTogether.objects.get(product=phone, rank=1).score == 2
+
+
+@pytest.mark.django_db
+def test_bought_together_ignores_stale_slug_cache(
+        api_request_factory, faker_product_factory
+):
+    """
+    id из кэша slug не принимается на веру: удаление и смена slug
+    в другом воркере (без сброса кэша в этом) не дают чужих соседей
+    """
+    first, second, extra = (faker_product_factory() for _ in range(3))
+    BoughtTogether.objects.create(
+        product=first, recommended=extra, score=3, rank=1
+    )
+    BoughtTogether.objects.create(
+        product=second, recommended=first, score=2, rank=1
+    )
+    view = BoughtTogetherView.as_view()
+
+    def neighbours(slug):
+        response = view(api_request_factory.get("/"), slug=slug)
+        return [row["product"]["slug"] for row in response.data]
+
+    slug = first.slug
+    assert neighbours(slug) == [extra.slug]
+    assert product_slugs.get_id(slug) == first.id
+
+    # update() не сбрасывает кэш, как изменение в другом процессе
+    Product.objects.filter(id=first.id).update(slug="renamed")
+    Product.objects.filter(id=second.id).update(slug=slug)
+    assert neighbours(slug) == ["renamed"]
+
+    Product.objects.filter(id=second.id).update(is_deleted=True)
+    assert neighbours(slug) == []
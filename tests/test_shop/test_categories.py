@@ -0,0 +1,134 @@
+import pytest
+
+from rest_framework import status
+
+from apps.shop.models import Category, Product
+from apps.shop.views import ProductsByCategoryView
+
+
+def refresh_counts(*categories):
+    return [
+        Category.objects.get(pk=category.pk).product_count
+        for category in categories
+    ]
+
+
+@pytest.mark.django_db
+def test_category_products_include_subtree(
+        api_request_factory, faker_category_factory, faker_product_factory
+):
+    """
+    Товары подкатегорий попадают в выдачу родительской категории,
+    счётчики поддерева учитывают все уровни
+    """
+    root = faker_category_factory()
+    child = faker_category_factory(parent=root)
+    grandchild = faker_category_factory(parent=child)
+    other = faker_category_factory()
+
+    faker_product_factory(category=root)
+    faker_product_factory(category=child)
+    faker_product_factory(category=grandchild)
+    faker_product_factory(category=other)
+
+    assert child.path.startswith(root.path)
+    assert grandchild.depth == 2
+    assert refresh_counts(root, child, grandchild, other) == [3, 2, 1, 1]
+
+    view = ProductsByCategoryView.as_view()
+    request = api_request_factory.get(f"/shop/categories/{child.slug}/")
+    response = view(request, slug=child.slug)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.data) == 2
+
+
+@pytest.mark.django_db
+def test_category_counts_follow_product_changes(
+        faker_category_factory, faker_product_factory
+):
+    """
+    Счётчики обновляются при переносе и мягком удалении товаров
+    и при переносе ветки в другую категорию
+    """
+    root = faker_category_factory()
+    child = faker_category_factory(parent=root)
+    other = faker_category_factory()
+    product = faker_product_factory(category=child)
+    faker_product_factory(category=child)
+
+    product = Product.objects.get(pk=product.pk)
+    product.category = other
+    product.save()
+    assert refresh_counts(root, child, other) == [1, 1, 1]
+
+    product.delete()
+    assert refresh_counts(root, child, other) == [1, 1, 0]
+
+    Product.objects.filter(category=child).delete()
+    assert refresh_counts(root, child, other) == [0, 0, 0]
+
+    faker_product_factory(category=child)
+    child = Category.objects.get(pk=child.pk)
+    child.parent = other
+    child.save()
+    assert refresh_counts(root, child, other) == [0, 1, 1]
+    assert Category.objects.get(pk=child.pk).path.startswith(other.path)
+
+    Category.objects.filter(pk=other.pk).update(product_count=7)
+    Category.objects.rebuild_product_counts()
+    assert refresh_counts(root, child, other) == [0, 1, 1]
+
+
+def price_ranges(*categories):
+    return [
+        tuple(
+            None if price is None else float(price)
+            for price in Category.objects
+            .values_list("min_price", "max_price")
+            .get(pk=category.pk)
+        )
+        for category in categories
+    ]
+
+
+@pytest.mark.django_db
+def test_category_price_ranges(
+        client, django_assert_num_queries,
+        faker_category_factory, faker_product_factory
+):
+    """
+    Диапазон цен поддерева следует за созданием, сменой цены,
+    удалением товаров и отдаётся списком категорий одним запросом
+    """
+    root = faker_category_factory()
+    child = faker_category_factory(parent=root)
+    cheap = faker_product_factory(category=root, price_current=5)
+    faker_product_factory(category=child, price_current=10)
+    pricey = faker_product_factory(category=child, price_current=20)
+    assert price_ranges(root, child) == [(5, 20), (10, 20)]
+
+    pricey = Product.objects.get(pk=pricey.pk)
+    pricey.price_current = 15
+    pricey.save()
+    assert price_ranges(root, child) == [(5, 15), (10, 15)]
+
+    Product.objects.get(pk=cheap.pk).delete()
+    assert price_ranges(root, child) == [(10, 15), (10, 15)]
+
+    Product.objects.filter(category=child).delete()
+    assert price_ranges(root, child) == [(None, None), (None, None)]
+
+    faker_product_factory(category=child, price_current=30)
+    Category.objects.filter(pk=root.pk).update(min_price=1, max_price=2)
+    assert Category.objects.rebuild_price_ranges() == 1
+    assert price_ranges(root, child) == [(30, 30), (30, 30)]
+
+    with django_assert_num_queries(1):
+        response = client.get("/shop/categories/")
+    assert response.status_code == status.HTTP_200_OK
+    listed = {
+        category["slug"]: (category["product_count"], category["min_price"])
+        for category in response.json()
+    }
+    assert listed[root.slug] == listed[child.slug] == (1, "30.00")
@@ -0,0 +1,55 @@
+import pytest
+
+from rest_framework import status
+
+from apps.accounts.views import MyTokenObtainPairView
+from apps.profiles.models import OrderItem
+from apps.shop.views import CartView
+
+
+@pytest.mark.django_db
+def test_guest_cart_is_merged_on_login(
+        api_request_factory, faker_user_factory, faker_product_factory,
+        django_assert_max_num_queries
+):
+    """
+    Корзина гостя не пишет в базу данных
+    и переносится в корзину пользователя при входе
+    """
+    buyer = faker_user_factory(account_type="BUYER")
+    in_both, guest_only = faker_product_factory(), faker_product_factory()
+    OrderItem.objects.create(user=buyer, product=in_both, quantity=1)
+    view = CartView.as_view()
+
+    cookies = {}
+    for product, quantity in ((in_both, 2), (guest_only, 1)):
+        request = api_request_factory.post(
+            "/", {"slug": product.slug, "quantity": quantity}, format="json"
+        )
+        request.COOKIES.update(cookies)
+        with django_assert_max_num_queries(1):
+            response = view(request)
+        assert response.status_code == status.HTTP_201_CREATED
+        cookies["guest_cart"] = response.cookies["guest_cart"].value
+    assert OrderItem.objects.count() == 1
+
+    request = api_request_factory.get("/")
+    request.COOKIES.update(cookies)
+    response = view(request)
+    assert {item["product"]["slug"] for item in response.data} == {
+        in_both.slug, guest_only.slug
+    }
+
+    request = api_request_factory.post("/", {
+        "email": buyer.email, "password": "testpass123"
+    }, format="json")
+    request.COOKIES.update(cookies)
+    response = MyTokenObtainPairView.as_view()(request)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.cookies["guest_cart"].value == ""
+    quantities = dict(
+        OrderItem.objects.filter(user=buyer, order=None)
+        .values_list("product_id", "quantity")
+    )
+    assert quantities == {in_both.id: 3, guest_only.id: 1}
@@ -0,0 +1,134 @@
+import pytest
+
+from rest_framework import status
+from rest_framework.test import force_authenticate
+
+from apps.profiles.models import Order, OrderItem, ShippingAddress
+from apps.shop import inventory
+from apps.shop.models import Product, StockMovement
+from apps.shop.views import CheckoutView, ProductView, ProductsView
+
+
+@pytest.mark.django_db
+def test_stock_ledger(faker_product_factory):
+    """
+    Резервирование добавляет записи в журнал, не меняя строку товара,
+    компактор сворачивает их в in_stock
+    """
+    product = faker_product_factory(in_stock=3)
+
+    inventory.reserve({product.id: 2})
+    assert inventory.available([product.id]) == {product.id: 1}
+    assert Product.objects.get(id=product.id).in_stock == 3
+
+    with pytest.raises(inventory.OutOfStock):
+        inventory.reserve({product.id: 2})
+    assert inventory.available([product.id]) == {product.id: 1}
+
+    assert inventory.compact() == 3
+    assert Product.objects.get(id=product.id).in_stock == 1
+    assert not StockMovement.objects.filter(is_compacted=False).exists()
+    assert inventory.compact() == 0
+
+    # Сохранение товара с устаревшим остатком не затирает журнал
+    product.name = "Renamed"
+    product.save()
+    assert Product.objects.get(id=product.id).in_stock == 1
+
+
+@pytest.mark.django_db
+def test_checkout_out_of_stock(
+        api_request_factory, faker_user_factory, faker_product_factory
+):
+    """Заказ не создаётся, если товара не хватает"""
+    buyer = faker_user_factory(account_type="BUYER")
+    product = faker_product_factory(in_stock=1)
+    OrderItem.objects.create(user=buyer, product=product, quantity=2)
+    shipping = ShippingAddress.objects.create(
+        user=buyer, full_name="Buyer", email=buyer.email, phone="123",
+        address="Street 1", city="City", country="Country", zipcode="123456"
+    )
+
+    request = api_request_factory.post(
+        "/", {"shipping_id": str(shipping.id)}, format="json"
+    )
+    force_authenticate(request, user=buyer)
+    response = CheckoutView.as_view()(request)
+
+    assert response.status_code == status.HTTP_409_CONFLICT
+    assert response.data["products"] == [product.slug]
+    assert not Order.objects.exists()
+    assert inventory.available([product.id]) == {product.id: 1}
+
+
+def checkout(api_request_factory, buyer, product, quantity):
+    OrderItem.objects.create(user=buyer, product=product, quantity=quantity)
+    shipping = ShippingAddress.objects.create(
+        user=buyer, full_name="Buyer", email=buyer.email, phone="123",
+        address="Street 1", city="City", country="Country", zipcode="123456"
+    )
+    request = api_request_factory.post(
+        "/", {"shipping_id": str(shipping.id)}, format="json"
+    )
+    force_authenticate(request, user=buyer)
+    return CheckoutView.as_view()(request)
+
+
+@pytest.mark.django_db
+def test_checkout_reserves_before_order(
+        api_request_factory, faker_user_factory, faker_product_factory
+):
+    """
+    Продажа пишется в журнал с tx_ref заказа, а списки товаров
+    показывают остаток с несжатым хвостом журнала
+    """
+    buyer = faker_user_factory(account_type="BUYER")
+    product = faker_product_factory(in_stock=5)
+
+    response = checkout(api_request_factory, buyer, product, 2)
+    assert response.status_code == status.HTTP_200_OK
+    tx_ref = response.data["itme"]["tx_ref"]
+    assert list(
+        StockMovement.objects.values_list("kind", "quantity", "order_ref")
+    ) == [("SALE", -2, tx_ref)]
+    assert Product.objects.get(id=product.id).in_stock == 5
+
+    response = ProductView.as_view()(
+        api_request_factory.get("/"), slug=product.slug
+    )
+    assert response.data["in_stock"] == 3
+    response = ProductsView.as_view()(
+        api_request_factory.get("/", {"fields": "slug,in_stock"})
+    )
+    assert response.data["results"] == [{"slug": product.slug, "in_stock": 3}]
+    response = ProductsView.as_view()(
+        api_request_factory.get("/", {"in_stock": 4})
+    )
+    assert response.data["results"] == []
+
+
+@pytest.mark.django_db
+def test_checkout_releases_stock_when_order_fails(
+        api_request_factory, faker_user_factory, faker_product_factory,
+        monkeypatch
+):
+    """
+    Резерв делается вне транзакции заказа, поэтому при ошибке
+    заказа он отменяется записью RELEASE
+    """
+    buyer = faker_user_factory(account_type="BUYER")
+    product = faker_product_factory(in_stock=5)
+
+    def broken_create(**kwargs):
+        raise RuntimeError("order insert failed")
+
+    monkeypatch.setattr(Order.objects, "create", broken_create)
+    with pytest.raises(RuntimeError):
+        checkout(api_request_factory, buyer, product, 2)
+
+    assert not Order.objects.exists()
+    assert OrderItem.objects.filter(user=buyer, order=None).exists()
+    assert inventory.available([product.id]) == {product.id: 5}
+    assert sorted(
+        StockMovement.objects.values_list("kind", "quantity")
+    ) == [("RELEASE", 2), ("SALE", -2)]
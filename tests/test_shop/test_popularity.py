@@ -0,0 +1,117 @@
+import time
+
+import pytest
+
+from django.db import InterfaceError
+from rest_framework import status
+
+from apps.shop import popularity
+from apps.shop.models import ProductActivity
+from apps.shop.popularity import buffer, current_hour, top_products
+from apps.shop.views import (
+    CartView, PopularProductsView, ProductView, TrendingProductsView
+)
+
+
+@pytest.mark.django_db
+def test_popularity_counters_write_behind(
+        api_request_factory, faker_product_factory, faker_user_factory,
+        django_assert_num_queries
+):
+    """
+    Просмотры и добавления в корзину копятся в памяти
+    и пишутся пачкой: INSERT новых строк и UPDATE на каждый прирост
+    """
+    first, second, third, fourth = (
+        faker_product_factory() for _ in range(4)
+    )
+    view = ProductView.as_view()
+    for product, views in ((first, 3), (second, 1), (third, 1), (fourth, 1)):
+        for _ in range(views):
+            response = view(api_request_factory.get("/"), slug=product.slug)
+            assert response.status_code == status.HTTP_200_OK
+    response = CartView.as_view()(
+        api_request_factory.post(
+            "/", {"slug": second.slug, "quantity": 1}, format="json"
+        )
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+    assert not ProductActivity.objects.exists()
+    assert buffer.stats()["pending"] == 4
+
+    # проверка товаров, SAVEPOINT, INSERT, по UPDATE на приросты
+    # 3/0, 1/1 и 1/0 (третий и четвёртый товар вместе), RELEASE
+    with django_assert_num_queries(7):
+        assert buffer.flush() == 4
+    counts = {
+        row.product_id: (row.views, row.cart_adds)
+        for row in ProductActivity.objects.all()
+    }
+    assert counts == {
+        first.id: (3, 0), second.id: (1, 1),
+        third.id: (1, 0), fourth.id: (1, 0),
+    }
+
+    view(api_request_factory.get("/"), slug=first.slug)
+    buffer.flush()
+    assert ProductActivity.objects.get(product=first).views == 4
+    assert ProductActivity.objects.count() == 4
+    assert buffer.flush() == 0
+
+
+@pytest.mark.django_db
+def test_trending_decays_old_activity(
+        api_request_factory, faker_product_factory
+):
+    """
+    За окно старый хит популярнее, но в трендах
+    его обгоняет товар, который смотрят сейчас
+    """
+    old_hit, fresh = faker_product_factory(), faker_product_factory()
+    hour = current_hour()
+    ProductActivity.objects.bulk_create([
+        ProductActivity(product=old_hit, hour=hour - 72, views=100),
+        ProductActivity(product=fresh, hour=hour, views=10, cart_adds=2),
+    ])
+
+    ranking = top_products(7 * 24, 10)
+    assert [product_id for product_id, _ in ranking] == [old_hit.id, fresh.id]
+    ranking = top_products(7 * 24, 10, half_life_hours=24, now=time.time())
+    assert [product_id for product_id, _ in ranking] == [fresh.id, old_hit.id]
+    assert ranking[0][1] == pytest.approx(20)
+    assert ranking[1][1] == pytest.approx(12.5)
+
+    response = TrendingProductsView.as_view()(
+        api_request_factory.get("/", {"fields": "slug"})
+    )
+    assert response.data == [{"slug": fresh.slug}, {"slug": old_hit.slug}]
+    response = PopularProductsView.as_view()(
+        api_request_factory.get("/", {"fields": "slug", "days": 1})
+    )
+    assert response.data == [{"slug": fresh.slug}]
+    response = PopularProductsView.as_view()(
+        api_request_factory.get("/", {"days": 365})
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_popularity_failed_flush_keeps_counters(
+        monkeypatch, faker_product_factory
+):
+    """Счётчики не теряются, если соединение с базой закрыто"""
+    product = faker_product_factory()
+    buffer.record_view(product.id)
+    buffer.record_view(product.id)
+
+    def closed_connection(pending):
+        raise InterfaceError("connection already closed")
+
+    monkeypatch.setattr(popularity, "write_counters", closed_connection)
+    assert buffer.flush() == 0
+    assert buffer.stats()["pending"] == 1
+    assert buffer.stats()["failures"] == 1
+
+    monkeypatch.undo()
+    assert buffer.flush() == 1
+    assert ProductActivity.objects.get(product=product).views == 2
@@ -0,0 +1,96 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework import status
+
+from apps.shop.models import PriceHistory, PriceHistoryDaily, Product
+from apps.shop.views import PriceDropsView, PriceHistoryView
+
+
+def change_price(product, price):
+    product = Product.objects.get(pk=product.pk)
+    product.price_old = product.price_current
+    product.price_current = Decimal(price)
+    product.save()
+    return product
+
+
+@pytest.mark.django_db
+def test_price_history_and_drops(api_request_factory, faker_product_factory):
+    """
+    Каждое изменение цены попадает в журнал,
+    снижения цены видны в ленте price-drops
+    """
+    product = faker_product_factory(price_current=Decimal("50.00"))
+    change_price(product, "40.00")
+    change_price(product, "45.00")
+
+    assert PriceHistory.objects.filter(product=product).count() == 3
+
+    request = api_request_factory.get("/", {"days": 30})
+    response = PriceHistoryView.as_view()(request, slug=product.slug)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["lowest_price"] == Decimal("40.00")
+    assert response.data["highest_price"] == Decimal("50.00")
+    assert len(response.data["points"]) == 3
+
+    response = PriceDropsView.as_view()(api_request_factory.get("/"))
+    assert [drop["price"] for drop in response.data["results"]] == ["40.00"]
+
+
+@pytest.mark.django_db
+def test_compact_price_history(faker_product_factory):
+    """Старые изменения цены сворачиваются в дневные корзины"""
+    product = faker_product_factory(price_current=Decimal("10.00"))
+    change_price(product, "8.00")
+    change_price(product, "12.00")
+    change_price(product, "11.00")
+    old_day = timezone.now() - timedelta(days=120)
+    PriceHistory.objects.filter(product=product).update(created_at=old_day)
+    change_price(product, "9.00")
+
+    call_command("compact_price_history", retention_days=90, stdout=StringIO())
+
+    assert PriceHistory.objects.filter(product=product).count() == 1
+    bucket = PriceHistoryDaily.objects.get(product=product)
+    assert (bucket.price_min, bucket.price_max) == (8, 12)
+
+
+@pytest.mark.django_db
+def test_price_drops_cursor_keeps_microseconds(
+        api_request_factory, faker_product_factory
+):
+    """
+    Снижения цены в одну миллисекунду не теряются
+    и не повторяются при листании по одной записи
+    """
+    product = faker_product_factory(price_current=Decimal("50.00"))
+    change_price(change_price(product, "40.00"), "30.00")
+    moment = timezone.now().replace(microsecond=123456)
+    drops = list(PriceHistory.objects.filter(previous_price__isnull=False))
+    assert len(drops) == 2
+    for offset, drop in enumerate(drops):
+        PriceHistory.objects.filter(pk=drop.pk).update(
+            created_at=moment + timedelta(microseconds=offset)
+        )
+
+    seen = []
+    params = {"page_size": 1}
+    while True:
+        response = PriceDropsView.as_view()(
+            api_request_factory.get("/", params)
+        )
+        assert response.status_code == status.HTTP_200_OK
+        seen += [drop["price"] for drop in response.data["results"]]
+        if not response.data["next"]:
+            break
+        params["cursor"] = parse_qs(
+            urlparse(response.data["next"]).query
+        )["cursor"][0]
+    assert sorted(seen) == ["30.00", "40.00"]
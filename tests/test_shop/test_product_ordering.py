@@ -0,0 +1,97 @@
+import pytest
+
+from django.db import connection
+from rest_framework import status
+
+from apps.shop.filters import PRODUCT_ORDERINGS, ProductOrderingFilter
+from apps.shop.models import Product
+from apps.shop.views import (
+    ProductsByCategoryView, ProductsBySellerView, ProductsView
+)
+
+
+def query_plan(queryset):
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+        return " | ".join(row[-1] for row in cursor.fetchall())
+
+
+@pytest.mark.django_db
+def test_products_ordering(
+        api_request_factory, faker_product_factory, faker_sellers_factory,
+        faker_category_factory
+):
+    """
+    ?ordering= сортирует товары во всех трёх списках,
+    неизвестный ключ возвращает 400
+    """
+    seller = faker_sellers_factory()
+    category = faker_category_factory()
+    prices = (30, 10, 20)
+    for price in prices:
+        faker_product_factory(
+            seller=seller, category=category, price_current=price
+        )
+
+    def prices_of(results):
+        return [float(product["price_current"]) for product in results]
+
+    response = ProductsView.as_view()(
+        api_request_factory.get("/", {"ordering": "price", "page_size": 10})
+    )
+    assert prices_of(response.data["results"]) == sorted(prices)
+
+    response = ProductsBySellerView.as_view()(
+        api_request_factory.get("/", {"ordering": "-price"}),
+        slug=seller.slug
+    )
+    assert prices_of(response.data) == sorted(prices, reverse=True)
+
+    response = ProductsByCategoryView.as_view()(
+        api_request_factory.get("/", {"ordering": "price"}),
+        slug=category.slug
+    )
+    assert prices_of(response.data) == sorted(prices)
+
+    for view, kwargs in (
+            (ProductsView, {}),
+            (ProductsBySellerView, {"slug": seller.slug}),
+            (ProductsByCategoryView, {"slug": category.slug}),
+    ):
+        response = view.as_view()(
+            api_request_factory.get("/", {"ordering": "name"}), **kwargs
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "ordering" in response.data
+
+
+@pytest.mark.django_db
+@pytest.mark.skipif(
+    connection.vendor != "sqlite", reason="EXPLAIN QUERY PLAN is SQLite"
+)
+@pytest.mark.parametrize("ordering", list(PRODUCT_ORDERINGS))
+def test_product_ordering_uses_index(
+        ordering, faker_sellers_factory, faker_category_factory
+):
+    """
+    Первая страница каждой сортировки читается из индекса
+    без отдельного шага сортировки
+    """
+    seller = faker_sellers_factory()
+    category = faker_category_factory()
+    products = Product.objects.select_related(
+        "category", "seller", "seller__user"
+    )
+    for queryset, index_prefix in (
+            (products.all(), "product_"),
+            (products.filter(seller=seller), "product_seller_"),
+            (products.in_category_tree(category), "product_"),
+    ):
+        filterset = ProductOrderingFilter(
+            {"ordering": ordering}, queryset=queryset
+        )
+        assert filterset.is_valid()
+        plan = query_plan(filterset.qs[:20])
+        assert "TEMP B-TREE FOR ORDER BY" not in plan, plan
+        assert f"USING INDEX {index_prefix}" in plan, plan
@@ -0,0 +1,41 @@
+import pytest
+
+from rest_framework import status
+
+from apps.shop.views import ProductsBatchView
+
+
+@pytest.mark.django_db
+def test_products_batch(
+        api_request_factory, faker_product_factory, django_assert_num_queries
+):
+    """
+    Товары по списку slug загружаются одним запросом
+    в порядке запроса, ненайденные slug возвращаются отдельно
+    """
+    first, second = faker_product_factory(), faker_product_factory()
+    view = ProductsBatchView.as_view()
+
+    request = api_request_factory.get("/", {
+        "slugs": f"{second.slug},unknown,{first.slug},{second.slug}"
+    })
+    with django_assert_num_queries(1):
+        response = view(request)
+        data = response.data
+    assert response.status_code == status.HTTP_200_OK
+    assert [item["slug"] for item in data["results"]] == [
+        second.slug, first.slug
+    ]
+    assert data["results"][0]["seller"]["avatar"]
+    assert data["missing"] == ["unknown"]
+
+    request = api_request_factory.post(
+        "/", {"slugs": [first.slug]}, format="json"
+    )
+    response = view(request)
+    assert [item["slug"] for item in response.data["results"]] == [first.slug]
+
+    request = api_request_factory.post(
+        "/", {"slugs": ["a"] * 201}, format="json"
+    )
+    assert view(request).status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,67 @@
+import random
+import uuid
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+
+from django.core.management import call_command
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from apps.accounts.models import User
+from apps.profiles.models import Order, OrderItem
+from apps.sellers.models import Seller
+from apps.shop.models import Category, Product, Review
+
+
+@pytest.mark.django_db
+def test_seed_shop():
+    """
+    Команда создаёт связанный набор данных с пересчитанными счётчиками,
+    один и тот же seed даёт одни и те же данные
+    """
+    out = StringIO()
+    call_command(
+        "seed_shop", users=40, sellers=4, categories=8, products=60,
+        orders=50, reviews=120, carts=10, chunk_size=25, seed=7, stdout=out
+    )
+
+    assert "users: 40/40" in out.getvalue()
+    assert User.objects.count() == 40
+    assert Seller.objects.count() == 4
+    assert Product.objects.count() == 60
+    assert Order.objects.count() == 50
+    assert Review.objects.count() == 120
+    assert OrderItem.objects.filter(order=None).exists()
+
+    roots = Category.objects.filter(parent=None)
+    assert sum(root.product_count for root in roots) == 60
+    assert Product.objects.aggregate(
+        total=Sum("rating_count")
+    )["total"] == 120
+    # Популярность по Ципфу: первый товар встречается в заказах чаще всех
+    top = Product.objects.get(slug="product-0")
+    assert OrderItem.objects.filter(product=top).count() == max(
+        OrderItem.objects.filter(product=product).count()
+        for product in Product.objects.all()
+    )
+
+    # Один отзыв на пару (пользователь, товар)
+    assert not (
+        Review.objects.values("user", "product")
+        .annotate(total=Count("id"))
+        .filter(total__gt=1)
+        .exists()
+    )
+    # Даты заказов и отзывов разбросаны по прошлому, а не равны now()
+    week_ago = timezone.now() - timedelta(days=7)
+    assert Order.objects.filter(created_at__lt=week_ago).exists()
+    assert Review.objects.filter(updated_at__lt=week_ago).exists()
+    assert OrderItem.objects.filter(
+        order__isnull=False, created_at__lt=week_ago
+    ).exists()
+
+    # Идентификаторы берутся из того же генератора, что и остальные данные
+    first_id = uuid.UUID(int=random.Random(7).getrandbits(128), version=4)
+    assert User.objects.filter(id=first_id, email="user0@seed.local").exists()
@@ -0,0 +1,56 @@
+import pytest
+
+from apps.common.cache import SlugLookupCache
+from apps.shop.lookups import category_slugs, product_slugs
+
+
+@pytest.fixture(autouse=True)
+def empty_lookups():
+    """Кэши живут в памяти процесса, тесты начинают с пустых"""
+    product_slugs.clear()
+    category_slugs.clear()
+
+
+@pytest.mark.django_db
+def test_product_slug_lookup(
+        client, django_assert_num_queries, faker_product_factory
+):
+    """Повторный поиск по slug не ходит в базу, удаление сбрасывает кэш"""
+    product = faker_product_factory()
+    assert product_slugs.get_id(product.slug) == product.id
+    with django_assert_num_queries(0):
+        assert product_slugs.get_id(product.slug) == product.id
+    assert product_slugs.get_id("missing") is None
+    assert product_slugs.stats()["hits"] == 1
+    assert product_slugs.stats()["size"] == 1
+
+    response = client.get(f"/shop/products/{product.slug}/")
+    assert response.json()["slug"] == product.slug
+
+    product.delete()
+    assert product_slugs.get_id(product.slug) is None
+    response = client.get(f"/shop/products/{product.slug}/")
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db
+def test_category_slug_changes_with_name(client, faker_category_factory):
+    """Переименованная категория не находится по старому slug"""
+    category = faker_category_factory(name="Phones")
+    response = client.get(f"/shop/categories/{category.slug}/")
+    assert response.status_code == 200
+
+    old_slug = category.slug
+    category.name = "Smartphones"
+    category.save()
+    assert category_slugs.get(old_slug) is None
+    assert category_slugs.get(category.slug).pk == category.pk
+
+
+def test_slug_lookup_is_bounded():
+    """Старые записи вытесняются при переполнении"""
+    lookups = SlugLookupCache(product_slugs.model, maxsize=2)
+    for number in range(3):
+        lookups._remember(f"slug-{number}", number)
+    assert list(lookups._ids) == ["slug-1", "slug-2"]
+    assert lookups.stats()["evictions"] == 1
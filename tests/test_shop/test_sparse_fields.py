@@ -0,0 +1,42 @@
+import pytest
+
+from rest_framework import status
+
+from apps.shop.views import ProductsView
+
+
+@pytest.mark.django_db
+def test_products_sparse_fieldset(
+        api_request_factory, faker_product_factory, django_assert_num_queries
+):
+    """
+    ?fields= оставляет в ответе только запрошенные поля
+    и не читает лишние колонки из базы данных
+    """
+    product = faker_product_factory()
+    view = ProductsView.as_view()
+
+    request = api_request_factory.get(
+        "/", {"fields": "name,slug,seller.name"}
+    )
+    # table statistics + count + page
+    with django_assert_num_queries(3) as captured:
+        response = view(request)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["results"] == [{
+        "name": product.name,
+        "slug": product.slug,
+        "seller": {"name": product.seller.business_name},
+    }]
+    sql = captured.captured_queries[-1]["sql"]
+    assert "desc" not in sql and "shop_category" not in sql
+
+    request = api_request_factory.get("/", {"exclude": "seller,category"})
+    response = view(request)
+    result = response.data["results"][0]
+    assert "seller" not in result and "category" not in result
+    assert result["price_current"] is not None
+
+    request = api_request_factory.get("/", {"fields": "name,seller.unknown"})
+    response = view(request)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST